@@ -42,9 +42,30 @@ try {
         sendError('Fee not found', 'not_found', 404);
     }
     
+    // Recipients: students with this fee still pending (see database/fee_dues.py)
+    $targetWhere = "pd.fee_id = :fee_id";
+    $targetParams = [':fee_id' => $feeId];
+    $targetJoin = "";
+    if ($targetDepartment) {
+        $targetWhere .= " AND pd.department = :dept";
+        $targetParams[':dept'] = $targetDepartment;
+    }
+    if ($targetSemester) {
+        $targetWhere .= " AND pd.semester = :sem";
+        $targetParams[':sem'] = $targetSemester;
+    }
+    if ($targetProgram) {
+        $targetJoin = " JOIN students s ON pd.student_id = s.id AND s.program = :prog";
+        $targetParams[':prog'] = $targetProgram;
+    }
+    
+    $countStmt = $db->prepare("SELECT COUNT(*) FROM pending_dues pd" . $targetJoin . " WHERE " . $targetWhere);
+    $countStmt->execute($targetParams);
+    $sentCount = (int)$countStmt->fetchColumn();
+    
     // Insert notification
-    $query = "INSERT INTO fee_notifications (fee_id, title, message, target_department, target_semester, target_program, sent_by) 
-              VALUES (:fee_id, :title, :message, :dept, :sem, :prog, :sent_by)";
+    $query = "INSERT INTO fee_notifications (fee_id, title, message, target_department, target_semester, target_program, sent_count, sent_by) 
+              VALUES (:fee_id, :title, :message, :dept, :sem, :prog, :sent_count, :sent_by)";
     
     $stmt = $db->prepare($query);
     $stmt->bindParam(':fee_id', $feeId);
@@ -53,13 +74,16 @@ try {
     $stmt->bindParam(':dept', $targetDepartment);
     $stmt->bindParam(':sem', $targetSemester);
     $stmt->bindParam(':prog', $targetProgram);
+    $stmt->bindParam(':sent_count', $sentCount, PDO::PARAM_INT);
     $stmt->bindParam(':sent_by', $user['user_id']);
     
     if ($stmt->execute()) {
         // Here you would typically trigger the actual sending (email/SMS)
         // For now, we just record it in the database
+        $markStmt = $db->prepare("UPDATE pending_dues pd" . $targetJoin . " SET pd.notified_at = NOW() WHERE " . $targetWhere);
+        $markStmt->execute($targetParams);
         
-        sendSuccess(['message' => 'Fee notification sent successfully'], 201);
+        sendSuccess(['message' => 'Fee notification sent successfully', 'sent_count' => $sentCount], 201);
     } else {
         throw new Exception('Failed to create notification');
     }
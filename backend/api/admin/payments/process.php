@@ -13,6 +13,7 @@ require_once '../../../includes/cors.php';
 require_once '../../../includes/auth.php';
 require_once '../../../includes/functions.php';
 require_once '../../../includes/validation.php';
+require_once '../../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -166,6 +167,11 @@ try {
     
     $paymentId = $db->lastInsertId();
     
+    // The fee is no longer pending for this student
+    $clearStmt = $db->prepare("DELETE FROM pending_dues WHERE student_id = :student_id AND fee_id = :fee_id");
+    $clearStmt->execute([':student_id' => $studentId, ':fee_id' => $feeId]);
+    ResponseCache::invalidate("student/$studentId/fees");
+    
     // Prepare response
     $response = [
         'id' => (int) $paymentId,
@@ -12,6 +12,8 @@ require_once '../../../config/database.php';
 require_once '../../../includes/cors.php';
 require_once '../../../includes/auth.php';
 require_once '../../../includes/functions.php';
+require_once '../../../includes/ResponseCache.php';
+require_once '../../../includes/pdf_generator.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -44,7 +46,7 @@ try {
     $db = $database->getConnection();
     
     // Verify student exists and get user_id
-    $checkQuery = "SELECT user_id, student_id, first_name, last_name 
+    $checkQuery = "SELECT id, user_id, student_id, first_name, last_name 
                    FROM students 
                    WHERE student_id = :student_id";
     $checkStmt = $db->prepare($checkQuery);
@@ -66,6 +68,11 @@ try {
     if (!$deleteStmt->execute()) {
         sendError('Failed to delete student', 'delete_failed', 500);
     }
+
+    // The cascade removed the student's marks, attendance and payments
+    ResponseCache::invalidate("student/{$student['id']}/");
+    // Pre-rendered ID cards, receipts and reports hold the student's personal data
+    purgeStudentPDFs($student['student_id']);
     
     // Prepare response
     $response = [
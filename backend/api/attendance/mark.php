@@ -11,6 +11,7 @@ require_once '../../includes/cors.php';
 require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
 require_once '../../includes/validation.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -67,6 +68,7 @@ try {
     $stmt = $db->prepare($query);
     
     $markedCount = 0;
+    $markedStudents = [];
     
     foreach ($attendanceData as $studentId => $status) {
         // Validate status
@@ -104,11 +106,16 @@ try {
         
         if ($stmt->execute()) {
             $markedCount++;
+            $markedStudents[] = (int) $dbStudentId;
         }
     }
     
     $db->commit();
     
+    foreach ($markedStudents as $markedStudent) {
+        ResponseCache::invalidate("student/$markedStudent/attendance");
+    }
+    
     sendSuccess(['message' => "Attendance marked for $markedCount students", 'count' => $markedCount]);
     
 } catch (PDOException $e) {
@@ -12,6 +12,7 @@ if ($_SERVER['REQUEST_METHOD'] === 'OPTIONS') {
 
 require_once '../../config/database.php';
 require_once '../../includes/auth.php';
+require_once '../../includes/ResponseCache.php';
 
 if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
     echo json_encode(['success' => false, 'message' => 'Method not allowed']);
@@ -78,6 +79,7 @@ try {
     foreach ($marksData as $studentId => $marks) {
         if ($marks !== null && $marks !== '') {
             $stmt->execute([$studentId, $subjectId, $semester, $examType, $marks, $maxMarks, $examDate, $teacher['id']]);
+            ResponseCache::invalidate('student/' . (int) $studentId . '/current_results');
             $successCount++;
         }
     }
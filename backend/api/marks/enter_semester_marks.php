@@ -12,6 +12,8 @@ if ($_SERVER['REQUEST_METHOD'] === 'OPTIONS') {
 
 require_once '../../config/database.php';
 require_once '../../includes/auth.php';
+require_once '../../includes/grade_calculator.php';
+require_once '../../includes/ResponseCache.php';
 
 if ($_SERVER['REQUEST_METHOD'] !== 'POST') {
     echo json_encode(['success' => false, 'message' => 'Method not allowed']);
@@ -67,9 +69,9 @@ try {
     
     // Determine grade and GP
     $gradeData = calculateGrade($totalMarks);
-    $letterGrade = $gradeData['grade'];
-    $gradePoint = $gradeData['gp'];
-    $creditPoints = $credit * $gradePoint;
+    $letterGrade = $gradeData['letter_grade'];
+    $gradePoint = $gradeData['grade_point'];
+    $creditPoints = calculateCP($gradePoint, $credit);
 
     // Insert or update
     $stmt = $db->prepare("
@@ -91,9 +93,10 @@ try {
     
     $stmt->execute([
         $studentId, $subjectId, $sessionId, $semester,
-        $isaMarks, $esaMarks, $isaMarks, $esaMarks,
+        $esaMarks, $isaMarks, $isaMarks, $esaMarks,
         $totalMarks, $gradePoint, $letterGrade, $creditPoints, $teacher['id']
     ]);
+    ResponseCache::invalidate('student/' . (int) $studentId . '/marks');
 
     echo json_encode([
         'success' => true,
@@ -110,13 +113,4 @@ try {
     echo json_encode(['success' => false, 'message' => $e->getMessage()]);
 }
 
-function calculateGrade($total) {
-    if ($total >= 90) return ['grade' => 'A+', 'gp' => 9];
-    if ($total >= 80) return ['grade' => 'A', 'gp' => 8];
-    if ($total >= 70) return ['grade' => 'B+', 'gp' => 7];
-    if ($total >= 60) return ['grade' => 'B', 'gp' => 6];
-    if ($total >= 50) return ['grade' => 'C', 'gp' => 5];
-    if ($total >= 40) return ['grade' => 'D', 'gp' => 4];
-    return ['grade' => 'F', 'gp' => 0];
-}
 ?>
@@ -41,8 +41,8 @@ try {
         }
     }
 
-    // Delete File
-    if (file_exists($material['file_path'])) {
+    // Delete File (content-addressed blobs may be shared; database/upload_store.py gc removes them)
+    if (strpos($material['file_path'], 'uploads/cas/') === false && file_exists($material['file_path'])) {
         unlink($material['file_path']);
     }
 
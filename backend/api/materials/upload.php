@@ -89,8 +89,8 @@ try {
     if (move_uploaded_file($file['tmp_name'], $targetPath)) {
         // If replacing existing question paper
         if ($type === 'question_papers' && isset($existing) && isset($_POST['replace']) && $_POST['replace'] === 'true') {
-            // Delete old file
-            if (file_exists($existing['file_path'])) {
+            // Delete old file (shared content-addressed blobs are left to upload_store.py gc)
+            if (strpos($existing['file_path'], 'uploads/cas/') === false && file_exists($existing['file_path'])) {
                 unlink($existing['file_path']);
             }
             
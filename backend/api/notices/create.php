@@ -11,6 +11,7 @@ require_once '../../includes/cors.php';
 require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
 require_once '../../includes/validation.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -76,6 +77,7 @@ try {
     $stmt->bindParam(':created_by', $user['user_id']);
     
     if ($stmt->execute()) {
+        ResponseCache::invalidate('notices/');
         $noticeId = $db->lastInsertId();
         sendSuccess(['id' => $noticeId, 'message' => 'Notice created successfully'], 201);
     } else {
@@ -10,6 +10,7 @@ require_once '../../config/database.php';
 require_once '../../includes/cors.php';
 require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -58,6 +59,7 @@ try {
     $stmt->bindParam(':id', $noticeId);
     
     if ($stmt->execute()) {
+        ResponseCache::invalidate('notices/');
         sendSuccess(['message' => 'Notice deleted successfully']);
     } else {
         throw new Exception('Failed to delete notice');
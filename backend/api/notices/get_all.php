@@ -7,6 +7,7 @@ require_once '../../config/database.php';
 require_once '../../includes/cors.php';
 require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
+require_once '../../includes/ResponseCache.php';
 
 $user = verifyAuth();
 if (!$user) sendError('Unauthorized', 'unauthorized', 401);
@@ -42,6 +43,10 @@ try {
             )";
             $params[':department'] = $student['department'];
             $params[':semester'] = $student['semester'];
+            
+            // Same list for every student of a department and semester
+            $cacheKey = 'notices/' . ResponseCache::segment($student['department']) . '/' . (int)$student['semester'];
+            ResponseCache::sendCached($cacheKey);
         } else {
             // Fallback if student record not found
             $whereConditions[] = "(target_audience = 'all')";
@@ -99,7 +104,11 @@ try {
         $notice['created_by'] = $notice['created_by_name'] ?? 'Admin';
     }
     
-    sendSuccess(['notices' => $notices, 'total' => count($notices)]);
+    $response = ['notices' => $notices, 'total' => count($notices)];
+    if (isset($cacheKey)) {
+        ResponseCache::set($cacheKey, $response, ResponseCache::ttlUntilMidnight());
+    }
+    sendSuccess($response);
 } catch (PDOException $e) {
     logError('DB error get notices: ' . $e->getMessage());
     // Don't leak exception message in production
@@ -9,6 +9,7 @@ require_once '../../config/database.php';
 require_once '../../includes/cors.php';
 require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
+require_once '../../includes/ResponseCache.php';
 
 $user = verifyAuth();
 if (!$user || $user['role'] !== 'student') {
@@ -58,6 +59,9 @@ try {
     
     // Update Fee Status (Simplified logic: if paid >= amount, marked as paid)
     // Real logic should check total paid vs total due
+    $stmt = $db->prepare("DELETE FROM pending_dues WHERE student_id = ? AND fee_id = ?");
+    $stmt->execute([$studentId, $data['fee_id']]);
+    ResponseCache::invalidate("student/$studentId/fees");
     
     sendSuccess([
         'message' => 'Payment processed successfully',
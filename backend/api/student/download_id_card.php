@@ -82,12 +82,16 @@ try {
         exit();
     }
     
-    // Generate ID card PDF
-    $pdfPath = generateIDCard($studentData);
+    // Serve the pre-rendered ID card if the student row is unchanged, otherwise render and cache it
+    $cacheKey = getPDFCacheKey('id_card', $studentData);
+    $pdfPath = getCachedPDF($studentData['student_id'], $cacheKey);
+    if (!$pdfPath) {
+        $pdfPath = storeCachedPDF($studentData['student_id'], $cacheKey, generateIDCard($studentData));
+    }
     
     // Output PDF for download
     $filename = 'ID_Card_' . $studentData['student_id'] . '.pdf';
-    outputPDFDownload($pdfPath, $filename);
+    outputPDFDownload($pdfPath, $filename, false);
     
 } catch (PDOException $e) {
     error_log("Database error in download_id_card.php: " . $e->getMessage());
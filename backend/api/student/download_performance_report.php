@@ -111,23 +111,29 @@ try {
         exit();
     }
     
-    // Group marks by semester
-    $marksData = [];
-    foreach ($allMarks as $mark) {
-        $semester = $mark['semester'];
-        if (!isset($marksData[$semester])) {
-            $marksData[$semester] = [];
+    // Serve the pre-rendered report if the marks rows are unchanged
+    $cacheKey = getPDFCacheKey('performance_report', ['student' => $studentData, 'marks' => $allMarks]);
+    $pdfPath = getCachedPDF($studentData['student_id'], $cacheKey);
+    
+    if (!$pdfPath) {
+        // Group marks by semester
+        $marksData = [];
+        foreach ($allMarks as $mark) {
+            $semester = $mark['semester'];
+            if (!isset($marksData[$semester])) {
+                $marksData[$semester] = [];
+            }
+            $marksData[$semester][] = $mark;
         }
-        $marksData[$semester][] = $mark;
+        
+        // Generate performance report PDF and keep it for the next request
+        $pdfPath = storeCachedPDF($studentData['student_id'], $cacheKey, generatePerformanceReport($studentData, $marksData));
     }
     
-    // Generate performance report PDF
-    $pdfPath = generatePerformanceReport($studentData, $marksData);
-    
     // Output PDF for download
     $date = date('Y-m-d');
     $filename = 'Performance_Report_' . $studentData['student_id'] . '_' . $date . '.pdf';
-    outputPDFDownload($pdfPath, $filename);
+    outputPDFDownload($pdfPath, $filename, false);
     
 } catch (PDOException $e) {
     error_log("Database error in download_performance_report.php: " . $e->getMessage());
@@ -103,12 +103,16 @@ try {
     // Remove user_id from data (not needed for PDF)
     unset($paymentData['user_id']);
     
-    // Generate receipt PDF
-    $pdfPath = generateReceipt($paymentData);
+    // Serve the pre-rendered receipt if the payment row is unchanged, otherwise render and cache it
+    $cacheKey = getPDFCacheKey('receipt', $paymentData);
+    $pdfPath = getCachedPDF($paymentData['student_id'], $cacheKey);
+    if (!$pdfPath) {
+        $pdfPath = storeCachedPDF($paymentData['student_id'], $cacheKey, generateReceipt($paymentData));
+    }
     
     // Output PDF for download
     $filename = 'Receipt_' . $paymentData['receipt_number'] . '_' . $paymentData['student_id'] . '.pdf';
-    outputPDFDownload($pdfPath, $filename);
+    outputPDFDownload($pdfPath, $filename, false);
     
 } catch (PDOException $e) {
     error_log("Database error in download_receipt.php: " . $e->getMessage());
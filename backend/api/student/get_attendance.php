@@ -11,6 +11,7 @@ require_once '../../config/database.php';
 require_once '../../includes/cors.php';
 require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -83,6 +84,10 @@ try {
             sendError('Daily attendance view is only available for current and previous month', 'invalid_period', 400);
         }
         
+        // Served from the response cache warmed by database/response_cache.py
+        $cacheKey = "student/$studentId/attendance-daily-$semester-$month-" . (int)$year;
+        ResponseCache::sendCached($cacheKey);
+        
         $query = "SELECT 
                     a.id,
                     a.attendance_date,
@@ -111,7 +116,7 @@ try {
         // Calculate stats for the month
         $stats = calculateAttendanceStats($records);
         
-        sendSuccess([
+        $response = [
             'view_type' => 'daily',
             'semester' => $semester,
             'month' => $month,
@@ -119,10 +124,15 @@ try {
             'records' => $records,
             'stats' => $stats,
             'current_semester' => $currentSemester
-        ]);
+        ];
+        ResponseCache::set($cacheKey, $response, ResponseCache::ttlUntilMidnight());
+        sendSuccess($response);
         
     } else {
         // Summary view: Subject-wise percentage for past months
+        $cacheKey = "student/$studentId/attendance-summary-$semester";
+        ResponseCache::sendCached($cacheKey);
+        
         // Get all months before current month for the semester
         $query = "SELECT 
                     s.id as subject_id,
@@ -190,12 +200,14 @@ try {
             }
         }
         
-        sendSuccess([
+        $response = [
             'view_type' => 'summary',
             'semester' => $semester,
             'subjects' => array_values($subjectSummary),
             'current_semester' => $currentSemester
-        ]);
+        ];
+        ResponseCache::set($cacheKey, $response, ResponseCache::ttlUntilMidnight());
+        sendSuccess($response);
     }
     
 } catch (PDOException $e) {
@@ -12,6 +12,7 @@ if ($_SERVER['REQUEST_METHOD'] === 'OPTIONS') {
 
 require_once '../../config/database.php';
 require_once '../../includes/auth.php';
+require_once '../../includes/ResponseCache.php';
 
 $user = verifyAuth();
 if (!$user) {
@@ -39,6 +40,10 @@ try {
         exit();
     }
 
+    // Served from the response cache warmed by database/response_cache.py
+    $cacheKey = "student/{$student['id']}/current_results-{$student['semester']}";
+    ResponseCache::sendCached($cacheKey);
+
     // Get all exam types with marks for current semester
     $query = "
         SELECT 
@@ -71,12 +76,15 @@ try {
         $results[$mark['exam_type']][] = $mark;
     }
 
+    $data = [
+        'student' => $student,
+        'results' => $results
+    ];
+    ResponseCache::set($cacheKey, $data);
+
     echo json_encode([
         'success' => true,
-        'data' => [
-            'student' => $student,
-            'results' => $results
-        ]
+        'data' => $data
     ]);
 
 } catch (Exception $e) {
@@ -11,6 +11,7 @@ require_once '../../config/database.php';
 require_once '../../includes/cors.php';
 require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -67,6 +68,10 @@ try {
     }
     $sessionId = $session['id'];
     
+    // Served from the response cache warmed by database/response_cache.py
+    $cacheKey = "student/$studentId/fees-$sessionId";
+    ResponseCache::sendCached($cacheKey);
+    
     // Query fees applicable to this student
     $query = "SELECT 
                 f.id,
@@ -159,6 +164,7 @@ try {
         ]
     ];
     
+    ResponseCache::set($cacheKey, $response, ResponseCache::ttlUntilMidnight());
     sendSuccess($response);
     
 } catch (PDOException $e) {
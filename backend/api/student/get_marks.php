@@ -14,6 +14,7 @@ require_once '../../includes/auth.php';
 require_once '../../includes/validation.php';
 require_once '../../includes/functions.php';
 require_once '../../includes/grade_calculator.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -76,6 +77,10 @@ try {
         sendError('Invalid semester number. Must be between 1 and 6', 'invalid_semester', 400);
     }
     
+    // Served from the response cache warmed by database/response_cache.py
+    $cacheKey = "student/$studentId/marks-$sessionId-$semester";
+    ResponseCache::sendCached($cacheKey);
+    
     // Query marks with subject details
     $query = "SELECT 
                 m.id,
@@ -141,6 +146,7 @@ try {
         ]
     ];
     
+    ResponseCache::set($cacheKey, $response);
     sendSuccess($response);
     
 } catch (PDOException $e) {
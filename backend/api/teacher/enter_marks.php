@@ -14,6 +14,7 @@ require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
 require_once '../../includes/validation.php';
 require_once '../../includes/grade_calculator.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -166,6 +167,7 @@ try {
     if (!$insertStmt->execute()) {
         sendError('Failed to insert marks', 'insert_failed', 500);
     }
+    ResponseCache::invalidate("student/$studentId/marks");
     
     $marksId = $db->lastInsertId();
     
@@ -13,6 +13,7 @@ require_once '../../includes/cors.php';
 require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
 require_once '../../includes/validation.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -106,6 +107,7 @@ try {
         'late' => 0,
         'excused' => 0
     ];
+    $markedStudents = [];
     
     // Start transaction
     $db->beginTransaction();
@@ -168,6 +170,7 @@ try {
             $stmt->bindParam(':marked_by', $user['user_id'], PDO::PARAM_INT);
             
             if ($stmt->execute()) {
+                $markedStudents[] = $studentId;
                 // Check if it was an insert or update
                 if ($stmt->rowCount() == 1) {
                     $successCount++;
@@ -181,6 +184,11 @@ try {
         // Commit transaction
         $db->commit();
         
+        // Cached attendance lives until midnight; drop it now rather than wait for response_cache.py watch
+        foreach ($markedStudents as $markedStudent) {
+            ResponseCache::invalidate("student/$markedStudent/attendance");
+        }
+        
         // Prepare response
         $response = [
             'subject_id' => $subjectId,
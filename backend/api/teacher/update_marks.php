@@ -14,6 +14,7 @@ require_once '../../includes/auth.php';
 require_once '../../includes/functions.php';
 require_once '../../includes/validation.php';
 require_once '../../includes/grade_calculator.php';
+require_once '../../includes/ResponseCache.php';
 
 // Verify authentication
 $user = verifyAuth();
@@ -136,6 +137,7 @@ try {
     if (!$updateStmt->execute()) {
         sendError('Failed to update marks', 'update_failed', 500);
     }
+    ResponseCache::invalidate("student/{$existingMarks['student_id']}/marks");
     
     // Calculate credit points
     $creditPoints = calculateCP($gradePoint, (int) $existingMarks['credit_hours']);
@@ -15,7 +15,8 @@ class RateLimiter {
             endpoint VARCHAR(255) NOT NULL,
             requests INT DEFAULT 1,
             start_time INT NOT NULL,
-            INDEX idx_ip_endpoint (ip_address, endpoint)
+            INDEX idx_ip_endpoint (ip_address, endpoint),
+            INDEX idx_start_time (start_time)
         )";
         $this->db->exec($query);
     }
@@ -23,10 +24,8 @@ class RateLimiter {
     public function check($ip, $endpoint, $limit, $window) {
         $current_time = time();
         
-        // Delete old records
-        $delete_query = "DELETE FROM " . $this->table_name . " WHERE start_time < :time";
-        $stmt = $this->db->prepare($delete_query);
-        $stmt->execute([':time' => $current_time - $window]);
+        // Expired rows are purged off the request path by database/rate_limit_maintenance.py,
+        // so a stale window is simply restarted here
 
         // Check current usage
         $query = "SELECT * FROM " . $this->table_name . " 
@@ -35,7 +34,13 @@ class RateLimiter {
         $stmt->execute([':ip' => $ip, ':endpoint' => $endpoint]);
         $row = $stmt->fetch(PDO::FETCH_ASSOC);
 
-        if ($row) {
+        if ($row && $row['start_time'] < $current_time - $window) {
+            $reset = "UPDATE " . $this->table_name . " 
+                      SET requests = 1, start_time = :time 
+                      WHERE id = :id";
+            $stmt = $this->db->prepare($reset);
+            $stmt->execute([':time' => $current_time, ':id' => $row['id']]);
+        } elseif ($row) {
             if ($row['requests'] >= $limit) {
                 return false;
             }
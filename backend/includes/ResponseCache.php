@@ -0,0 +1,148 @@
+<?php
+/**
+ * Response Cache
+ * File-backed cache of JSON response payloads for hot read-only endpoints,
+ * shared with database/response_cache.py, which warms it ahead of result day
+ * and term start and invalidates entries when marks, attendance, payments or
+ * notices change.
+ *
+ * Keys are relative paths such as "student/42/marks-3-5". Each entry file holds
+ * its expiry timestamp on the first line and the encoded `data` payload after
+ * it. Hits bump the file mtime so the warmer's size-bounded eviction drops
+ * the least recently used entries first.
+ */
+
+// Outside uploads/ and denied in docker/nginx/backend.conf: entries hold per-student data
+define('RESPONSE_CACHE_DIR', __DIR__ . '/../cache/response/');
+define('RESPONSE_CACHE_TTL', 3600);
+
+class ResponseCache {
+    /**
+     * Get the file path for a key
+     * @param string $key Cache key
+     * @return string Path of the entry (may not exist)
+     */
+    public static function path($key) {
+        return RESPONSE_CACHE_DIR . $key . '.json';
+    }
+
+    /**
+     * Encode a department name for use in a key
+     * @param string|null $department Department name
+     * @return string Key segment ('_' when empty)
+     */
+    public static function segment($department) {
+        return ($department === null || $department === '') ? '_' : rawurlencode($department);
+    }
+
+    /**
+     * Seconds until local midnight, for payloads that depend on today's date
+     * @return int TTL capped at RESPONSE_CACHE_TTL
+     */
+    public static function ttlUntilMidnight() {
+        return max(1, min(RESPONSE_CACHE_TTL, strtotime('tomorrow') - time()));
+    }
+
+    /**
+     * Look up a cached payload
+     * @param string $key Cache key
+     * @return string|null Encoded payload, or null on a miss
+     */
+    public static function get($key) {
+        $path = self::path($key);
+        $handle = @fopen($path, 'rb');
+        if ($handle === false) {
+            self::record('miss', $key);
+            return null;
+        }
+
+        $expiresAt = (int) fgets($handle);
+        $body = stream_get_contents($handle);
+        fclose($handle);
+
+        if ($expiresAt < time() || $body === '' || $body === false) {
+            @unlink($path);
+            self::record('miss', $key);
+            return null;
+        }
+
+        @touch($path);
+        self::record('hit', $key);
+        return $body;
+    }
+
+    /**
+     * Store a payload
+     * @param string $key Cache key
+     * @param mixed $data Value passed to sendSuccess()
+     * @param int $ttl Lifetime in seconds
+     * @return void
+     */
+    public static function set($key, $data, $ttl = RESPONSE_CACHE_TTL) {
+        $path = self::path($key);
+        $dir = dirname($path);
+
+        if (!file_exists($dir)) {
+            @mkdir($dir, 0777, true);
+        }
+
+        // Write then rename so concurrent readers never see a partial entry
+        $tmp = $path . '.' . getmypid() . '.tmp';
+        if (@file_put_contents($tmp, (time() + $ttl) . "\n" . json_encode($data)) !== false) {
+            @rename($tmp, $path);
+        }
+    }
+
+    /**
+     * Drop every entry whose key starts with a prefix
+     * @param string $prefix Key prefix, e.g. "student/42/fees" or "notices/"
+     * @return void
+     */
+    public static function invalidate($prefix) {
+        $dir = dirname(RESPONSE_CACHE_DIR . $prefix . 'x');
+        $base = substr($prefix, -1) === '/' ? '' : basename($prefix);
+
+        try {
+            $iterator = new RecursiveIteratorIterator(
+                new RecursiveDirectoryIterator($dir, FilesystemIterator::SKIP_DOTS)
+            );
+            foreach ($iterator as $file) {
+                if ($base === '' || strpos($file->getFilename(), $base) === 0) {
+                    @unlink($file->getPathname());
+                }
+            }
+        } catch (UnexpectedValueException $e) {
+            // Directory does not exist: nothing cached under this prefix
+        }
+    }
+
+    /**
+     * Send a cached payload as a success response and exit, if present
+     * @param string $key Cache key
+     * @return void Returns only on a miss
+     */
+    public static function sendCached($key) {
+        $body = self::get($key);
+        if ($body === null) {
+            return;
+        }
+
+        http_response_code(200);
+        header('Content-Type: application/json; charset=UTF-8');
+        header('X-Cache: HIT');
+        echo '{"success":true,"data":' . $body . '}';
+        exit();
+    }
+
+    /**
+     * Append a hit/miss event for the warmer's metrics
+     * @param string $event 'hit' or 'miss'
+     * @param string $key Cache key
+     * @return void
+     */
+    private static function record($event, $key) {
+        $name = basename($key);
+        $endpoint = strpos($key, 'notices/') === 0 ? 'notices' : strtok($name, '-');
+        @file_put_contents(RESPONSE_CACHE_DIR . 'metrics.log', $event . ' ' . $endpoint . "\n", FILE_APPEND | LOCK_EX);
+    }
+}
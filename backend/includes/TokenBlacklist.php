@@ -34,11 +34,7 @@ class TokenBlacklist {
     }
 
     public function isBlacklisted($jti) {
-        // Clean up expired tokens first (lazy cleanup)
-        if (rand(1, 100) <= 5) { // 5% chance to run cleanup
-            $this->cleanup();
-        }
-
+        // Expired tokens are purged off the request path by database/rate_limit_maintenance.py
         $query = "SELECT id FROM " . $this->table_name . " WHERE jti = :jti LIMIT 1";
         $stmt = $this->db->prepare($query);
         $stmt->bindParam(':jti', $jti);
@@ -47,7 +43,7 @@ class TokenBlacklist {
         return $stmt->rowCount() > 0;
     }
 
-    private function cleanup() {
+    public function cleanup() {
         $query = "DELETE FROM " . $this->table_name . " WHERE expires_at < :now";
         $stmt = $this->db->prepare($query);
         $now = time();
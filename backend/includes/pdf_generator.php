@@ -24,6 +24,12 @@ define('PDF_PRIMARY_COLOR', [52, 152, 219]); // RGB for primary elements
 define('PDF_TEXT_COLOR', [44, 62, 80]); // RGB for text
 define('PDF_BORDER_COLOR', [189, 195, 199]); // RGB for borders
 
+// Pre-rendered document cache (filled by database/prerender_pdfs.py). Kept out of
+// uploads/, which nginx serves without auth; docker/nginx/backend.conf denies /cache/.
+// One directory per student so a deleted student's documents can be purged.
+define('PDF_CACHE_DIR', __DIR__ . '/../cache/pdf/');
+define('PDF_CACHE_VERSION', '2'); // Bump when a document layout changes
+
 /**
  * Initialize TCPDF instance with institution branding
  * 
@@ -474,11 +480,7 @@ function generatePerformanceReport($studentData, $marksData) {
     $pdf->SetXY(15, $y);
     $pdf->Cell(180, 5, 'Cumulative Grade Point Average (CGPA): ' . number_format($cgpa, 2), 0, 1, 'L');
     
-    // Footer
-    $y += 20;
-    $pdf->SetFont('helvetica', 'I', 9);
-    $pdf->SetXY(15, $y);
-    $pdf->Cell(180, 5, 'Generated on: ' . date('F d, Y'), 0, 1, 'C');
+    // No "generated on" date: reports are cached by content and served on later days
     
     // Save to temp directory
     $tempDir = __DIR__ . '/../uploads/temp/';
@@ -551,14 +553,133 @@ function cleanupTempFiles($olderThanHours = 24) {
     return $deletedCount;
 }
 
+/**
+ * Normalize document data for cache keys
+ * 
+ * Every scalar becomes a string so PDO's native ints and decimal strings hash
+ * the same way as the values written by database/prerender_pdfs.py.
+ * 
+ * @param mixed $data Row or list of rows
+ * @return mixed Normalized data with sorted keys
+ */
+function normalizePDFCacheData($data) {
+    if (is_array($data)) {
+        $normalized = array_map('normalizePDFCacheData', $data);
+        if (!array_is_list($normalized)) {
+            ksort($normalized, SORT_STRING);
+        }
+        return $normalized;
+    }
+    
+    return $data === null ? null : (string) $data;
+}
+
+/**
+ * Compute the content-addressed cache key for a document
+ * 
+ * @param string $type Document type ('id_card', 'receipt' or 'performance_report')
+ * @param array $data Rows the document is rendered from
+ * @return string SHA-256 hex digest
+ */
+function getPDFCacheKey($type, $data) {
+    $payload = [
+        'data' => normalizePDFCacheData($data),
+        'type' => $type,
+        'version' => PDF_CACHE_VERSION
+    ];
+    
+    return hash('sha256', json_encode($payload, JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES));
+}
+
+/**
+ * Get the cache directory holding a student's documents
+ * 
+ * @param string $studentCode Student code (students.student_id)
+ * @return string Directory path with trailing slash
+ */
+function getPDFCacheDir($studentCode) {
+    return PDF_CACHE_DIR . preg_replace('/[^A-Za-z0-9_-]/', '_', (string) $studentCode) . '/';
+}
+
+/**
+ * Get the cache path for a key
+ * 
+ * @param string $studentCode Student code the document belongs to
+ * @param string $key Cache key from getPDFCacheKey()
+ * @return string Path of the cached PDF (may not exist)
+ */
+function getPDFCachePath($studentCode, $key) {
+    return getPDFCacheDir($studentCode) . $key . '.pdf';
+}
+
+/**
+ * Look up a pre-rendered PDF
+ * 
+ * @param string $studentCode Student code the document belongs to
+ * @param string $key Cache key from getPDFCacheKey()
+ * @return string|null Path to cached PDF, or null on a miss
+ */
+function getCachedPDF($studentCode, $key) {
+    $path = getPDFCachePath($studentCode, $key);
+    
+    if (!is_file($path)) {
+        return null;
+    }
+    
+    // Bump mtime so size-based eviction treats the file as recently used
+    @touch($path);
+    
+    return $path;
+}
+
+/**
+ * Move a freshly rendered PDF into the cache
+ * 
+ * @param string $studentCode Student code the document belongs to
+ * @param string $key Cache key from getPDFCacheKey()
+ * @param string $tempPath Path returned by one of the generate* functions
+ * @return string Path of the cached PDF
+ */
+function storeCachedPDF($studentCode, $key, $tempPath) {
+    $path = getPDFCachePath($studentCode, $key);
+    $dir = dirname($path);
+    
+    if (!file_exists($dir)) {
+        mkdir($dir, 0777, true);
+    }
+    
+    // rename() is atomic, so concurrent readers never see a partial file
+    if (!rename($tempPath, $path)) {
+        return $tempPath;
+    }
+    
+    return $path;
+}
+
+/**
+ * Delete every cached document of a student
+ * 
+ * @param string $studentCode Student code (students.student_id)
+ * @return void
+ */
+function purgeStudentPDFs($studentCode) {
+    $dir = getPDFCacheDir($studentCode);
+    
+    foreach (glob($dir . '*.pdf') ?: [] as $path) {
+        @unlink($path);
+    }
+    @rmdir($dir);
+}
+
 /**
  * Output PDF file for download and clean up temp file
  * 
  * @param string $filePath Path to PDF file
  * @param string $filename Filename for download
+ * @param bool $deleteAfter Delete the file after sending (false for cached files)
  * @return void
  */
-function outputPDFDownload($filePath, $filename) {
+function outputPDFDownload($filePath, $filename, $deleteAfter = true) {
     if (!file_exists($filePath)) {
         http_response_code(404);
         echo json_encode([
@@ -580,7 +701,9 @@ function outputPDFDownload($filePath, $filename) {
     readfile($filePath);
     
     // Delete temp file after sending
-    unlink($filePath);
+    if ($deleteAfter) {
+        unlink($filePath);
+    }
     
     exit();
 }
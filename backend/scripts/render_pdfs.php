@@ -0,0 +1,64 @@
+<?php
+/**
+ * Batch PDF Renderer
+ *
+ * Renders documents into the PDF cache for database/prerender_pdfs.py.
+ * Reads one JSON job per line from stdin: {"key": ..., "student": ..., "type": ..., "data": ...}
+ * and prints "OK <key>" or "ERR <key> <message>" per job.
+ *
+ * Usage:
+ *   php backend/scripts/render_pdfs.php < jobs.jsonl
+ */
+
+require_once __DIR__ . '/../includes/pdf_generator.php';
+
+while (($line = fgets(STDIN)) !== false) {
+    $line = trim($line);
+    if ($line === '') {
+        continue;
+    }
+
+    $job = json_decode($line, true);
+    if (!$job || !isset($job['key'], $job['student'], $job['type'], $job['data'])) {
+        echo "ERR - invalid job\n";
+        continue;
+    }
+
+    $key = $job['key'];
+    $student = $job['student'];
+    $data = $job['data'];
+
+    // Another worker or a live request may have rendered it already
+    if (getCachedPDF($student, $key)) {
+        echo "OK $key\n";
+        continue;
+    }
+
+    try {
+        switch ($job['type']) {
+            case 'id_card':
+                $tempPath = generateIDCard($data);
+                break;
+            case 'receipt':
+                $tempPath = generateReceipt($data);
+                break;
+            case 'performance_report':
+                // Group marks by semester, as download_performance_report.php does
+                $marksData = [];
+                foreach ($data['marks'] as $mark) {
+                    $marksData[$mark['semester']][] = $mark;
+                }
+                $tempPath = generatePerformanceReport($data['student'], $marksData);
+                break;
+            default:
+                echo "ERR $key unknown document type\n";
+                continue 2;
+        }
+
+        storeCachedPDF($student, $key, $tempPath);
+        echo "OK $key\n";
+    } catch (Exception $e) {
+        echo "ERR $key " . str_replace("\n", ' ', $e->getMessage()) . "\n";
+    }
+}
+?>
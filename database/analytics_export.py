@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+Columnar Analytics Export for Student Portal
+Incrementally extracts attendance, marks and payments into a local Parquet
+store (partitioned by session_id and month) and computes the admin report
+aggregates from it with DuckDB, so the trend, performance and financial
+reports no longer scan the OLTP tables.
+
+Usage:
+    python database/analytics_export.py export [--full | --reconcile]
+    python database/analytics_export.py report trends --metric attendance --period monthly
+    python database/analytics_export.py report performance [--semester 3 --department BCA]
+    python database/analytics_export.py report financial [--start-date 2025-01-01 --end-date 2025-06-30]
+    python database/analytics_export.py verify
+
+Each export run appends new part files containing rows whose change timestamp
+(marked_at / updated_at) passed the stored watermark, less a short overlap so
+rows stamped before a run but committed after it are still picked up; readers
+keep the newest copy of each id, so re-exported rows are harmless. Deleted rows
+leave no timestamp behind: export --reconcile compares every stored id with
+MySQL and writes tombstones for the missing ones, which the views skip.
+export --full rebuilds the store from scratch.
+migrations/15_add_change_watermark_indexes.sql indexes those columns so an
+incremental run reads a range instead of scanning the OLTP tables.
+
+The verify command runs the SQL from backend/api/admin/reports/*.php against
+MySQL and compares it with the store, as a parity check. Two PHP queries use
+columns the schema does not have (attendance.semester and marks.created_at), so
+the SQL versions here use subjects.semester and marks.entered_at instead.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import duckdb
+import mysql.connector
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analytics_store')
+FETCH_SIZE = 50000
+# Re-scan this far behind each watermark: a row's timestamp is set before its transaction commits
+EXPORT_OVERLAP_SECONDS = 60
+
+# Fact tables: extraction query and the change-timestamp column used as the watermark.
+# Payments carry the fee's session_id so they can be partitioned like the others.
+FACT_TABLES = {
+    'attendance': {
+        'query': """
+            SELECT id, student_id, subject_id, session_id, attendance_date, status, marked_at,
+                   DATE_FORMAT(attendance_date, '%%Y-%%m') AS month
+            FROM attendance
+        """,
+        'watermark': 'marked_at'
+    },
+    'marks': {
+        'query': """
+            SELECT id, student_id, subject_id, session_id, semester, total_marks, grade_point,
+                   entered_at, updated_at, DATE_FORMAT(entered_at, '%%Y-%%m') AS month
+            FROM marks
+        """,
+        'watermark': 'updated_at'
+    },
+    'payments': {
+        'query': """
+            SELECT p.id, p.student_id, p.fee_id, f.session_id, p.amount_paid, p.late_fine,
+                   p.total_amount, p.payment_date, p.status, p.updated_at,
+                   DATE_FORMAT(p.payment_date, '%%Y-%%m') AS month
+            FROM payments p
+            JOIN fees f ON p.fee_id = f.id
+        """,
+        'watermark': 'p.updated_at'
+    }
+}
+
+# Small dimension tables are re-exported in full on every run
+DIMENSION_TABLES = {
+    'students': "SELECT id, department, semester FROM students",
+    'subjects': "SELECT id, subject_code, subject_name, semester FROM subjects",
+    'fees': """
+        SELECT id, fee_type, amount, semester, department, session_id, due_date, is_active
+        FROM fees
+    """
+}
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def watermark_path(store):
+    return os.path.join(store, '_watermarks.json')
+
+def load_watermarks(store):
+    try:
+        with open(watermark_path(store)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_watermarks(store, watermarks):
+    tmp = watermark_path(store) + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp, watermark_path(store))
+
+def rows_to_table(columns, rows, exported_at):
+    """Build an Arrow table from DB rows, adding the export timestamp used for dedupe"""
+    arrays = {name: [row[i] for row in rows] for i, name in enumerate(columns)}
+    arrays['_exported_at'] = [exported_at] * len(rows)
+    table = pa.table(arrays)
+    # DECIMAL columns come back as Decimal; doubles are what the aggregates need
+    for i, field in enumerate(table.schema):
+        if pa.types.is_decimal(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+    return table
+
+def export_fact(conn, store, name, spec, since, exported_at, run_id):
+    """Stream changed rows of one fact table into session/month partitions"""
+    cursor = conn.cursor()
+    # Always bind parameters so the escaped %% in DATE_FORMAT is interpreted consistently
+    query = spec['query'] + (f" WHERE (%s IS NULL OR {spec['watermark']}"
+                             f" >= %s - INTERVAL {EXPORT_OVERLAP_SECONDS} SECOND)")
+    cursor.execute(query, (since, since))
+    columns = [c[0] for c in cursor.description]
+    ts_index = columns.index(spec['watermark'].split('.')[-1])
+
+    exported = 0
+    high_water = since
+    chunk_no = 0
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        table = rows_to_table(columns, rows, exported_at)
+        pq.write_to_dataset(table, os.path.join(store, name), partition_cols=['session_id', 'month'],
+                            basename_template=f"part-{run_id}-{chunk_no}-{{i}}.parquet")
+        chunk_no += 1
+        exported += len(rows)
+        latest = max((row[ts_index] for row in rows if row[ts_index] is not None), default=None)
+        if latest is not None:
+            latest = str(latest)
+            high_water = latest if high_water is None or latest > high_water else high_water
+    cursor.close()
+    return exported, high_water
+
+def reconcile_fact(conn, db, store, name, exported_at, run_id):
+    """Write tombstones for stored rows whose id no longer exists in MySQL"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT id FROM {name}")
+    live_ids = []
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        live_ids.extend(row[0] for row in rows)
+    cursor.close()
+
+    stored = db.execute(f"SELECT id, session_id, month FROM {name}").arrow()
+    gone = stored.filter(pc.invert(pc.is_in(stored['id'], value_set=pa.array(live_ids, type=stored['id'].type))))
+    if gone.num_rows:
+        # Same partitions as the row's last copy, newer _exported_at, so the view resolves to the tombstone
+        gone = gone.append_column('_exported_at', pa.array([exported_at] * gone.num_rows))
+        gone = gone.append_column('_deleted', pa.array([True] * gone.num_rows))
+        pq.write_to_dataset(gone, os.path.join(store, name), partition_cols=['session_id', 'month'],
+                            basename_template=f"part-{run_id}-deleted-{{i}}.parquet")
+    return gone.num_rows
+
+def export_dimensions(conn, store, exported_at):
+    cursor = conn.cursor()
+    os.makedirs(os.path.join(store, 'dim'), exist_ok=True)
+    for name, query in DIMENSION_TABLES.items():
+        cursor.execute(query)
+        columns = [c[0] for c in cursor.description]
+        table = rows_to_table(columns, cursor.fetchall(), exported_at)
+        tmp = os.path.join(store, 'dim', name + '.parquet.tmp')
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(store, 'dim', name + '.parquet'))
+    cursor.close()
+
+def export(store, full=False, reconcile=False):
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+
+    if full and os.path.exists(store):
+        shutil.rmtree(store)
+    os.makedirs(store, exist_ok=True)
+    watermarks = load_watermarks(store)
+    exported_at = datetime.now()
+    run_id = exported_at.strftime('%Y%m%d%H%M%S')
+
+    try:
+        export_dimensions(conn, store, exported_at)
+        for name, spec in FACT_TABLES.items():
+            start = time.perf_counter()
+            count, high_water = export_fact(conn, store, name, spec, watermarks.get(name), exported_at, run_id)
+            if high_water:
+                watermarks[name] = high_water
+            print(f"✓ {name}: {count} rows in {time.perf_counter() - start:.1f}s (watermark {high_water})")
+        save_watermarks(store, watermarks)
+
+        if reconcile and not full:
+            # Stamped after the export so a tombstone never ties with a copy written above
+            db = open_store(store)
+            for name in FACT_TABLES:
+                deleted = reconcile_fact(conn, db, store, name, datetime.now(), run_id)
+                print(f"✓ {name}: {deleted} deleted rows reconciled")
+            db.close()
+    finally:
+        conn.close()
+
+def open_store(store):
+    """DuckDB connection with deduplicated views over the Parquet store"""
+    db = duckdb.connect()
+    for name in FACT_TABLES:
+        pattern = os.path.join(store, name, '**', '*.parquet')
+        if not os.path.isdir(os.path.join(store, name)):
+            raise RuntimeError(f"No exported data for {name}; run 'export' first")
+        source = f"read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)"
+        columns = {row[0] for row in db.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+        # Stores that were never reconciled have no tombstone column
+        excluded, live = ('_rn, _deleted', ' AND _deleted IS NOT TRUE') if '_deleted' in columns else ('_rn', '')
+        # Later exports of the same id supersede earlier ones, including tombstones
+        db.execute(f"""
+            CREATE VIEW {name} AS
+            SELECT * EXCLUDE ({excluded}) FROM (
+                SELECT *, row_number() OVER (PARTITION BY id ORDER BY _exported_at DESC) AS _rn
+                FROM {source}
+            ) WHERE _rn = 1{live}
+        """)
+    for name in DIMENSION_TABLES:
+        db.execute(f"CREATE VIEW {name} AS SELECT * FROM read_parquet('{os.path.join(store, 'dim', name + '.parquet')}')")
+    return db
+
+def rows_as_dicts(cursor_or_relation, rows=None):
+    columns = [c[0] for c in cursor_or_relation.description]
+    return [dict(zip(columns, row)) for row in (rows if rows is not None else cursor_or_relation.fetchall())]
+
+def with_changes(rows, value_key):
+    """Add percentage_change/trend to consecutive periods, as trends.php does"""
+    items = []
+    for i, row in enumerate(rows):
+        item = dict(row)
+        if i > 0:
+            previous = float(rows[i - 1][value_key] or 0)
+            current = float(row[value_key] or 0)
+            if previous > 0:
+                change = (current - previous) / previous * 100
+                item['percentage_change'] = round(change, 2)
+                item['trend'] = 'up' if change > 0 else ('down' if change < 0 else 'stable')
+        items.append(item)
+    return items
+
+# Report SQL shared by the store (DuckDB) and MySQL paths. {month_*} placeholders
+# differ per engine: DuckDB reads the partition column, MySQL formats the date.
+TREND_QUERIES = {
+    ('attendance', 'monthly'): ("""
+        SELECT {month_attendance} AS period, COUNT(*) AS total_records,
+               SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) AS present_count,
+               ROUND(SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS value
+        FROM attendance a
+        WHERE a.session_id = {p}
+        GROUP BY 1 ORDER BY 1
+    """, 'value'),
+    ('attendance', 'semester'): ("""
+        SELECT sub.semester AS period, COUNT(*) AS total_records,
+               SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) AS present_count,
+               ROUND(SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS value
+        FROM attendance a
+        JOIN subjects sub ON a.subject_id = sub.id
+        WHERE a.session_id = {p}
+        GROUP BY 1 ORDER BY 1
+    """, 'value'),
+    ('performance', 'monthly'): ("""
+        SELECT {month_marks} AS period, ROUND(AVG(m.grade_point), 2) AS value,
+               COUNT(DISTINCT m.student_id) AS student_count, COUNT(*) AS marks_count
+        FROM marks m
+        WHERE m.session_id = {p}
+        GROUP BY 1 ORDER BY 1
+    """, 'value'),
+    ('performance', 'semester'): ("""
+        SELECT m.semester AS period, ROUND(AVG(m.grade_point), 2) AS value,
+               COUNT(DISTINCT m.student_id) AS student_count, COUNT(*) AS marks_count
+        FROM marks m
+        WHERE m.session_id = {p}
+        GROUP BY 1 ORDER BY 1
+    """, 'value'),
+    ('payments', 'monthly'): ("""
+        SELECT {month_payments} AS period, ROUND(SUM(p.total_amount), 2) AS value,
+               ROUND(SUM(p.late_fine), 2) AS late_fines, COUNT(*) AS payment_count
+        FROM payments p
+        JOIN fees f ON p.fee_id = f.id
+        WHERE p.status = 'completed' AND f.session_id = {p}
+        GROUP BY 1 ORDER BY 1
+    """, 'value'),
+    ('payments', 'semester'): ("""
+        SELECT f.semester AS period, ROUND(SUM(p.total_amount), 2) AS value,
+               ROUND(SUM(p.late_fine), 2) AS late_fines, COUNT(*) AS payment_count
+        FROM payments p
+        JOIN fees f ON p.fee_id = f.id
+        WHERE p.status = 'completed' AND f.session_id = {p} AND f.semester IS NOT NULL
+        GROUP BY 1 ORDER BY 1
+    """, 'value')
+}
+
+ENGINE_SQL = {
+    'duckdb': {'p': '?', 'month_attendance': 'a.month', 'month_marks': 'm.month', 'month_payments': 'p.month'},
+    'mysql': {'p': '%s', 'month_attendance': "DATE_FORMAT(a.attendance_date, '%%Y-%%m')",
+              'month_marks': "DATE_FORMAT(m.entered_at, '%%Y-%%m')",
+              'month_payments': "DATE_FORMAT(p.payment_date, '%%Y-%%m')"}
+}
+
+def run_query(engine, conn, sql, params):
+    """Execute report SQL on either engine and return a list of dicts"""
+    sql = sql.format(**ENGINE_SQL[engine])
+    if engine == 'duckdb':
+        result = conn.execute(sql, params)
+        return rows_as_dicts(result)
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = rows_as_dicts(cursor)
+    cursor.close()
+    return rows
+
+def trends(engine, conn, session_id, metric, period):
+    sql, value_key = TREND_QUERIES[(metric, period)]
+    return with_changes(run_query(engine, conn, sql, [session_id]), value_key)
+
+def filter_clause(engine, semester, department, subject_id):
+    p = ENGINE_SQL[engine]['p']
+    clauses, params = [], []
+    if semester is not None:
+        clauses.append(f"m.semester = {p}")
+        params.append(semester)
+    if department is not None:
+        clauses.append(f"s.department = {p}")
+        params.append(department)
+    if subject_id is not None:
+        clauses.append(f"m.subject_id = {p}")
+        params.append(subject_id)
+    return ''.join(' AND ' + c for c in clauses), params
+
+def performance(engine, conn, session_id, semester=None, department=None, subject_id=None):
+    """Same three aggregates as backend/api/admin/reports/performance.php"""
+    where, params = filter_clause(engine, semester, department, subject_id)
+    params = [session_id] + params
+    by_department_semester = run_query(engine, conn, f"""
+        SELECT s.department, m.semester, COUNT(DISTINCT m.student_id) AS total_students,
+               ROUND(AVG(m.grade_point), 2) AS average_gpa,
+               ROUND(SUM(CASE WHEN m.grade_point >= 1.50 THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS pass_percentage
+        FROM marks m
+        JOIN students s ON m.student_id = s.id
+        WHERE m.session_id = {{p}}{where}
+        GROUP BY s.department, m.semester
+        ORDER BY s.department, m.semester
+    """, params)
+    subject_averages = run_query(engine, conn, f"""
+        SELECT sub.subject_code, sub.subject_name, ROUND(AVG(m.total_marks), 2) AS average_marks,
+               ROUND(AVG(m.grade_point), 2) AS average_gpa, COUNT(DISTINCT m.student_id) AS student_count
+        FROM marks m
+        JOIN subjects sub ON m.subject_id = sub.id
+        JOIN students s ON m.student_id = s.id
+        WHERE m.session_id = {{p}}{where}
+        GROUP BY sub.id, sub.subject_code, sub.subject_name
+        ORDER BY sub.subject_code
+    """, params)
+    overall = run_query(engine, conn, f"""
+        SELECT COUNT(DISTINCT m.student_id) AS total_students,
+               ROUND(AVG(m.grade_point), 2) AS overall_average_gpa,
+               ROUND(SUM(CASE WHEN m.grade_point >= 1.50 THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS overall_pass_percentage
+        FROM marks m
+        JOIN students s ON m.student_id = s.id
+        WHERE m.session_id = {{p}}{where}
+    """, params)
+    return {'overall': overall[0] if overall else {}, 'by_department_semester': by_department_semester,
+            'subject_averages': subject_averages}
+
+def financial(engine, conn, session_id, start_date=None, end_date=None, department=None):
+    """Same aggregates as backend/api/admin/reports/financial.php"""
+    p = ENGINE_SQL[engine]['p']
+    where, params = '', [session_id]
+    if start_date:
+        where += f" AND f.due_date >= {p}"
+        params.append(start_date)
+    if end_date:
+        where += f" AND f.due_date <= {p}"
+        params.append(end_date)
+    if department is not None:
+        where += f" AND (f.department IS NULL OR f.department = {p})"
+        params.append(department)
+
+    breakdown = run_query(engine, conn, f"""
+        SELECT f.fee_type,
+               ROUND(SUM(CASE WHEN p.status = 'completed' THEN p.total_amount ELSE 0 END), 2) AS collected,
+               ROUND(SUM(CASE WHEN p.status IS NULL OR p.status = 'pending' THEN f.amount ELSE 0 END), 2) AS pending,
+               ROUND(SUM(CASE WHEN p.status = 'completed' THEN p.late_fine ELSE 0 END), 2) AS late_fines,
+               COUNT(DISTINCT CASE WHEN p.status = 'completed' THEN p.id END) AS completed_payments,
+               COUNT(DISTINCT f.id) AS total_fees
+        FROM fees f
+        LEFT JOIN payments p ON f.id = p.fee_id
+        WHERE f.session_id = {{p}} AND f.is_active = 1{where}
+        GROUP BY f.fee_type
+        ORDER BY f.fee_type
+    """, params)
+
+    monthly = []
+    if start_date and end_date:
+        month_params = [start_date, end_date, session_id]
+        dept_clause = ''
+        if department is not None:
+            dept_clause = f" AND (f.department IS NULL OR f.department = {p})"
+            month_params.append(department)
+        monthly = run_query(engine, conn, f"""
+            SELECT {{month_payments}} AS month, ROUND(SUM(p.total_amount), 2) AS amount, COUNT(*) AS payment_count
+            FROM payments p
+            JOIN fees f ON p.fee_id = f.id
+            WHERE p.status = 'completed' AND p.payment_date BETWEEN {{p}} AND {{p}} AND f.session_id = {{p}}{dept_clause}
+            GROUP BY 1 ORDER BY 1
+        """, month_params)
+
+    return {
+        'total_collected': round(sum(float(r['collected'] or 0) for r in breakdown), 2),
+        'total_pending': round(sum(float(r['pending'] or 0) for r in breakdown), 2),
+        'total_late_fines': round(sum(float(r['late_fines'] or 0) for r in breakdown), 2),
+        'payment_breakdown': breakdown,
+        'monthly_stats': monthly
+    }
+
+def active_session_id():
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM sessions WHERE is_active = 1 LIMIT 1")
+    row = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    if not row:
+        print("No active session found")
+        sys.exit(1)
+    return row[0]
+
+def normalize(value):
+    """Make MySQL and DuckDB results comparable (Decimal vs float, int periods vs strings)"""
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    if value is None or isinstance(value, str):
+        return value
+    try:
+        return round(float(value), 2)
+    except (TypeError, ValueError):
+        return str(value)
+
+def verify(store, session_id):
+    """Parity check: every report computed from the store must match the live SQL"""
+    store_db = open_store(store)
+    mysql_conn = create_connection()
+    if not mysql_conn:
+        sys.exit(1)
+
+    cases = [(f"trends {metric}/{period}", lambda e, c, m=metric, pd=period: trends(e, c, session_id, m, pd))
+             for metric, period in TREND_QUERIES]
+    cases.append(("performance", lambda e, c: performance(e, c, session_id)))
+    cases.append(("financial", lambda e, c: financial(e, c, session_id, '1900-01-01', '2100-12-31')))
+
+    failures = 0
+    for name, report in cases:
+        start = time.perf_counter()
+        expected = normalize(report('mysql', mysql_conn))
+        sql_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        actual = normalize(report('duckdb', store_db))
+        store_ms = (time.perf_counter() - start) * 1000
+        status = '✓' if expected == actual else '✗'
+        failures += expected != actual
+        print(f"  {status} {name:<28} mysql {sql_ms:8.1f} ms   store {store_ms:8.1f} ms")
+        if expected != actual:
+            print(f"      expected: {json.dumps(expected, default=str)[:300]}")
+            print(f"      actual:   {json.dumps(actual, default=str)[:300]}")
+
+    mysql_conn.close()
+    store_db.close()
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Export report tables to Parquet and query them with DuckDB")
+    parser.add_argument('--store', default=STORE_DIR, help="Parquet store directory")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = sub.add_parser('export', help="Incrementally export attendance, marks and payments")
+    export_parser.add_argument('--full', action='store_true', help="Discard the store and export everything")
+    export_parser.add_argument('--reconcile', action='store_true',
+                               help="Also drop rows deleted in MySQL (reads every id)")
+
+    report_parser = sub.add_parser('report', help="Compute a report from the store")
+    report_parser.add_argument('report', choices=['trends', 'performance', 'financial'])
+    report_parser.add_argument('--session-id', type=int)
+    report_parser.add_argument('--metric', choices=['attendance', 'performance', 'payments'], default='attendance')
+    report_parser.add_argument('--period', choices=['monthly', 'semester'], default='monthly')
+    report_parser.add_argument('--semester', type=int)
+    report_parser.add_argument('--department')
+    report_parser.add_argument('--subject-id', type=int)
+    report_parser.add_argument('--start-date')
+    report_parser.add_argument('--end-date')
+
+    verify_parser = sub.add_parser('verify', help="Compare store reports against the live SQL")
+    verify_parser.add_argument('--session-id', type=int)
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'export':
+            export(args.store, args.full, args.reconcile)
+        elif args.command == 'report':
+            session_id = args.session_id or active_session_id()
+            db = open_store(args.store)
+            start = time.perf_counter()
+            if args.report == 'trends':
+                result = trends('duckdb', db, session_id, args.metric, args.period)
+            elif args.report == 'performance':
+                result = performance('duckdb', db, session_id, args.semester, args.department, args.subject_id)
+            else:
+                result = financial('duckdb', db, session_id, args.start_date, args.end_date, args.department)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(json.dumps(normalize(result), indent=2))
+            print(f"({elapsed:.1f} ms)", file=sys.stderr)
+        else:
+            failures = verify(args.store, args.session_id or active_session_id())
+            if failures:
+                print(f"✗ {failures} report(s) differ from the live SQL")
+                sys.exit(1)
+            print("✓ All reports match the live SQL")
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Attendance Bitmaps for Student Portal
+Compact per-(student, subject, session) attendance history: a 1-bit "class
+held" flag and a 2-bit status for every day since the first recorded class,
+stored in attendance_bitmaps (migration 11) alongside the attendance table.
+A semester of one subject fits in ~70 bytes instead of 40-60 InnoDB rows, so
+summaries and shortage checks read kilobytes per student.
+
+Counting follows calculateAttendanceStats() in student/get_attendance.php:
+percentage = present / total classes.
+
+`sync` re-encodes the bitmaps touched since the last run (attendance writes
+always set marked_at). Deleting attendance rows leaves no timestamp, so run
+`sync --reconcile` periodically; deleting a student removes their bitmaps
+through the foreign key.
+
+Usage:
+    python database/attendance_bitmap.py convert [--session 3]
+    python database/attendance_bitmap.py sync [--reconcile]
+    python database/attendance_bitmap.py summary --student 42 [--session 3] [--from 2025-08-01 --to 2025-08-31]
+    python database/attendance_bitmap.py shortage --session 3 [--subject 7] [--threshold 75]
+"""
+
+import argparse
+import sys
+import os
+from datetime import date, datetime
+
+import numpy as np
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+STATUSES = ('present', 'absent', 'late', 'excused')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+MAX_DAYS = 1024  # VARBINARY(128) held bitset
+BATCH_SIZE = 1000
+SYNC_OVERLAP_SECONDS = 60  # How far behind synced_until each sync re-scans
+SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def pack_codes(codes):
+    """Pack 2-bit status codes four to a byte, first day in the high bits"""
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    return (padded.reshape(-1, 4) << SHIFTS).sum(axis=1, dtype=np.uint8).tobytes()
+
+def unpack_codes(data, days):
+    packed = np.frombuffer(data, dtype=np.uint8)
+    return ((packed[:, None] >> SHIFTS) & 3).ravel()[:days]
+
+class AttendanceBitmap:
+    """Held flags and status codes for one student, subject and session"""
+
+    def __init__(self, start_date, held=None, codes=None):
+        self.start_date = start_date
+        self.held = held if held is not None else np.zeros(0, dtype=bool)
+        self.codes = codes if codes is not None else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.held)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from (attendance_date, status) pairs"""
+        records = list(records)
+        if not records:
+            raise ValueError("No attendance records")
+        start = min(d for d, _ in records)
+        offsets = np.array([(d - start).days for d, _ in records], dtype=np.int64)
+        days = int(offsets.max()) + 1
+        if days > MAX_DAYS:
+            raise ValueError(f"Attendance spans {days} days (max {MAX_DAYS})")
+        bitmap = cls(start, np.zeros(days, dtype=bool), np.zeros(days, dtype=np.uint8))
+        bitmap.held[offsets] = True
+        bitmap.codes[offsets] = [STATUS_CODES[s] for _, s in records]
+        return bitmap
+
+    @classmethod
+    def from_row(cls, start_date, days, held, statuses):
+        held = np.unpackbits(np.frombuffer(held, dtype=np.uint8), count=days).astype(bool)
+        return cls(start_date, held, unpack_codes(statuses, days))
+
+    def to_row(self):
+        """Return (start_date, days, held bytes, status bytes) for attendance_bitmaps"""
+        return (self.start_date, len(self), np.packbits(self.held).tobytes(), pack_codes(self.codes))
+
+    def set(self, attendance_date, status):
+        """Record one class, growing the day range in either direction"""
+        offset = (attendance_date - self.start_date).days
+        if offset < 0 or not len(self):
+            grow = -offset if len(self) else 0
+            self.held = np.concatenate([np.zeros(grow, dtype=bool), self.held])
+            self.codes = np.concatenate([np.zeros(grow, dtype=np.uint8), self.codes])
+            self.start_date = attendance_date
+            offset = 0
+        if offset >= len(self):
+            grow = offset + 1 - len(self)
+            self.held = np.concatenate([self.held, np.zeros(grow, dtype=bool)])
+            self.codes = np.concatenate([self.codes, np.zeros(grow, dtype=np.uint8)])
+        if len(self) > MAX_DAYS:
+            raise ValueError(f"Attendance spans {len(self)} days (max {MAX_DAYS})")
+        self.held[offset] = True
+        self.codes[offset] = STATUS_CODES[status]
+
+    def _bounds(self, start=None, end=None):
+        lo = 0 if start is None else max(0, (start - self.start_date).days)
+        hi = len(self) if end is None else min(len(self), (end - self.start_date).days + 1)
+        return lo, max(lo, hi)
+
+    def slice(self, start=None, end=None):
+        """Sub-bitmap for an inclusive date range"""
+        lo, hi = self._bounds(start, end)
+        origin = date.fromordinal(self.start_date.toordinal() + lo)
+        return AttendanceBitmap(origin, self.held[lo:hi].copy(), self.codes[lo:hi].copy())
+
+    def counts(self, start=None, end=None):
+        """Stats in the shape of calculateAttendanceStats()"""
+        lo, hi = self._bounds(start, end)
+        tally = np.bincount(self.codes[lo:hi][self.held[lo:hi]], minlength=4)
+        return stats_from_tally(tally)
+
+    def records(self):
+        """Decode back to (attendance_date, status) pairs"""
+        base = self.start_date.toordinal()
+        return [(date.fromordinal(base + int(i)), STATUSES[self.codes[i]]) for i in np.flatnonzero(self.held)]
+
+def stats_from_tally(tally):
+    total = int(tally.sum())
+    present = int(tally[0])
+    return {
+        'total': total,
+        'present': present,
+        'absent': int(tally[1]),
+        'late': int(tally[2]),
+        'excused': int(tally[3]),
+        'percentage': round(present / total * 100, 2) if total else 0
+    }
+
+def batch_tally(bitmaps, start=None, end=None):
+    """Status counts for many bitmaps at once: returns an (n, 4) array"""
+    if not bitmaps:
+        return np.zeros((0, 4), dtype=np.int64)
+    origin = min(b.start_date for b in bitmaps).toordinal()
+    offsets = np.array([b.start_date.toordinal() - origin for b in bitmaps])
+    width = int(max(offsets[i] + len(b) for i, b in enumerate(bitmaps)))
+    held = np.zeros((len(bitmaps), width), dtype=bool)
+    codes = np.zeros((len(bitmaps), width), dtype=np.uint8)
+    for i, b in enumerate(bitmaps):
+        held[i, offsets[i]:offsets[i] + len(b)] = b.held
+        codes[i, offsets[i]:offsets[i] + len(b)] = b.codes
+
+    lo = 0 if start is None else max(0, start.toordinal() - origin)
+    hi = width if end is None else min(width, end.toordinal() - origin + 1)
+    held, codes = held[:, lo:hi], codes[:, lo:hi]
+    return np.stack([(held & (codes == code)).sum(axis=1) for code in range(4)], axis=1)
+
+def write_bitmaps(cursor, rows):
+    cursor.executemany("""
+        INSERT INTO attendance_bitmaps (student_id, subject_id, session_id, start_date, days, held, statuses)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE start_date = VALUES(start_date), days = VALUES(days),
+                                held = VALUES(held), statuses = VALUES(statuses)
+    """, rows)
+
+def stream_groups(cursor):
+    """Group rows ordered by (student, subject, date) into per-session record lists"""
+    prefix, groups = None, {}
+    while True:
+        rows = cursor.fetchmany(BATCH_SIZE * 10)
+        for student_id, subject_id, session_id, attendance_date, status in rows:
+            if (student_id, subject_id) != prefix:
+                yield from groups.items()
+                prefix, groups = (student_id, subject_id), {}
+            groups.setdefault((student_id, subject_id, session_id), []).append((attendance_date, status))
+        if not rows:
+            yield from groups.items()
+            return
+
+def convert(read_conn, write_conn, session_id=None, keys=None):
+    """Rebuild bitmaps from the attendance table (optionally one session or a key list)"""
+    read_cursor = read_conn.cursor()
+    write_cursor = write_conn.cursor()
+    sql = "SELECT student_id, subject_id, session_id, attendance_date, status FROM attendance"
+    params = ()
+    if session_id is not None:
+        sql += " WHERE session_id = %s"
+        params = (session_id,)
+    elif keys is not None:
+        sql += " WHERE (student_id, subject_id, session_id) IN (" + ", ".join(["(%s, %s, %s)"] * len(keys)) + ")"
+        params = tuple(v for key in keys for v in key)
+    # Walks unique_attendance (student_id, subject_id, attendance_date) in order
+    sql += " ORDER BY student_id, subject_id, attendance_date"
+    read_cursor.execute(sql, params)
+
+    pending, written, row_count = [], 0, 0
+    for key, records in stream_groups(read_cursor):
+        pending.append(key + AttendanceBitmap.from_records(records).to_row())
+        row_count += len(records)
+        if len(pending) >= BATCH_SIZE:
+            write_bitmaps(write_cursor, pending)
+            write_conn.commit()
+            written += len(pending)
+            pending = []
+    if pending:
+        write_bitmaps(write_cursor, pending)
+        write_conn.commit()
+        written += len(pending)
+    read_cursor.close()
+    write_cursor.close()
+    return written, row_count
+
+def sync(read_conn, write_conn):
+    """Rebuild bitmaps whose attendance rows were marked since the last sync.
+
+    marked_at is set before commit and has second precision, so rows can
+    become visible with a timestamp at or behind synced_until; the scan
+    starts SYNC_OVERLAP_SECONDS earlier and rebuilding a bitmap twice is
+    harmless.
+    """
+    cursor = write_conn.cursor()
+    cursor.execute("SELECT synced_until FROM attendance_bitmap_sync WHERE id = 1")
+    row = cursor.fetchone()
+    since = row[0] if row else None
+    if since is None:
+        cursor.execute("""
+            SELECT student_id, subject_id, session_id, MAX(marked_at) FROM attendance
+            GROUP BY student_id, subject_id, session_id
+        """)
+    else:
+        cursor.execute(f"""
+            SELECT student_id, subject_id, session_id, MAX(marked_at) FROM attendance
+            WHERE marked_at >= %s - INTERVAL {SYNC_OVERLAP_SECONDS} SECOND
+            GROUP BY student_id, subject_id, session_id
+        """, (since,))
+    rows = cursor.fetchall()
+    if not rows:
+        cursor.close()
+        return 0
+    keys = [row[:3] for row in rows]
+    until = max((row[3] for row in rows if row[3] is not None), default=None)
+    for start in range(0, len(keys), BATCH_SIZE):
+        convert(read_conn, write_conn, keys=keys[start:start + BATCH_SIZE])
+    if until is not None and (since is None or until > since):
+        cursor.execute("""
+            INSERT INTO attendance_bitmap_sync (id, synced_until) VALUES (1, %s)
+            ON DUPLICATE KEY UPDATE synced_until = VALUES(synced_until)
+        """, (until,))
+    write_conn.commit()
+    cursor.close()
+    return len(keys)
+
+def reconcile(read_conn, write_conn):
+    """Catch deleted attendance rows, which leave no marked_at behind for sync.
+
+    Compares each bitmap's class count with the attendance table: bitmaps
+    with no rows left are deleted, mismatches are rebuilt. Returns
+    (rebuilt, deleted).
+    """
+    cursor = read_conn.cursor()
+    cursor.execute("""
+        SELECT student_id, subject_id, session_id, COUNT(*) FROM attendance
+        GROUP BY student_id, subject_id, session_id
+    """)
+    counts = {tuple(row[:3]): row[3] for row in cursor.fetchall()}
+    cursor.execute("SELECT student_id, subject_id, session_id, days, held FROM attendance_bitmaps")
+    stale, orphaned = [], []
+    for student_id, subject_id, session_id, days, held in cursor.fetchall():
+        key = (student_id, subject_id, session_id)
+        recorded = int(np.unpackbits(np.frombuffer(held, dtype=np.uint8), count=days).sum())
+        expected = counts.pop(key, 0)
+        if not expected:
+            orphaned.append(key)
+        elif expected != recorded:
+            stale.append(key)
+    stale.extend(counts)  # Attendance with no bitmap yet
+    cursor.close()
+
+    for start in range(0, len(stale), BATCH_SIZE):
+        convert(read_conn, write_conn, keys=stale[start:start + BATCH_SIZE])
+    write_cursor = write_conn.cursor()
+    for start in range(0, len(orphaned), BATCH_SIZE):
+        write_cursor.executemany("""
+            DELETE FROM attendance_bitmaps WHERE student_id = %s AND subject_id = %s AND session_id = %s
+        """, orphaned[start:start + BATCH_SIZE])
+        write_conn.commit()
+    write_cursor.close()
+    return len(stale), len(orphaned)
+
+def load_bitmaps(cursor, where, params):
+    cursor.execute(f"""
+        SELECT student_id, subject_id, session_id, start_date, days, held, statuses
+        FROM attendance_bitmaps WHERE {where}
+    """, params)
+    return [(row[:3], AttendanceBitmap.from_row(*row[3:])) for row in cursor.fetchall()]
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain and query compact attendance bitmaps")
+    sub = parser.add_subparsers(dest='command', required=True)
+    convert_parser = sub.add_parser('convert', help="Rebuild bitmaps from the attendance table")
+    convert_parser.add_argument('--session', type=int)
+    sync_parser = sub.add_parser('sync', help="Fold in attendance marked since the last sync")
+    sync_parser.add_argument('--reconcile', action='store_true',
+                             help="Also compare every bitmap with attendance to catch deleted rows")
+
+    summary_parser = sub.add_parser('summary', help="Per-subject stats for one student")
+    summary_parser.add_argument('--student', type=int, required=True, help="students.id")
+    summary_parser.add_argument('--session', type=int)
+    summary_parser.add_argument('--from', dest='start', type=parse_date)
+    summary_parser.add_argument('--to', dest='end', type=parse_date)
+
+    shortage_parser = sub.add_parser('shortage', help="Students below the attendance threshold")
+    shortage_parser.add_argument('--session', type=int, required=True)
+    shortage_parser.add_argument('--subject', type=int)
+    shortage_parser.add_argument('--threshold', type=float, default=75.0)
+    shortage_parser.add_argument('--from', dest='start', type=parse_date)
+    shortage_parser.add_argument('--to', dest='end', type=parse_date)
+    args = parser.parse_args()
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+    write_conn = None
+    try:
+        if args.command in ('convert', 'sync'):
+            write_conn = create_connection()
+            if not write_conn:
+                sys.exit(1)
+            if args.command == 'convert':
+                written, row_count = convert(conn, write_conn, session_id=args.session)
+                print(f"✓ Encoded {row_count} attendance rows into {written} bitmaps")
+            else:
+                print(f"✓ Re-encoded {sync(conn, write_conn)} bitmaps")
+                if args.reconcile:
+                    rebuilt, deleted = reconcile(conn, write_conn)
+                    print(f"✓ Reconciled: rebuilt {rebuilt} bitmaps, deleted {deleted} with no attendance left")
+            return
+
+        cursor = conn.cursor()
+        if args.command == 'summary':
+            where, params = "student_id = %s", [args.student]
+            if args.session is not None:
+                where += " AND session_id = %s"
+                params.append(args.session)
+            for (_, subject_id, session_id), bitmap in load_bitmaps(cursor, where, tuple(params)):
+                stats = bitmap.counts(args.start, args.end)
+                print(f"  subject {subject_id} (session {session_id}): {stats['present']}/{stats['total']} present, "
+                      f"{stats['absent']} absent, {stats['late']} late, {stats['excused']} excused - {stats['percentage']}%")
+        else:
+            where, params = "session_id = %s", [args.session]
+            if args.subject is not None:
+                where += " AND subject_id = %s"
+                params.append(args.subject)
+            loaded = load_bitmaps(cursor, where, tuple(params))
+            tally = batch_tally([b for _, b in loaded], args.start, args.end)
+            total = tally.sum(axis=1)
+            percentage = np.divide(tally[:, 0] * 100.0, total, out=np.zeros(len(total)), where=total > 0)
+            short = np.flatnonzero((total > 0) & (percentage < args.threshold))
+            for i in short[np.argsort(percentage[short])]:
+                student_id, subject_id, _ = loaded[i][0]
+                print(f"  student {student_id}, subject {subject_id}: {percentage[i]:.2f}% ({tally[i, 0]}/{total[i]})")
+            print(f"{len(short)} of {len(loaded)} student-subject pairs below {args.threshold}%")
+        cursor.close()
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+        if write_conn:
+            write_conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Student Portal database tooling
+Times every phase of generate_realistic_data.py (get_random_grade, teachers,
+subjects, students, create_marks_and_attendance, create_fees_and_payments)
+and the SQL splitting/loading path behind execute_file/execute_sql_file
+(sql_loader.iter_statements and load_file) at several scales.
+
+Two backends:
+    fake   a recording cursor that accepts every statement without a server,
+           so the timings are the tools' own Python overhead
+    mysql  a scratch copy of the schema (<db>_bench) on the configured
+           server, so the timings include the round trips and server work
+
+Results are written to database/benchmarks/<commit>.json (with -dirty when
+the tree has uncommitted changes); `compare` reports the change per
+benchmark between two commits and exits 1 when one regressed by more than
+--threshold. Timings are only comparable on the same machine.
+
+Usage:
+    python database/benchmark_suite.py run [--backend fake|mysql|both] [--scales 100,500,1000] [--repeat 5]
+    python database/benchmark_suite.py compare BASE [HEAD] [--threshold 10]
+    python database/benchmark_suite.py list
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+import mysql.connector
+from mysql.connector import Error
+
+import generate_realistic_data as generator
+from sql_loader import iter_statements, load_file
+from value_pools import ValuePools
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks')
+BENCH_SCHEMA = DB_CONFIG['database'] + '_bench'
+DEFAULT_SCALES = '100,500,1000'
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 10.0
+GRADE_DRAWS_PER_STUDENT = 1000
+
+# Tables the generator writes, in dependency order
+GENERATED_TABLES = [
+    'users', 'admins', 'sessions', 'semesters', 'teachers', 'subjects',
+    'students', 'marks', 'attendance', 'fees', 'payments'
+]
+
+GENERATOR_PHASES = [
+    'create_admin', 'create_sessions_and_semesters', 'create_teachers', 'create_subjects',
+    'create_students', 'create_marks_and_attendance', 'create_fees_and_payments'
+]
+
+# Unique keys the generator relies on hitting: it skips duplicate attendance
+# dates by catching the error, so the fake cursor has to raise it too
+UNIQUE_KEYS = {
+    'attendance': (0, 1, 3),  # student_id, subject_id, attendance_date
+}
+
+INSERT_TABLE_RE = re.compile(r'^\s*INSERT\s+(?:IGNORE\s+)?INTO\s+`?(\w+)`?', re.I)
+
+def create_connection(database=None):
+    config = dict(DB_CONFIG, database=database or DB_CONFIG['database'])
+    try:
+        connection = mysql.connector.connect(**config)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                config['password'] = 'root'
+                connection = mysql.connector.connect(**config)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+# ---------------------------------------------------------------------------
+# Recording backend
+# ---------------------------------------------------------------------------
+
+def sql_literal(value):
+    """Render a bound parameter the way it would appear in a dump"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (date, datetime)):
+        return f"'{value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()}'"
+    return "'" + str(value).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+class RecordingCursor:
+    """Stands in for a MySQL cursor: counts statements, hands out ids, enforces UNIQUE_KEYS.
+
+    With a sink, every statement is also written out with its parameters
+    inlined, which is how the load benchmarks get a dump of realistic size.
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.statements = 0
+        self.bytes = 0
+        self.lastrowid = 0
+        self.rowcount = 0
+        self.with_rows = False
+        self.description = None
+        self._next_ids = {}
+        self._unique = {table: set() for table in UNIQUE_KEYS}
+
+    def execute(self, sql, params=None):
+        self.statements += 1
+        self.bytes += len(sql)
+        self.rowcount = 0
+        match = INSERT_TABLE_RE.match(sql)
+        if match:
+            table = match.group(1).lower()
+            if table in self._unique and params is not None:
+                key = tuple(params[i] for i in UNIQUE_KEYS[table])
+                if key in self._unique[table]:
+                    raise Error(msg=f"Duplicate entry for key '{table}' (recorded)", errno=1062)
+                self._unique[table].add(key)
+            self._next_ids[table] = self._next_ids.get(table, 0) + 1
+            self.lastrowid = self._next_ids[table]
+            self.rowcount = 1
+        if self.sink is not None:
+            if params is not None:
+                sql = sql % tuple(sql_literal(p) for p in params)
+            self.sink.write(' '.join(sql.split()) + ';\n')
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+class RecordingConnection:
+    """Connection wrapper around a single RecordingCursor, for load_file"""
+
+    def __init__(self):
+        self.recorder = RecordingCursor()
+
+    def cursor(self):
+        return self.recorder
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+# ---------------------------------------------------------------------------
+# Generator phases
+# ---------------------------------------------------------------------------
+
+def teacher_count(students):
+    # The generator's own ratio (100 per 1000 students), but never fewer than its
+    # default so create_subjects always finds teachers in every department
+    return max(100, students // 10)
+
+def reset_generator():
+    """Put the generator's random streams back where a fresh run starts them"""
+    random.seed(42)
+    pools = ValuePools(generator.pools.locale, generator.pools.seed)
+    pools.pools  # Load the cached pools outside the timed region
+    generator.pools = pools
+
+def run_phases(cursor, commit, students_count):
+    """Run the generator once; returns {phase: (seconds, statements)}"""
+    timings = {}
+
+    def timed(name, func, *args):
+        before = cursor.statements
+        start = time.perf_counter()
+        result = func(*args)
+        commit()
+        timings[name] = (time.perf_counter() - start, cursor.statements - before)
+        return result
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        timed('create_admin', generator.create_admin, cursor)
+        sessions = timed('create_sessions_and_semesters', generator.create_sessions_and_semesters, cursor)
+        teachers = timed('create_teachers', generator.create_teachers, cursor, teacher_count(students_count))
+        subjects = timed('create_subjects', generator.create_subjects, cursor, teachers, sessions)
+        students = timed('create_students', generator.create_students, cursor, sessions, students_count)
+        timed('create_marks_and_attendance', generator.create_marks_and_attendance,
+              cursor, students, subjects, sessions, teachers)
+        timed('create_fees_and_payments', generator.create_fees_and_payments, cursor, students, sessions)
+    return timings
+
+def bench_grades(students_count):
+    draws = students_count * GRADE_DRAWS_PER_STUDENT
+    random.seed(42)
+    get_random_grade = generator.get_random_grade
+    start = time.perf_counter()
+    for _ in range(draws):
+        get_random_grade()
+    return time.perf_counter() - start, draws
+
+def build_dump(students_count):
+    """SQL file with every statement the generator issues at this scale (cached per scale)"""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"dump_{students_count}.sql")
+    generator_path = os.path.join(BASE_DIR, 'generate_realistic_data.py')
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(generator_path):
+        return path
+    reset_generator()
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as sink:
+        run_phases(RecordingCursor(sink), lambda: None, students_count)
+    os.replace(tmp, path)
+    return path
+
+# ---------------------------------------------------------------------------
+# Scratch schema for the mysql backend
+# ---------------------------------------------------------------------------
+
+def prepare_bench_schema():
+    """Create <db>_bench with the live schema's tables (no foreign keys, no rows)"""
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT TABLE_NAME FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'
+    """, (DB_CONFIG['database'],))
+    tables = [row[0] for row in cursor.fetchall()]
+    missing = [table for table in GENERATED_TABLES if table not in tables]
+    if missing:
+        print(f"✗ {DB_CONFIG['database']} is missing {', '.join(missing)}; run the schema and migrations first")
+        sys.exit(1)
+    cursor.execute(f"DROP DATABASE IF EXISTS `{BENCH_SCHEMA}`")
+    cursor.execute(f"CREATE DATABASE `{BENCH_SCHEMA}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    for table in tables:
+        cursor.execute(f"CREATE TABLE `{BENCH_SCHEMA}`.`{table}` LIKE `{DB_CONFIG['database']}`.`{table}`")
+    cursor.close()
+    conn.close()
+
+def truncate_bench(conn):
+    cursor = conn.cursor()
+    cursor.execute('SET FOREIGN_KEY_CHECKS = 0')
+    for table in GENERATED_TABLES:
+        cursor.execute(f"TRUNCATE TABLE `{table}`")
+    cursor.execute('SET FOREIGN_KEY_CHECKS = 1')
+    cursor.close()
+
+class CountingCursor:
+    """Counts statements on a real cursor so both backends report the same columns"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.statements = 0
+
+    def execute(self, sql, params=None):
+        self.statements += 1
+        return self.cursor.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def summarize(samples, operations):
+    times = sorted(samples)
+    return {
+        'median': statistics.median(times),
+        'min': times[0],
+        'max': times[-1],
+        'runs': len(times),
+        'operations': operations,
+        'per_op_us': statistics.median(times) / operations * 1e6 if operations else None,
+    }
+
+def bench_backend(backend, scales, repeat, only):
+    results = {}
+
+    def wanted(name):
+        return not only or any(part in name for part in only)
+
+    for scale in scales:
+        print(f"\n[{backend}] {scale} students")
+        samples, operations = {}, {}
+
+        if wanted('get_random_grade') and backend == 'fake':
+            # Pure Python either way; recorded once under the fake backend
+            for _ in range(repeat):
+                elapsed, draws = bench_grades(scale)
+                samples.setdefault('get_random_grade', []).append(elapsed)
+                operations['get_random_grade'] = draws
+
+        if any(wanted(phase) for phase in GENERATOR_PHASES):
+            for _ in range(repeat):
+                reset_generator()
+                if backend == 'fake':
+                    timings = run_phases(RecordingCursor(), lambda: None, scale)
+                else:
+                    conn = create_connection(BENCH_SCHEMA)
+                    if not conn:
+                        sys.exit(1)
+                    truncate_bench(conn)
+                    cursor = CountingCursor(conn.cursor())
+                    timings = run_phases(cursor, conn.commit, scale)
+                    cursor.close()
+                    conn.close()
+                for phase, (elapsed, statements) in timings.items():
+                    if wanted(phase):
+                        samples.setdefault(phase, []).append(elapsed)
+                        operations[phase] = statements
+
+        if wanted('iter_statements') or wanted('load_file'):
+            dump = build_dump(scale)
+            if wanted('iter_statements') and backend == 'fake':
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    count = sum(1 for _ in iter_statements(dump))
+                    samples.setdefault('iter_statements', []).append(time.perf_counter() - start)
+                    operations['iter_statements'] = count
+            if wanted('load_file'):
+                for _ in range(repeat):
+                    if backend == 'fake':
+                        conn = RecordingConnection()
+                    else:
+                        conn = create_connection(BENCH_SCHEMA)
+                        if not conn:
+                            sys.exit(1)
+                        truncate_bench(conn)
+                    start = time.perf_counter()
+                    stats = load_file(conn, dump, ignore_errnos=(1062,))
+                    samples.setdefault('load_file', []).append(time.perf_counter() - start)
+                    operations['load_file'] = sum(entry[1] for entry in stats.tables.values())
+                    conn.close()
+
+        for name, times in samples.items():
+            key = f"{backend}/{name}/{scale}"
+            results[key] = summarize(times, operations.get(name))
+            r = results[key]
+            per_op = f"{r['per_op_us']:.2f} µs/op" if r['per_op_us'] is not None else ''
+            print(f"  {name:<32} median {r['median']:>9.4f}s  min {r['min']:>9.4f}s  {per_op}")
+    return results
+
+# ---------------------------------------------------------------------------
+# Result files
+# ---------------------------------------------------------------------------
+
+def git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=BASE_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def current_label():
+    commit = git('rev-parse', 'HEAD')
+    if commit is None:
+        return 'unknown', None, True
+    dirty = bool(git('status', '--porcelain', '--untracked-files=no'))
+    return commit[:12] + ('-dirty' if dirty else ''), commit, dirty
+
+def result_path(label):
+    return os.path.join(RESULTS_DIR, f"{label}.json")
+
+def resolve(ref):
+    """Result file for a path, a label, or anything git rev-parse understands"""
+    if os.path.isfile(ref):
+        return ref
+    if os.path.isfile(result_path(ref)):
+        return result_path(ref)
+    commit = git('rev-parse', '--verify', '--quiet', f"{ref}^{{commit}}")
+    if commit and os.path.isfile(result_path(commit[:12])):
+        return result_path(commit[:12])
+    print(f"✗ No benchmark results for {ref} in {RESULTS_DIR}")
+    sys.exit(1)
+
+def write_results(label, commit, dirty, args, results):
+    """Merge into the commit's file, so fake and mysql runs can be made separately"""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = result_path(label)
+    data = {'results': {}}
+    if os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+    data.update({
+        'commit': commit,
+        'dirty': dirty,
+        'subject': git('log', '-1', '--format=%s') if commit else None,
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.node()} {platform.machine()}",
+        'repeat': args.repeat,
+    })
+    data['results'].update(results)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    return path
+
+def compare(base_path, head_path, threshold, metric):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+    if base.get('machine') != head.get('machine'):
+        print(f"! Results come from different machines ({base.get('machine')} vs {head.get('machine')})")
+
+    print(f"Base {os.path.basename(base_path)}: {base.get('subject') or ''}")
+    print(f"Head {os.path.basename(head_path)}: {head.get('subject') or ''}")
+    print(f"\n{'Benchmark':<52} {'Base':>10} {'Head':>10} {'Change':>9}")
+    regressions = 0
+    for key in sorted(set(base['results']) | set(head['results'])):
+        before, after = base['results'].get(key), head['results'].get(key)
+        if before is None or after is None:
+            print(f"{key:<52} {'-' if before is None else format(before[metric], '.4f'):>10} "
+                  f"{'-' if after is None else format(after[metric], '.4f'):>10} {'':>9}  (only in one run)")
+            continue
+        change = (after[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0
+        flag = ''
+        if change > threshold:
+            flag = '  ✗ regression'
+            regressions += 1
+        elif change < -threshold:
+            flag = '  ✓ faster'
+        print(f"{key:<52} {before[metric]:>10.4f} {after[metric]:>10.4f} {change:>+8.1f}%{flag}")
+
+    if regressions:
+        print(f"\n✗ {regressions} benchmark(s) slower by more than {threshold:.0f}% ({metric})")
+        return 1
+    print(f"\n✓ No regressions beyond {threshold:.0f}% ({metric})")
+    return 0
+
+def list_results():
+    if not os.path.isdir(RESULTS_DIR):
+        print("No benchmark results yet")
+        return
+    files = sorted((f for f in os.listdir(RESULTS_DIR) if f.endswith('.json')),
+                   key=lambda f: os.path.getmtime(os.path.join(RESULTS_DIR, f)))
+    for name in files:
+        with open(os.path.join(RESULTS_DIR, name)) as f:
+            data = json.load(f)
+        backends = sorted({key.split('/', 1)[0] for key in data['results']})
+        print(f"{name[:-5]:<20} {data.get('recorded_at', ''):<20} {','.join(backends):<11} {data.get('subject') or ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data generator and SQL loader")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Run the benchmarks and record them for the current commit")
+    run_parser.add_argument('--backend', choices=['fake', 'mysql', 'both'], default='fake')
+    run_parser.add_argument('--scales', default=DEFAULT_SCALES, help="Comma-separated student counts")
+    run_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    run_parser.add_argument('--only', help="Comma-separated benchmark name filters, e.g. create_marks,load_file")
+    run_parser.add_argument('--label', help="Result file name instead of the commit id")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare two recorded runs")
+    compare_parser.add_argument('base', help="Commit, label or result file")
+    compare_parser.add_argument('head', nargs='?', help="Commit, label or result file (default: current tree)")
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="Percent slowdown counted as a regression")
+    compare_parser.add_argument('--metric', choices=['median', 'min'], default='median')
+
+    subparsers.add_parser('list', help="List recorded runs")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        list_results()
+        return
+    if args.command == 'compare':
+        head = args.head or current_label()[0]
+        sys.exit(compare(resolve(args.base), resolve(head), args.threshold, args.metric))
+
+    label, commit, dirty = current_label()
+    label = args.label or label
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+    only = [s.strip() for s in args.only.split(',')] if args.only else []
+    backends = ['fake', 'mysql'] if args.backend == 'both' else [args.backend]
+
+    results = {}
+    try:
+        for backend in backends:
+            if backend == 'mysql':
+                prepare_bench_schema()
+            results.update(bench_backend(backend, scales, args.repeat, only))
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+
+    path = write_results(label, commit, dirty, args, results)
+    print(f"\n✓ {len(results)} results written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Binlog Change Capture for Student Portal
+Tails the row binlog (docker/mysql/my.cnf sets binlog_format=ROW) for marks,
+attendance, payments and notices (plus student and user deletes, whose
+cascades the binlog does not carry) and applies the changes incrementally to the
+derived tables from migrations/09_add_cdc_derived_tables.sql:
+
+    student_attendance_summary  per-student/subject attendance counters
+    student_gpa_rollup          per-student/semester credit hours and points
+    student_payment_totals      per-student completed payment totals
+    department_notice_index     notices listed per department
+
+Row changes are folded into in-memory deltas and flushed together with the
+binlog checkpoint in one transaction, so a restart resumes exactly after the
+last applied transaction. The user -> student map used to resolve those
+cascades is kept in cdc_student_users (migrations/16_add_cdc_user_map.sql) and
+committed with the checkpoint, so it matches the binlog position rather than
+the live tables.
+
+Usage:
+    python database/binlog_cdc.py --rebuild   # full recompute, records the current binlog position
+    python database/binlog_cdc.py             # follow the binlog from the checkpoint
+
+Changing a subject's credit_hours does not reach the GPA rollup incrementally;
+run --rebuild after editing subjects.
+"""
+
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+
+import mysql.connector
+from mysql.connector import Error
+from pymysqlreplication import BinLogStreamReader
+from pymysqlreplication.event import HeartbeatLogEvent, XidEvent
+from pymysqlreplication.row_event import DeleteRowsEvent, UpdateRowsEvent, WriteRowsEvent
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+CONSUMER = 'derived_tables'
+SERVER_ID = 4029  # Must be unique among replicas of the server
+# students and users only matter for deletes: admin/*/delete.php deletes the user row and
+# the cascade to students/marks/attendance/payments is not written to the binlog
+SOURCE_TABLES = ['marks', 'attendance', 'payments', 'notices', 'students', 'users']
+DERIVED_TABLES = ['student_attendance_summary', 'student_gpa_rollup',
+                  'student_payment_totals', 'department_notice_index', 'cdc_student_users']
+
+FLUSH_EVERY_ROWS = 5000
+FLUSH_EVERY_SECONDS = 1.0
+
+ATTENDANCE_STATUSES = ('present', 'absent', 'late', 'excused')
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def binlog_position(cursor):
+    """Return the server's current (log_file, log_pos)"""
+    try:
+        cursor.execute("SHOW BINARY LOG STATUS")  # MySQL 8.4+
+    except Error:
+        cursor.execute("SHOW MASTER STATUS")
+    row = cursor.fetchone()
+    if not row:
+        raise RuntimeError("Binary logging is disabled on this server")
+    return row[0], row[1]
+
+def save_checkpoint(cursor, log_file, log_pos):
+    cursor.execute("""
+        INSERT INTO cdc_checkpoints (consumer, log_file, log_pos) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE log_file = VALUES(log_file), log_pos = VALUES(log_pos)
+    """, (CONSUMER, log_file, log_pos))
+
+def load_checkpoint(cursor):
+    cursor.execute("SELECT log_file, log_pos FROM cdc_checkpoints WHERE consumer = %s", (CONSUMER,))
+    return cursor.fetchone()
+
+def rebuild(conn):
+    """Recompute all derived tables from scratch and checkpoint the matching binlog position"""
+    cursor = conn.cursor()
+    try:
+        # Block writers only for the duration of the rebuild so the position matches the data
+        locks = [f"{t} READ" for t in ['marks', 'attendance', 'payments', 'notices', 'subjects', 'students']]
+        locks += [f"{t} WRITE" for t in DERIVED_TABLES + ['cdc_checkpoints']]
+        cursor.execute("LOCK TABLES " + ', '.join(locks))
+        log_file, log_pos = binlog_position(cursor)
+
+        for table in DERIVED_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+
+        cursor.execute("""
+            INSERT INTO student_attendance_summary
+                (student_id, subject_id, session_id, present_count, absent_count, late_count, excused_count)
+            SELECT student_id, subject_id, session_id,
+                   SUM(status = 'present'), SUM(status = 'absent'), SUM(status = 'late'), SUM(status = 'excused')
+            FROM attendance
+            GROUP BY student_id, subject_id, session_id
+        """)
+        cursor.execute("""
+            INSERT INTO student_gpa_rollup (student_id, session_id, semester, subject_count, credit_hours, credit_points)
+            SELECT marks.student_id, marks.session_id, marks.semester, COUNT(*),
+                   SUM(subjects.credit_hours), SUM(marks.grade_point * subjects.credit_hours)
+            FROM marks
+            JOIN subjects ON marks.subject_id = subjects.id
+            WHERE marks.grade_point IS NOT NULL
+            GROUP BY marks.student_id, marks.session_id, marks.semester
+        """)
+        cursor.execute("""
+            INSERT INTO student_payment_totals (student_id, payment_count, amount_paid, late_fine)
+            SELECT student_id, COUNT(*), SUM(amount_paid), SUM(COALESCE(late_fine, 0))
+            FROM payments
+            WHERE status = 'completed'
+            GROUP BY student_id
+        """)
+        cursor.execute("""
+            INSERT INTO department_notice_index
+                (department, notice_id, created_by, target_audience, semester, is_active, expiry_date, created_at)
+            SELECT COALESCE(department, ''), id, created_by, target_audience, semester, is_active, expiry_date, created_at
+            FROM notices
+        """)
+        cursor.execute("INSERT INTO cdc_student_users (student_id, user_id) SELECT id, user_id FROM students")
+
+        save_checkpoint(cursor, log_file, log_pos)
+        conn.commit()
+        print(f"✓ Derived tables rebuilt at {log_file}:{log_pos}")
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("UNLOCK TABLES")
+        cursor.close()
+
+class DeltaBuffer:
+    """Accumulates row-level changes as net deltas per derived key"""
+
+    def __init__(self, credit_hours, student_ids_by_user):
+        self.credit_hours = credit_hours
+        self.student_ids_by_user = student_ids_by_user
+        self.attendance = {}
+        self.gpa = {}
+        self.payments = {}
+        self.notices = {}
+        self.student_users = {}
+        self.deleted_students = set()
+        self.deleted_users = set()
+        self.rows = 0
+
+    def __len__(self):
+        return self.rows
+
+    def _add(self, bucket, key, delta):
+        current = bucket.get(key)
+        bucket[key] = delta if current is None else [a + b for a, b in zip(current, delta)]
+
+    def apply(self, table, row, sign, lookup_credit_hours):
+        """Fold one row image in (sign=+1) or out (sign=-1) of the deltas"""
+        self.rows += 1
+        if table == 'attendance':
+            counts = [sign if row['status'] == s else 0 for s in ATTENDANCE_STATUSES]
+            self._add(self.attendance, (row['student_id'], row['subject_id'], row['session_id']), counts)
+        elif table == 'marks':
+            if row['grade_point'] is None:
+                return
+            credits = self.credit_hours.get(row['subject_id'])
+            if credits is None:
+                credits = lookup_credit_hours(row['subject_id'])
+                if credits is None:
+                    return
+            points = Decimal(row['grade_point']) * credits
+            self._add(self.gpa, (row['student_id'], row['session_id'], row['semester']),
+                      [sign, sign * credits, sign * points])
+        elif table == 'payments':
+            if row['status'] != 'completed':
+                return
+            self._add(self.payments, row['student_id'],
+                      [sign, sign * Decimal(row['amount_paid']), sign * Decimal(row['late_fine'] or 0)])
+        elif table == 'notices':
+            # Last image wins; a delete is recorded as None
+            self.notices[row['id']] = row if sign > 0 else None
+        elif table == 'students':
+            # Update before-images unmap, after-images map; real deletes go through delete()
+            if sign > 0:
+                self.student_ids_by_user[row['user_id']] = row['id']
+                self.student_users[row['id']] = row['user_id']
+            elif self.student_ids_by_user.get(row['user_id']) == row['id']:
+                del self.student_ids_by_user[row['user_id']]
+                self.student_users[row['id']] = None
+
+    def delete(self, table, row):
+        """Record a deleted student or user; FK cascades are not in the binlog, so their derived rows go here"""
+        if table == 'students':
+            self.rows += 1
+            self.deleted_students.add(row['id'])
+            self.student_users[row['id']] = None
+            if self.student_ids_by_user.get(row['user_id']) == row['id']:
+                del self.student_ids_by_user[row['user_id']]
+        elif table == 'users':
+            self.rows += 1
+            # notices.created_by cascades as well
+            self.deleted_users.add(row['id'])
+            student_id = self.student_ids_by_user.pop(row['id'], None)
+            if student_id is not None:
+                self.deleted_students.add(student_id)
+                self.student_users[student_id] = None
+
+    def flush(self, cursor):
+        """Write all pending deltas; the caller commits together with the checkpoint"""
+        if self.attendance:
+            cursor.executemany("""
+                INSERT INTO student_attendance_summary
+                    (student_id, subject_id, session_id, present_count, absent_count, late_count, excused_count)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    present_count = present_count + VALUES(present_count),
+                    absent_count = absent_count + VALUES(absent_count),
+                    late_count = late_count + VALUES(late_count),
+                    excused_count = excused_count + VALUES(excused_count)
+            """, [(*key, *delta) for key, delta in self.attendance.items() if any(delta)])
+
+        if self.gpa:
+            cursor.executemany("""
+                INSERT INTO student_gpa_rollup (student_id, session_id, semester, subject_count, credit_hours, credit_points)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    subject_count = subject_count + VALUES(subject_count),
+                    credit_hours = credit_hours + VALUES(credit_hours),
+                    credit_points = credit_points + VALUES(credit_points)
+            """, [(*key, *delta) for key, delta in self.gpa.items() if any(delta)])
+
+        if self.payments:
+            cursor.executemany("""
+                INSERT INTO student_payment_totals (student_id, payment_count, amount_paid, late_fine)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    payment_count = payment_count + VALUES(payment_count),
+                    amount_paid = amount_paid + VALUES(amount_paid),
+                    late_fine = late_fine + VALUES(late_fine)
+            """, [(key, *delta) for key, delta in self.payments.items() if any(delta)])
+
+        if self.notices:
+            ids = list(self.notices)
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"DELETE FROM department_notice_index WHERE notice_id IN ({placeholders})", ids)
+            cursor.executemany("""
+                INSERT INTO department_notice_index
+                    (department, notice_id, created_by, target_audience, semester, is_active, expiry_date, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """, [(row['department'] or '', row['id'], row['created_by'], row['target_audience'], row['semester'],
+                   row['is_active'], row['expiry_date'], row['created_at'])
+                  for row in self.notices.values() if row is not None])
+
+        if self.deleted_students:
+            ids = list(self.deleted_students)
+            placeholders = ', '.join(['%s'] * len(ids))
+            for table in ['student_attendance_summary', 'student_gpa_rollup', 'student_payment_totals']:
+                cursor.execute(f"DELETE FROM {table} WHERE student_id IN ({placeholders})", ids)
+
+        if self.deleted_users:
+            ids = list(self.deleted_users)
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"DELETE FROM department_notice_index WHERE created_by IN ({placeholders})", ids)
+
+        if self.student_users:
+            removed = [(key,) for key, user_id in self.student_users.items() if user_id is None]
+            cursor.executemany("DELETE FROM cdc_student_users WHERE student_id = %s", removed)
+            cursor.executemany("""
+                INSERT INTO cdc_student_users (student_id, user_id) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE user_id = VALUES(user_id)
+            """, [(key, user_id) for key, user_id in self.student_users.items() if user_id is not None])
+
+        self.attendance.clear()
+        self.gpa.clear()
+        self.payments.clear()
+        self.notices.clear()
+        self.student_users.clear()
+        self.deleted_students.clear()
+        self.deleted_users.clear()
+        self.rows = 0
+
+def follow(conn):
+    """Stream the binlog from the stored checkpoint and keep the derived tables current"""
+    cursor = conn.cursor()
+    checkpoint = load_checkpoint(cursor)
+    if not checkpoint:
+        print("No checkpoint found. Run with --rebuild first.")
+        return
+
+    cursor.execute("SELECT id, credit_hours FROM subjects")
+    credit_hours = dict(cursor.fetchall())
+
+    # The map as of the checkpoint: the live students table has already lost rows
+    # whose user delete is still ahead of us in the binlog
+    cursor.execute("SELECT user_id, student_id FROM cdc_student_users")
+    student_ids_by_user = dict(cursor.fetchall())
+    # Release the startup snapshot; later reads must not be pinned to it
+    conn.commit()
+
+    # Subjects created after startup are looked up on their own autocommit connection, so
+    # each lookup sees the latest committed row rather than the delta transaction's snapshot
+    lookup_conn = create_connection()
+    if not lookup_conn:
+        return
+    lookup_conn.autocommit = True
+    lookup_cursor = lookup_conn.cursor()
+
+    def lookup_credit_hours(subject_id):
+        lookup_cursor.execute("SELECT credit_hours FROM subjects WHERE id = %s", (subject_id,))
+        row = lookup_cursor.fetchone()
+        if not row:
+            # Not cached: a retry on the next row may find it
+            print(f"  ✗ Subject {subject_id} not found; its marks are left out of the GPA rollup until --rebuild")
+            return None
+        credit_hours[subject_id] = row[0]
+        return row[0]
+
+    buffer = DeltaBuffer(credit_hours, student_ids_by_user)
+    log_file, log_pos = checkpoint
+    print(f"Following binlog from {log_file}:{log_pos}...")
+
+    stream = BinLogStreamReader(
+        connection_settings={'host': DB_CONFIG['host'], 'user': DB_CONFIG['user'],
+                             'passwd': DB_CONFIG['password']},
+        server_id=SERVER_ID,
+        only_schemas=[DB_CONFIG['database']],
+        only_tables=SOURCE_TABLES,
+        only_events=[WriteRowsEvent, UpdateRowsEvent, DeleteRowsEvent, XidEvent, HeartbeatLogEvent],
+        log_file=log_file,
+        log_pos=log_pos,
+        resume_stream=True,
+        blocking=True,
+        slave_heartbeat=FLUSH_EVERY_SECONDS
+    )
+
+    last_flush = time.monotonic()
+    committed = (log_file, log_pos)
+    in_transaction = False
+    applied = 0
+    try:
+        for event in stream:
+            if isinstance(event, (WriteRowsEvent, UpdateRowsEvent, DeleteRowsEvent)):
+                in_transaction = True
+
+            if isinstance(event, WriteRowsEvent):
+                for row in event.rows:
+                    buffer.apply(event.table, row['values'], 1, lookup_credit_hours)
+            elif isinstance(event, UpdateRowsEvent):
+                for row in event.rows:
+                    buffer.apply(event.table, row['before_values'], -1, lookup_credit_hours)
+                    buffer.apply(event.table, row['after_values'], 1, lookup_credit_hours)
+            elif isinstance(event, DeleteRowsEvent):
+                for row in event.rows:
+                    if event.table in ('students', 'users'):
+                        buffer.delete(event.table, row['values'])
+                    else:
+                        buffer.apply(event.table, row['values'], -1, lookup_credit_hours)
+            elif isinstance(event, XidEvent):
+                # Only transaction boundaries are safe restart points
+                committed = (stream.log_file, stream.log_pos)
+                in_transaction = False
+
+            # Never flush half a transaction: the checkpoint could not cover it
+            due = time.monotonic() - last_flush >= FLUSH_EVERY_SECONDS
+            if not in_transaction and committed != checkpoint and (len(buffer) >= FLUSH_EVERY_ROWS or due):
+                applied += len(buffer)
+                buffer.flush(cursor)
+                save_checkpoint(cursor, *committed)
+                conn.commit()
+                checkpoint = committed
+                last_flush = time.monotonic()
+                print(f"  Applied {applied} row changes, checkpoint {committed[0]}:{committed[1]}")
+    finally:
+        stream.close()
+        cursor.close()
+        lookup_cursor.close()
+        lookup_conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep derived tables current from the row binlog")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute derived tables and reset the checkpoint")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+
+    try:
+        if args.rebuild:
+            rebuild(conn)
+        else:
+            follow(conn)
+    except KeyboardInterrupt:
+        # Uncommitted deltas are replayed from the last checkpoint on restart
+        print("\nStopped")
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
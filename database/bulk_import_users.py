@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Bulk Onboarding Importer for Student Portal
+Imports student or teacher rosters from CSV/XLSX into users + students/teachers.
+
+Rows are streamed and validated with the same rules as the admin create APIs,
+deduplicated against existing accounts using sets prefetched in one query,
+hashed with real bcrypt across a process pool and inserted in batched
+transactions.
+
+Usage:
+    python database/bulk_import_users.py students intake_2025.csv
+    python database/bulk_import_users.py teachers faculty.xlsx --default-password teacher123
+
+Student columns: username, email, first_name, gender, semester, department
+                 [password, last_name, student_id, date_of_birth, phone, address,
+                  enrollment_date, program, batch_year, guardian_name,
+                  guardian_phone, guardian_email]
+Teacher columns: username, email, first_name, gender, department
+                 [password, last_name, teacher_id, date_of_birth, phone, address,
+                  joining_date, designation, qualification, specialization,
+                  experience_years]
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import bcrypt
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+# Same cost as PHP's password_hash(PASSWORD_DEFAULT)
+BCRYPT_ROUNDS = 10
+BATCH_SIZE = 500
+
+USERNAME_RE = re.compile(r'^[a-zA-Z0-9_\-. ]{3,50}$')
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+REQUIRED_FIELDS = {
+    'students': ['username', 'email', 'first_name', 'gender', 'semester', 'department'],
+    'teachers': ['username', 'email', 'first_name', 'gender', 'department']
+}
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def hash_password(password):
+    """Hash a password with bcrypt in the $2y$ format PHP's password_verify expects"""
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+    return '$2y$' + hashed.decode('ascii')[4:]
+
+def iter_rows(path):
+    """Stream roster rows as dicts from a CSV or XLSX file"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        # openpyxl is only needed for spreadsheets, so import it lazily
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(h).strip().lower() if h is not None else '' for h in next(rows, [])]
+            for values in rows:
+                if values is None or all(v is None for v in values):
+                    continue
+                yield {k: v for k, v in zip(header, values) if k}
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            reader.fieldnames = [h.strip().lower() for h in reader.fieldnames or []]
+            for row in reader:
+                yield row
+
+def clean(value):
+    """Normalize a spreadsheet cell to a stripped string or None"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+def valid_date(value):
+    if not value or not DATE_RE.match(value):
+        return False
+    try:
+        parsed = datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return False
+    return 1900 <= parsed.year <= 2100
+
+def valid_phone(value):
+    digits = re.sub(r'[^0-9]', '', value)
+    return 10 <= len(digits) <= 15
+
+def validate_row(raw, role, default_password):
+    """Validate one roster row, returning (record, None) or (None, error message)"""
+    row = {k: clean(v) for k, v in raw.items()}
+
+    missing = [f for f in REQUIRED_FIELDS[role] if not row.get(f)]
+    if missing:
+        return None, f"Missing required fields: {', '.join(missing)}"
+
+    row['password'] = row.get('password') or default_password
+    row['gender'] = row['gender'].lower()
+    row['email'] = row['email'].lower()
+    row['last_name'] = row.get('last_name') or ''
+    row['date_of_birth'] = row.get('date_of_birth') or '2000-01-01'
+
+    if not USERNAME_RE.match(row['username']):
+        return None, "Invalid username format. Must be 3-50 alphanumeric characters"
+    if not row['password'] or not 8 <= len(row['password']) <= 255:
+        return None, "Password must be at least 8 characters"
+    if not EMAIL_RE.match(row['email']):
+        return None, "Invalid email format"
+    if row.get('phone') and not valid_phone(row['phone']):
+        return None, "Invalid phone number format"
+    if row['gender'] not in ('male', 'female', 'other'):
+        return None, "Invalid gender. Must be male, female, or other"
+    if not valid_date(row['date_of_birth']):
+        return None, "Invalid date of birth format. Use YYYY-MM-DD"
+
+    if role == 'students':
+        row['enrollment_date'] = row.get('enrollment_date') or date.today().isoformat()
+        if not valid_date(row['enrollment_date']):
+            return None, "Invalid enrollment date format. Use YYYY-MM-DD"
+        try:
+            row['semester'] = int(row['semester'])
+            row['batch_year'] = int(row.get('batch_year') or date.today().year)
+        except ValueError:
+            return None, "Semester and batch year must be numbers"
+        if not 1 <= row['semester'] <= 6:
+            return None, "Invalid semester. Must be between 1 and 6"
+        if not 2000 <= row['batch_year'] <= date.today().year + 1:
+            return None, "Invalid batch year"
+        row['program'] = row.get('program') or 'Bachelors'
+    else:
+        row['joining_date'] = row.get('joining_date') or date.today().isoformat()
+        if not valid_date(row['joining_date']):
+            return None, "Invalid joining date format. Use YYYY-MM-DD"
+        try:
+            row['experience_years'] = int(row['experience_years']) if row.get('experience_years') else None
+        except ValueError:
+            return None, "Experience years must be a number"
+
+    return row, None
+
+def prefetch_existing(cursor, role):
+    """Load existing usernames, emails and profile ids once for in-memory dedupe"""
+    cursor.execute("SELECT username, email FROM users")
+    usernames, emails = set(), set()
+    for username, email in cursor:
+        usernames.add(username.lower())
+        emails.add(email.lower())
+
+    profile_column = 'student_id' if role == 'students' else 'teacher_id'
+    cursor.execute(f"SELECT {profile_column} FROM {role}")
+    profile_ids = {row[0].upper() for row in cursor}
+    return usernames, emails, profile_ids
+
+def next_profile_number(cursor, role):
+    """Return the next free numeric suffix for generated STD/TCH ids"""
+    prefix, column = ('STD', 'student_id') if role == 'students' else ('TCH', 'teacher_id')
+    cursor.execute(f"""
+        SELECT MAX(CAST(SUBSTRING({column}, 4) AS UNSIGNED)) FROM {role}
+        WHERE {column} REGEXP '^{prefix}[0-9]+$'
+    """)
+    return (cursor.fetchone()[0] or 0) + 1
+
+def get_active_session_id(cursor):
+    cursor.execute("SELECT id FROM sessions WHERE is_active = 1 ORDER BY id DESC LIMIT 1")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def insert_batch(conn, role, batch, hashes, session_id):
+    """Insert one batch of users and their profiles in a single transaction"""
+    cursor = conn.cursor()
+    try:
+        cursor.executemany("""
+            INSERT INTO users (username, password, email, role, status)
+            VALUES (%s, %s, %s, %s, 'active')
+        """, [(r['username'], h, r['email'], role[:-1]) for r, h in zip(batch, hashes)])
+
+        # Map usernames back to ids instead of assuming consecutive AUTO_INCREMENT values
+        placeholders = ', '.join(['%s'] * len(batch))
+        cursor.execute(f"SELECT username, id FROM users WHERE username IN ({placeholders})",
+                       [r['username'] for r in batch])
+        user_ids = {username.lower(): user_id for username, user_id in cursor.fetchall()}
+
+        if role == 'students':
+            cursor.executemany("""
+                INSERT INTO students (user_id, student_id, first_name, last_name, date_of_birth,
+                                     gender, phone, address, enrollment_date, session_id, semester,
+                                     department, program, batch_year, guardian_name, guardian_phone,
+                                     guardian_email)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, [(user_ids[r['username'].lower()], r['student_id'], r['first_name'], r['last_name'],
+                   r['date_of_birth'], r['gender'], r.get('phone'), r.get('address'),
+                   r['enrollment_date'], session_id, r['semester'], r['department'], r['program'],
+                   r['batch_year'], r.get('guardian_name'), r.get('guardian_phone'),
+                   r.get('guardian_email')) for r in batch])
+        else:
+            cursor.executemany("""
+                INSERT INTO teachers (user_id, teacher_id, first_name, last_name, date_of_birth,
+                                     gender, phone, address, joining_date, department, designation,
+                                     qualification, specialization, experience_years)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, [(user_ids[r['username'].lower()], r['teacher_id'], r['first_name'], r['last_name'],
+                   r['date_of_birth'], r['gender'], r.get('phone'), r.get('address'),
+                   r['joining_date'], r['department'], r.get('designation') or 'Lecturer',
+                   r.get('qualification'), r.get('specialization'), r['experience_years'])
+                  for r in batch])
+        conn.commit()
+    except Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def import_roster(path, role, default_password=None, batch_size=BATCH_SIZE, workers=None, dry_run=False):
+    """Validate, dedupe, hash and insert a roster file; returns (imported, rejected)"""
+    conn = create_connection()
+    if not conn:
+        return 0, []
+
+    cursor = conn.cursor()
+    usernames, emails, profile_ids = prefetch_existing(cursor, role)
+    session_id = get_active_session_id(cursor) if role == 'students' else None
+    next_number = next_profile_number(cursor, role)
+    cursor.close()
+
+    if role == 'students' and session_id is None:
+        print("No active academic session found")
+        conn.close()
+        return 0, []
+
+    workers = workers or os.cpu_count() or 1
+    profile_key = 'student_id' if role == 'students' else 'teacher_id'
+    prefix = 'STD' if role == 'students' else 'TCH'
+    imported = 0
+    rejected = []
+    batch = []
+
+    def flush(pool):
+        nonlocal imported
+        if not batch:
+            return
+        # bcrypt is CPU-bound, so spread the batch across worker processes
+        hashes = list(pool.map(hash_password, [r['password'] for r in batch],
+                               chunksize=max(1, len(batch) // (4 * workers))))
+        if not dry_run:
+            insert_batch(conn, role, batch, hashes, session_id)
+        imported += len(batch)
+        print(f"  Imported {imported} {role}...")
+        batch.clear()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Line 1 is the header row
+            for line_no, raw in enumerate(iter_rows(path), start=2):
+                record, error = validate_row(raw, role, default_password)
+                if error:
+                    rejected.append((line_no, error))
+                    continue
+
+                if record['username'].lower() in usernames:
+                    rejected.append((line_no, f"Username already exists: {record['username']}"))
+                    continue
+                if record['email'] in emails:
+                    rejected.append((line_no, f"Email already exists: {record['email']}"))
+                    continue
+
+                if not record.get(profile_key):
+                    record[profile_key] = f"{prefix}{next_number:04d}"
+                    next_number += 1
+                if record[profile_key].upper() in profile_ids:
+                    rejected.append((line_no, f"{profile_key} already exists: {record[profile_key]}"))
+                    continue
+
+                # Register immediately so duplicates inside the file are caught too
+                usernames.add(record['username'].lower())
+                emails.add(record['email'])
+                profile_ids.add(record[profile_key].upper())
+                batch.append(record)
+
+                if len(batch) >= batch_size:
+                    flush(pool)
+            flush(pool)
+    finally:
+        conn.close()
+
+    return imported, rejected
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import student or teacher rosters")
+    parser.add_argument('role', choices=['students', 'teachers'])
+    parser.add_argument('path', help="CSV or XLSX roster file")
+    parser.add_argument('--default-password', help="Password for rows without a password column")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help="Hashing processes (default: CPU count)")
+    parser.add_argument('--dry-run', action='store_true', help="Validate and hash without inserting")
+    args = parser.parse_args()
+
+    print(f"Importing {args.role} from {args.path}...")
+    start = time.perf_counter()
+    try:
+        imported, rejected = import_roster(args.path, args.role, args.default_password,
+                                           args.batch_size, args.workers, args.dry_run)
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    for line_no, error in rejected:
+        print(f"  ✗ Line {line_no}: {error}")
+    print(f"✓ Imported {imported} {args.role} in {elapsed:.1f}s ({len(rejected)} rejected)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Fee Dues and Late Fines for Student Portal
+Computes every student's unpaid fees and capped late fines for a session in
+one set-based INSERT ... SELECT into pending_dues (migration 14), and sends
+overdue reminders as bulk fee_notifications rows, one per fee and
+department/semester group. The admin pending-students screen reads
+pending_dues instead of joining students x fees x payments per request.
+
+A fee is pending for a student when it applies to them (same session, and the
+fee's department/semester is NULL or theirs) and they have no completed
+payment for it. Late fines follow calculateLateFine() in
+backend/includes/functions.php: days past due x late_fine_per_day, capped at
+max_late_fine.
+
+Usage:
+    python database/fee_dues.py refresh [--session 3] [--as-of 2025-09-01]
+    python database/fee_dues.py notify [--session 3] [--remind-days 7] [--sent-by 1]
+    python database/fee_dues.py report [--session 3]
+
+Schedule refresh followed by notify once a day (e.g. from cron).
+"""
+
+import argparse
+import sys
+import os
+from datetime import date, datetime
+
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+REMIND_DAYS = 7
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def active_session(cursor):
+    cursor.execute("SELECT id FROM sessions WHERE is_active = 1 LIMIT 1")
+    rows = cursor.fetchall()
+    return rows[0][0] if rows else None
+
+def refresh(conn, session_id, as_of):
+    """Recompute the session's pending dues as of a date; returns rows removed as paid"""
+    cursor = conn.cursor()
+    stamp = datetime.now().replace(microsecond=0)
+    cursor.execute("""
+        INSERT INTO pending_dues (student_id, fee_id, session_id, department, semester,
+                                  amount, due_date, days_overdue, late_fine, computed_at)
+        SELECT s.id, f.id, f.session_id, s.department, s.semester, f.amount, f.due_date,
+               GREATEST(DATEDIFF(%s, f.due_date), 0),
+               ROUND(LEAST(GREATEST(DATEDIFF(%s, f.due_date), 0) * COALESCE(f.late_fine_per_day, 0),
+                           COALESCE(f.max_late_fine, 0)), 2),
+               %s
+        FROM fees f
+        JOIN students s ON s.session_id = f.session_id
+            AND (f.department IS NULL OR s.department = f.department)
+            AND (f.semester IS NULL OR s.semester = f.semester)
+        LEFT JOIN payments p ON p.student_id = s.id AND p.fee_id = f.id AND p.status = 'completed'
+        WHERE f.session_id = %s AND f.is_active = 1 AND p.id IS NULL
+        ON DUPLICATE KEY UPDATE
+            session_id = VALUES(session_id),
+            department = VALUES(department),
+            semester = VALUES(semester),
+            amount = VALUES(amount),
+            due_date = VALUES(due_date),
+            days_overdue = VALUES(days_overdue),
+            late_fine = VALUES(late_fine),
+            computed_at = VALUES(computed_at)
+    """, (as_of, as_of, stamp, session_id))
+    # Rows this pass did not touch were paid, deactivated or no longer apply
+    cursor.execute("DELETE FROM pending_dues WHERE session_id = %s AND computed_at <> %s", (session_id, stamp))
+    removed = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    return removed
+
+def default_sender(cursor):
+    cursor.execute("SELECT id FROM users WHERE role = 'admin' ORDER BY id LIMIT 1")
+    rows = cursor.fetchall()
+    return rows[0][0] if rows else None
+
+def notify(conn, session_id, sent_by, remind_days=REMIND_DAYS):
+    """Record one overdue notification per fee and department/semester group; returns (groups, students)"""
+    cursor = conn.cursor()
+    stamp = datetime.now().replace(microsecond=0)
+    due = """pd.session_id = %s AND pd.days_overdue > 0
+             AND (pd.notified_at IS NULL OR pd.notified_at <= %s - INTERVAL %s DAY)"""
+    cursor.execute(f"""
+        INSERT INTO fee_notifications (fee_id, title, message, target_department, target_semester, sent_count, sent_by)
+        SELECT pd.fee_id,
+               CONCAT('Fee overdue: ', f.fee_name),
+               CONCAT(f.fee_name, ' (₹', FORMAT(f.amount, 2), ') was due on ',
+                      DATE_FORMAT(f.due_date, '%%d %%b %%Y'), ' and is ', MAX(pd.days_overdue),
+                      ' days overdue. Late fine so far: ₹', FORMAT(MAX(pd.late_fine), 2),
+                      ' (₹', FORMAT(COALESCE(f.late_fine_per_day, 0), 2), ' per day, up to ₹',
+                      FORMAT(COALESCE(f.max_late_fine, 0), 2),
+                      '). Please pay at the earliest.'),
+               pd.department, pd.semester, COUNT(*), %s
+        FROM pending_dues pd
+        JOIN fees f ON f.id = pd.fee_id
+        WHERE {due}
+        GROUP BY pd.fee_id, pd.department, pd.semester
+    """, (sent_by, session_id, stamp, remind_days))
+    groups = cursor.rowcount
+    cursor.execute(f"UPDATE pending_dues pd SET notified_at = %s WHERE {due}",
+                   (stamp, session_id, stamp, remind_days))
+    students = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    return groups, students
+
+def report(cursor, session_id):
+    cursor.execute("""
+        SELECT department, semester, COUNT(*), SUM(days_overdue > 0), SUM(amount), SUM(late_fine)
+        FROM pending_dues
+        WHERE session_id = %s
+        GROUP BY department, semester
+        ORDER BY department, semester
+    """, (session_id,))
+    rows = cursor.fetchall()
+    print(f"{'Department':<30} {'Sem':>3} {'Pending':>8} {'Overdue':>8} {'Amount':>14} {'Late fines':>12}")
+    for department, semester, pending, overdue, amount, fines in rows:
+        print(f"{department or '-':<30} {semester:>3} {pending:>8} {int(overdue):>8} {amount:>14,.2f} {fines:>12,.2f}")
+    if rows:
+        print(f"{'Total':<34} {sum(r[2] for r in rows):>8} {sum(int(r[3]) for r in rows):>8} "
+              f"{sum(r[4] for r in rows):>14,.2f} {sum(r[5] for r in rows):>12,.2f}")
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize pending fee dues and send overdue notifications")
+    sub = parser.add_subparsers(dest='command', required=True)
+    refresh_parser = sub.add_parser('refresh', help="Recompute pending dues and late fines")
+    refresh_parser.add_argument('--session', type=int, help="sessions.id (default: active session)")
+    refresh_parser.add_argument('--as-of', type=parse_date, default=date.today(), help="Accrue fines up to this date")
+    notify_parser = sub.add_parser('notify', help="Record overdue notifications for unnotified students")
+    notify_parser.add_argument('--session', type=int)
+    notify_parser.add_argument('--remind-days', type=int, default=REMIND_DAYS,
+                               help="Days before the same student is reminded again")
+    notify_parser.add_argument('--sent-by', type=int, help="users.id recorded as sender (default: first admin)")
+    report_parser = sub.add_parser('report', help="Pending dues per department and semester")
+    report_parser.add_argument('--session', type=int)
+    args = parser.parse_args()
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+
+    try:
+        cursor = conn.cursor()
+        session_id = args.session or active_session(cursor)
+        if session_id is None:
+            print("✗ No active session found; pass --session")
+            sys.exit(1)
+
+        if args.command == 'refresh':
+            removed = refresh(conn, session_id, args.as_of)
+            print(f"✓ Refreshed pending dues for session {session_id} as of {args.as_of} ({removed} settled rows removed)")
+            report(cursor, session_id)
+        elif args.command == 'notify':
+            sent_by = args.sent_by or default_sender(cursor)
+            if sent_by is None:
+                print("✗ No admin user to record as sender; pass --sent-by")
+                sys.exit(1)
+            groups, students = notify(conn, session_id, sent_by, args.remind_days)
+            print(f"✓ Recorded {groups} fee notifications covering {students} overdue students")
+        else:
+            report(cursor, session_id)
+        cursor.close()
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Fast Fixture Reset for Student Portal
+Snapshots the baseline state of the test tables once and restores only the
+tables whose checksum changed, instead of deleting and reinserting users
+on every run. The table set is every table whose foreign keys reach the
+fixture roots (read from information_schema, so new tables are picked up),
+plus the derived tables that hold per-student rows without a foreign key.
+
+Usage:
+    python database/fixture_reset.py snapshot [--seed-users]
+    python database/fixture_reset.py restore
+    python database/fixture_reset.py status
+"""
+
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration (DB_PASSWORD skips the empty/'root' password probe)
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+# Schema holding the baseline copies of the fixture tables
+SNAPSHOT_SCHEMA = DB_CONFIG['database'] + '_fixture'
+CHECKSUM_TABLE = '_fixture_checksums'
+
+# Tables the fixtures are seeded into; anything whose foreign keys reach them is included
+FIXTURE_ROOTS = ['users', 'students', 'subjects', 'fees', 'sessions']
+
+# Maintained from the fixture tables by the database/ jobs but not linked by foreign
+# keys (migrations 09-16); restored with them so rollups and sync positions stay consistent
+DERIVED_TABLES = [
+    'student_attendance_summary', 'student_gpa_rollup', 'student_payment_totals',
+    'department_notice_index', 'cdc_student_users', 'cdc_checkpoints',
+    'attendance_bitmap_sync', 'upload_blobs', 'upload_refs'
+]
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        # Try with password 'root' if empty failed (only when not set explicitly)
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ:
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def existing_tables(cursor, tables):
+    """Return the fixture tables that exist in the live schema, in order"""
+    placeholders = ', '.join(['%s'] * len(tables))
+    cursor.execute(f"""
+        SELECT table_name FROM information_schema.tables
+        WHERE table_schema = %s AND table_name IN ({placeholders})
+    """, (DB_CONFIG['database'], *tables))
+    found = {row[0] for row in cursor.fetchall()}
+    return [t for t in tables if t in found]
+
+def fixture_tables(cursor):
+    """Return the roots, every table whose foreign keys reach them, and the derived tables"""
+    schema = DB_CONFIG['database']
+    cursor.execute("""
+        SELECT DISTINCT table_name, referenced_table_name FROM information_schema.key_column_usage
+        WHERE table_schema = %s AND referenced_table_schema = %s AND referenced_table_name IS NOT NULL
+    """, (schema, schema))
+    children = {}
+    for table, parent in cursor.fetchall():
+        children.setdefault(parent, set()).add(table)
+
+    # Breadth-first, so teachers -> teacher_subjects and the like are found transitively
+    tables = list(FIXTURE_ROOTS)
+    for table in tables:
+        tables.extend(sorted(children.get(table, set()) - set(tables)))
+    tables.extend(t for t in DERIVED_TABLES if t not in tables)
+    return existing_tables(cursor, tables)
+
+def table_checksums(cursor, schema, tables):
+    """Checksum all tables with a single CHECKSUM TABLE statement"""
+    if not tables:
+        return {}
+    cursor.execute("CHECKSUM TABLE " + ', '.join(f"`{schema}`.`{t}`" for t in tables))
+    # Result rows look like ('studentportal.users', 123456)
+    return {row[0].split('.', 1)[1]: row[1] for row in cursor.fetchall()}
+
+def take_snapshot(conn, tables=None):
+    """Copy the current state of the fixture tables into the snapshot schema"""
+    cursor = conn.cursor()
+    try:
+        tables = existing_tables(cursor, tables) if tables else fixture_tables(cursor)
+        live = DB_CONFIG['database']
+
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{SNAPSHOT_SCHEMA}`")
+        for table in tables:
+            cursor.execute(f"DROP TABLE IF EXISTS `{SNAPSHOT_SCHEMA}`.`{table}`")
+            cursor.execute(f"CREATE TABLE `{SNAPSHOT_SCHEMA}`.`{table}` LIKE `{live}`.`{table}`")
+            cursor.execute(f"INSERT INTO `{SNAPSHOT_SCHEMA}`.`{table}` SELECT * FROM `{live}`.`{table}`")
+
+        # Baseline checksums are taken from the live tables so restore can compare like with like
+        checksums = table_checksums(cursor, live, tables)
+        cursor.execute(f"DROP TABLE IF EXISTS `{SNAPSHOT_SCHEMA}`.`{CHECKSUM_TABLE}`")
+        cursor.execute(f"""
+            CREATE TABLE `{SNAPSHOT_SCHEMA}`.`{CHECKSUM_TABLE}` (
+                table_name VARCHAR(64) PRIMARY KEY,
+                checksum BIGINT UNSIGNED,
+                position INT NOT NULL
+            ) ENGINE=InnoDB
+        """)
+        cursor.executemany(f"""
+            INSERT INTO `{SNAPSHOT_SCHEMA}`.`{CHECKSUM_TABLE}` (table_name, checksum, position)
+            VALUES (%s, %s, %s)
+        """, [(t, checksums.get(t), i) for i, t in enumerate(tables)])
+        conn.commit()
+        print(f"✓ Snapshot of {len(tables)} tables stored in {SNAPSHOT_SCHEMA}")
+        return checksums
+    finally:
+        cursor.close()
+
+def load_baseline(cursor):
+    """Return the stored baseline checksums as an ordered dict, or None"""
+    try:
+        cursor.execute(f"""
+            SELECT table_name, checksum FROM `{SNAPSHOT_SCHEMA}`.`{CHECKSUM_TABLE}`
+            ORDER BY position
+        """)
+    except Error as e:
+        if e.errno in (1049, 1146):  # Unknown database / table
+            return None
+        raise
+    return dict(cursor.fetchall())
+
+def changed_tables(cursor, baseline):
+    """Return the fixture tables whose live checksum differs from the baseline"""
+    current = table_checksums(cursor, DB_CONFIG['database'], list(baseline))
+    return [t for t, checksum in baseline.items() if current.get(t) != checksum]
+
+def restore_snapshot(conn):
+    """Restore only the tables that changed since the snapshot"""
+    cursor = conn.cursor()
+    try:
+        baseline = load_baseline(cursor)
+        if baseline is None:
+            print("No fixture snapshot found. Run 'snapshot' first.")
+            return None
+
+        dirty = changed_tables(cursor, baseline)
+        if not dirty:
+            return []
+
+        live = DB_CONFIG['database']
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        try:
+            for table in dirty:
+                # TRUNCATE also resets AUTO_INCREMENT, so re-inserted ids match the baseline
+                cursor.execute(f"TRUNCATE TABLE `{live}`.`{table}`")
+                cursor.execute(f"INSERT INTO `{live}`.`{table}` SELECT * FROM `{SNAPSHOT_SCHEMA}`.`{table}`")
+            conn.commit()
+        finally:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        return dirty
+    finally:
+        cursor.close()
+
+@contextmanager
+def fixture_transaction(conn):
+    """Run a test inside a transaction that is always rolled back
+
+    Only covers DML; DDL and TRUNCATE commit implicitly, so tests that use
+    them should rely on restore_snapshot() instead.
+    """
+    conn.start_transaction()
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+
+@contextmanager
+def fixture_savepoint(conn, name='fixture_test'):
+    """Roll back to a savepoint after a nested test step inside fixture_transaction()"""
+    cursor = conn.cursor()
+    cursor.execute(f"SAVEPOINT {name}")
+    try:
+        yield conn
+    finally:
+        cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        cursor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot and restore test fixture tables")
+    parser.add_argument('command', choices=['snapshot', 'restore', 'status'])
+    parser.add_argument('--seed-users', action='store_true',
+                        help="Run reset_users.py before taking the snapshot")
+    args = parser.parse_args()
+
+    if args.seed_users:
+        from reset_users import reset_users
+        reset_users()
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+
+    try:
+        if args.command == 'snapshot':
+            take_snapshot(conn)
+        elif args.command == 'restore':
+            start = time.perf_counter()
+            restored = restore_snapshot(conn)
+            if restored is None:
+                sys.exit(1)
+            elapsed = (time.perf_counter() - start) * 1000
+            if restored:
+                print(f"✓ Restored {', '.join(restored)} in {elapsed:.1f} ms")
+            else:
+                print(f"✓ Fixtures unchanged ({elapsed:.1f} ms)")
+        else:
+            cursor = conn.cursor()
+            baseline = load_baseline(cursor)
+            if baseline is None:
+                print("No fixture snapshot found.")
+            else:
+                dirty = changed_tables(cursor, baseline)
+                print(f"Snapshot tables: {', '.join(baseline)}")
+                print(f"Changed tables: {', '.join(dirty) if dirty else 'none'}")
+            cursor.close()
+    except Error as e:
+        print(f"Error: {e}")
+        conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,11 @@ Generates natural, precise data for 1 admin, 100 teachers, and 1000 students
 import mysql.connector
 import random
 from datetime import datetime, timedelta
-from faker import Faker
+from value_pools import ValuePools
 
-# Initialize Faker with Indian locale
-fake = Faker('en_IN')
-Faker.seed(42)  # For reproducibility
+# Faker values come from cached pools (Indian locale); Faker itself is only
+# imported when the pools for this locale/seed have not been built yet
+pools = ValuePools('en_IN', 42)  # For reproducibility
 random.seed(42)
 
 # Database configuration
@@ -97,8 +97,7 @@ def get_random_grade():
 
 def generate_phone():
     """Generate realistic Indian phone number"""
-    prefixes = ['98', '97', '96', '95', '94', '93', '92', '91', '90', '89', '88', '87', '86', '85', '84', '83', '82', '81', '80', '79', '78', '77', '76', '75']
-    return f"+91{random.choice(prefixes)}{random.randint(10000000, 99999999)}"
+    return pools.phone()
 
 def generate_email(name, role):
     """Generate realistic email"""
@@ -209,10 +208,7 @@ def create_teachers(cursor, count=100):
     for i in range(count):
         # Generate teacher details
         gender = random.choice(['male', 'female'])
-        if gender == 'male':
-            name = fake.name_male()
-        else:
-            name = fake.name_female()
+        name = pools.name(gender)
         
         name_parts = name.split()
         first_name = name_parts[0]
@@ -227,8 +223,8 @@ def create_teachers(cursor, count=100):
         specialization = random.choice(SUBJECTS_BY_DEPT[department][:3])
         
         # Date of birth (30-60 years old)
-        dob = fake.date_of_birth(minimum_age=30, maximum_age=60)
-        joining_date = fake.date_between(start_date='-15y', end_date='today')
+        dob = pools.date_of_birth(minimum_age=30, maximum_age=60)
+        joining_date = pools.date_between(years_back=15)
         
         # Teacher ID
         teacher_id = f"TCH{i+1:04d}"
@@ -320,10 +316,7 @@ def create_students(cursor, sessions, count=1000):
     for i in range(count):
         # Generate student details
         gender = random.choice(['male', 'female'])
-        if gender == 'male':
-            name = fake.name_male()
-        else:
-            name = fake.name_female()
+        name = pools.name(gender)
         
         name_parts = name.split()
         first_name = name_parts[0]
@@ -351,15 +344,15 @@ def create_students(cursor, sessions, count=1000):
         password = 'student123'
         
         # Parent details
-        guardian_name = fake.name_male()
+        guardian_name = pools.name('male')
         guardian_phone = generate_phone()
         guardian_email = generate_email(guardian_name, 'student')
         
         # Address
-        address = fake.address().replace('\n', ', ')
+        address = pools.address()
         
         # Date of birth (18-22 years old)
-        dob = fake.date_of_birth(minimum_age=18, maximum_age=22)
+        dob = pools.date_of_birth(minimum_age=18, maximum_age=22)
         enrollment_date = f"{batch_year}-07-15"
         
         # Insert into users table
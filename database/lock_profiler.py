@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Lock Wait and Deadlock Profiler for Student Portal
+Samples InnoDB lock waits while a workload runs (typically the morning rush
+of teachers submitting teacher/mark_attendance.php and attendance/mark.php at
+once) to show which index or access pattern serializes writers.
+
+Every --interval seconds the sampler joins performance_schema.data_lock_waits
+with data_locks and information_schema.innodb_trx, tracking each waiting lock
+from first to last sighting. Wait time is attributed to the table, index and
+lock modes involved (waiting vs. blocking, e.g. insert intention against a
+gap lock on unique_attendance) and to the fingerprints of the waiting and
+blocking statements. INNODB_METRICS counters (row lock waits, deadlocks,
+timeouts) are read every sample, and SHOW ENGINE INNODB STATUS is parsed
+every --status-interval for the latest deadlock. The report ends with a
+per-second timeline.
+
+--drive N runs N concurrent teachers marking attendance the way
+attendance/mark.php does (one transaction of upserts per class), concentrated
+on a few subject/date classes. It writes real attendance rows, so point it at
+staging.
+
+Usage:
+    python database/lock_profiler.py --duration 120
+    python database/lock_profiler.py --duration 60 --drive 16 --hot-classes 3 -o locks.json
+    python database/lock_profiler.py --interval 0.02 --status-interval 0.5 --bucket 5
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import mysql.connector
+from mysql.connector import Error
+
+from workload_replay import fingerprint, fingerprint_id
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+SAMPLE_SECONDS = 0.05
+STATUS_SECONDS = 1.0
+BUCKET_SECONDS = 1.0
+TOP = 15
+
+METRICS = ['lock_row_lock_waits', 'lock_row_lock_time', 'lock_deadlocks', 'lock_timeouts']
+
+DEADLOCK_SECTION_RE = re.compile(r'LATEST DETECTED DEADLOCK\n-+\n(.*?)\n-{4,}\n[A-Z]', re.S)
+DEADLOCK_TIME_RE = re.compile(r'^(\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)', re.M)
+DEADLOCK_TRX_RE = re.compile(r'\*\*\* \((\d+)\) TRANSACTION:\n(.*?)(?=\*\*\* \(\d+\) TRANSACTION:|\*\*\* WE ROLL BACK|\Z)', re.S)
+DEADLOCK_VICTIM_RE = re.compile(r'\*\*\* WE ROLL BACK TRANSACTION \((\d+)\)')
+THREAD_LINE_RE = re.compile(r'^MySQL thread id \d+.*$', re.M)
+RECORD_LOCK_RE = re.compile(r'RECORD LOCKS .*? index (\S+) of table `([^`]+)`\.`([^`]+)` trx id \d+ (.*)')
+TABLE_LOCK_RE = re.compile(r'TABLE LOCK table `([^`]+)`\.`([^`]+)` trx id \d+ (.*)')
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def short_fingerprint(sql):
+    """(id, text) of a statement, or ('-', reason) when none is known"""
+    if not sql:
+        return '-', '(idle in transaction)'
+    text = fingerprint(sql)
+    return fingerprint_id(text), text
+
+# ---------------------------------------------------------------------------
+# Sampling
+# ---------------------------------------------------------------------------
+
+WAITS_QUERY = """
+    SELECT w.REQUESTING_ENGINE_LOCK_ID, w.REQUESTING_ENGINE_TRANSACTION_ID,
+           w.BLOCKING_ENGINE_LOCK_ID, w.BLOCKING_ENGINE_TRANSACTION_ID,
+           rl.OBJECT_SCHEMA, rl.OBJECT_NAME, COALESCE(rl.INDEX_NAME, ''), rl.LOCK_TYPE, rl.LOCK_MODE, rl.LOCK_DATA,
+           COALESCE(bl.INDEX_NAME, ''), bl.LOCK_MODE,
+           rt.trx_query, TIMESTAMPDIFF(MICROSECOND, rt.trx_wait_started, NOW(6)) / 1e6,
+           COALESCE(bt.trx_query, bs.SQL_TEXT)
+    FROM performance_schema.data_lock_waits w
+    JOIN performance_schema.data_locks rl ON rl.ENGINE_LOCK_ID = w.REQUESTING_ENGINE_LOCK_ID
+    JOIN performance_schema.data_locks bl ON bl.ENGINE_LOCK_ID = w.BLOCKING_ENGINE_LOCK_ID
+    LEFT JOIN information_schema.innodb_trx rt ON rt.trx_id = w.REQUESTING_ENGINE_TRANSACTION_ID
+    LEFT JOIN information_schema.innodb_trx bt ON bt.trx_id = w.BLOCKING_ENGINE_TRANSACTION_ID
+    LEFT JOIN performance_schema.events_statements_current bs ON bs.THREAD_ID = w.BLOCKING_THREAD_ID
+"""
+
+class Wait:
+    """One waiting lock request, from first to last sample that saw it"""
+
+    def __init__(self, t, row):
+        (self.lock_id, self.trx, _, _, self.schema, self.table, self.index, self.lock_type,
+         self.mode, self.lock_data, _, _, sql, age, _) = row
+        self.first_seen = self.last_seen = t
+        # Waits already in progress at their first sighting started before it
+        self.started = t - float(age) if age is not None and float(age) > 0 else t
+        self.waiting = short_fingerprint(sql)
+        self.blockers = {}   # blocking lock id -> (index, mode, fingerprint)
+
+    def add_blocker(self, row):
+        blocking_index, blocking_mode, blocking_sql = row[10], row[11], row[14]
+        self.blockers[row[2]] = (blocking_index, blocking_mode, short_fingerprint(blocking_sql))
+
+    def seconds(self, interval):
+        # Sampled: the wait ended somewhere between the last sighting and the next sample
+        return self.last_seen - self.started + interval / 2
+
+    def to_dict(self, interval):
+        return {
+            'table': f"{self.schema}.{self.table}", 'index': self.index, 'lock_type': self.lock_type,
+            'mode': self.mode, 'lock_data': self.lock_data, 'started': round(self.started, 4),
+            'seconds': round(self.seconds(interval), 4), 'waiting': list(self.waiting),
+            'blockers': [{'index': index, 'mode': mode, 'statement': list(fp)}
+                         for index, mode, fp in self.blockers.values()],
+        }
+
+def parse_deadlock(status):
+    """Latest deadlock in SHOW ENGINE INNODB STATUS output, or None"""
+    section = DEADLOCK_SECTION_RE.search(status)
+    if not section:
+        return None
+    body = section.group(1)
+    stamp = DEADLOCK_TIME_RE.search(body)
+    victim = DEADLOCK_VICTIM_RE.search(body)
+    transactions = []
+    for number, text in DEADLOCK_TRX_RE.findall(body):
+        query = ''
+        thread_line = THREAD_LINE_RE.search(text)
+        if thread_line:
+            rest = text[thread_line.end():].lstrip('\n')
+            query = rest.split('\n*** (', 1)[0].split('\n\n', 1)[0].strip()
+        holds, waits = [], []
+        for part, target in ((r'HOLDS THE LOCK\(S\):', holds), (r'WAITING FOR THIS LOCK TO BE GRANTED:', waits)):
+            match = re.search(rf'\*\*\* \({number}\) {part}\n(.*?)(?=\n\*\*\* |\Z)', body, re.S)
+            if not match:
+                continue
+            for line in match.group(1).split('\n'):
+                record = RECORD_LOCK_RE.search(line)
+                if record:
+                    target.append({'table': f"{record.group(2)}.{record.group(3)}", 'index': record.group(1),
+                                   'mode': record.group(4).strip()})
+                    continue
+                table = TABLE_LOCK_RE.search(line)
+                if table:
+                    target.append({'table': f"{table.group(1)}.{table.group(2)}", 'index': '',
+                                   'mode': table.group(3).strip()})
+        transactions.append({'number': int(number), 'statement': list(short_fingerprint(query)),
+                             'sql': query[:500], 'holds': holds, 'waits': waits})
+    return {
+        'time': stamp.group(1) if stamp else None,
+        'victim': int(victim.group(1)) if victim else None,
+        'transactions': transactions,
+    }
+
+class LockSampler:
+    """Polls lock waits, InnoDB lock metrics and the deadlock section"""
+
+    def __init__(self, conn, interval, status_interval):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.interval = interval
+        self.status_interval = status_interval
+        self.active = {}
+        self.finished = []
+        self.deadlocks = []
+        self.ticks = []       # (t, waiting locks, metric deltas)
+        self.samples = 0
+        self.last_deadlock_time = None
+        self.start = None
+
+    def metrics(self):
+        self.cursor.execute(f"""
+            SELECT NAME, COUNT FROM information_schema.INNODB_METRICS
+            WHERE NAME IN ({', '.join(['%s'] * len(METRICS))})
+        """, METRICS)
+        return {name: int(count) for name, count in self.cursor.fetchall()}
+
+    def check_deadlock(self):
+        self.cursor.execute("SHOW ENGINE INNODB STATUS")
+        status = self.cursor.fetchall()[0][2]
+        deadlock = parse_deadlock(status)
+        if deadlock and deadlock['time'] != self.last_deadlock_time:
+            deadlock['seen_at'] = round(time.perf_counter() - self.start, 3)
+            self.deadlocks.append(deadlock)
+            self.last_deadlock_time = deadlock['time']
+
+    def sample(self, t):
+        self.cursor.execute(WAITS_QUERY)
+        rows = self.cursor.fetchall()
+        seen = set()
+        for row in rows:
+            lock_id = row[0]
+            wait = self.active.get(lock_id)
+            if wait is None:
+                wait = self.active[lock_id] = Wait(t, row)
+            wait.last_seen = t
+            wait.add_blocker(row)
+            seen.add(lock_id)
+        for lock_id in [lock_id for lock_id in self.active if lock_id not in seen]:
+            self.finished.append(self.active.pop(lock_id))
+        self.samples += 1
+        return len(seen)
+
+    def run(self, duration, stop):
+        self.start = time.perf_counter()
+        # Skip the deadlock already in the status output so only new ones are reported
+        self.cursor.execute("SHOW ENGINE INNODB STATUS")
+        existing = parse_deadlock(self.cursor.fetchall()[0][2])
+        self.last_deadlock_time = existing['time'] if existing else None
+
+        previous = first = self.metrics()
+        next_status = self.start + self.status_interval
+        while not stop.is_set():
+            now = time.perf_counter()
+            t = now - self.start
+            if t >= duration:
+                break
+            waiting = self.sample(t)
+            current = self.metrics()
+            self.ticks.append((t, waiting, {name: current[name] - previous.get(name, 0) for name in current}))
+            previous = current
+            if now >= next_status:
+                self.check_deadlock()
+                next_status = now + self.status_interval
+            time.sleep(max(0.0, self.interval - (time.perf_counter() - now)))
+        self.check_deadlock()
+        self.finished.extend(self.active.values())
+        self.active = {}
+        self.elapsed = time.perf_counter() - self.start
+        self.totals = {name: previous[name] - first.get(name, 0) for name in previous}
+        self.cursor.close()
+
+# ---------------------------------------------------------------------------
+# Attendance marking driver
+# ---------------------------------------------------------------------------
+
+def drive_attendance(teachers, hot_classes, stop, results):
+    """Concurrent class submissions as attendance/mark.php makes them"""
+    setup = create_connection()
+    if not setup:
+        stop.set()
+        return []
+    cursor = setup.cursor()
+    cursor.execute("SELECT id FROM sessions WHERE is_active = 1 LIMIT 1")
+    rows = cursor.fetchall()
+    session_id = rows[0][0] if rows else None
+    cursor.execute("""
+        SELECT sub.id, GROUP_CONCAT(st.id ORDER BY st.id)
+        FROM subjects sub
+        JOIN students st ON st.department = sub.department AND st.semester = sub.semester
+        GROUP BY sub.id
+        HAVING COUNT(*) > 1
+        ORDER BY COUNT(*) DESC
+        LIMIT %s
+    """, (hot_classes,))
+    classes = [(subject_id, [int(s) for s in students.split(',')]) for subject_id, students in cursor.fetchall()]
+    cursor.execute("SELECT user_id FROM teachers ORDER BY id LIMIT 1")
+    rows = cursor.fetchall()
+    marked_by = rows[0][0] if rows else 1
+    cursor.close()
+    setup.close()
+    if session_id is None or not classes:
+        print("✗ Driver needs an active session and subjects with enrolled students")
+        stop.set()
+        return []
+
+    today = date.today()
+
+    def teacher(index):
+        rng = random.Random(index)
+        conn = create_connection()
+        if not conn:
+            return
+        cursor = conn.cursor()
+        while not stop.is_set():
+            subject_id, roster = rng.choice(classes)
+            attendance_date = today - timedelta(days=rng.randint(0, 1))
+            students = roster[:]
+            rng.shuffle(students)  # Submission order differs between teachers, as it does from the UI
+            try:
+                conn.start_transaction()
+                for student_id in students:
+                    status = 'present' if rng.random() < 0.85 else rng.choice(['absent', 'late'])
+                    cursor.execute("""
+                        INSERT INTO attendance (student_id, subject_id, session_id, attendance_date, status, marked_by)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE status = %s, marked_by = %s, marked_at = CURRENT_TIMESTAMP
+                    """, (student_id, subject_id, session_id, attendance_date, status, marked_by, status, marked_by))
+                conn.commit()
+                results['committed'] += 1
+            except Error as e:
+                conn.rollback()
+                results[{1213: 'deadlocks', 1205: 'timeouts'}.get(e.errno, 'errors')] += 1
+        cursor.close()
+        conn.close()
+
+    threads = [threading.Thread(target=teacher, args=(i,), daemon=True) for i in range(teachers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def aggregate(waits, interval, key):
+    totals = defaultdict(lambda: [0, 0.0])
+    for wait in waits:
+        for k, share in key(wait):
+            totals[k][0] += 1
+            totals[k][1] += wait.seconds(interval) * share
+    return sorted(totals.items(), key=lambda item: -item[1][1])
+
+def print_table(title, rows, label_width=60, top=TOP):
+    if not rows:
+        return
+    total = sum(seconds for _, (_, seconds) in rows) or 1
+    print(f"\n{title}")
+    print(f"  {'':<{label_width}} {'Waits':>7} {'Wait s':>9} {'Share':>6}")
+    for label, (count, seconds) in rows[:top]:
+        text = ' | '.join(str(part) for part in label) if isinstance(label, tuple) else str(label)
+        print(f"  {text[:label_width]:<{label_width}} {count:>7} {seconds:>9.3f} {seconds / total * 100:>5.1f}%")
+
+def blocker_share(wait):
+    return 1 / len(wait.blockers) if wait.blockers else 1
+
+def report(sampler, driver_results, bucket, top):
+    waits = sampler.finished
+    interval = sampler.interval
+    total_wait = sum(w.seconds(interval) for w in waits)
+    rate = sampler.samples / sampler.elapsed if sampler.elapsed else 0
+    totals = sampler.totals
+    print(f"\nSampled {sampler.elapsed:.1f}s at {rate:.0f} Hz ({sampler.samples} samples)")
+    print(f"  Lock waits observed: {len(waits)} totalling {total_wait:.2f}s "
+          f"(InnoDB counted {totals.get('lock_row_lock_waits', 0)} waits, "
+          f"{totals.get('lock_row_lock_time', 0) / 1000:.2f}s)")
+    print(f"  Deadlocks: {totals.get('lock_deadlocks', 0)} ({len(sampler.deadlocks)} captured from INNODB STATUS), "
+          f"lock wait timeouts: {totals.get('lock_timeouts', 0)}")
+    if driver_results:
+        print(f"  Driver: {driver_results['committed']} classes committed, {driver_results['deadlocks']} deadlocks, "
+              f"{driver_results['timeouts']} timeouts, {driver_results['errors']} other errors")
+    if totals.get('lock_row_lock_waits', 0) > len(waits) * 2:
+        print("  ! Many waits were shorter than the sampling interval; lower --interval to attribute them")
+
+    print_table("Wait time by table and index", aggregate(waits, interval, lambda w: [((w.table, w.index or '(table)'), 1)]), top=top)
+    print_table("Wait time by lock modes (waiting on table.index | requested | blocking)",
+                aggregate(waits, interval, lambda w: [((f"{w.table}.{w.index}", w.mode, mode), blocker_share(w))
+                                                       for _, mode, _ in w.blockers.values()] or [((f"{w.table}.{w.index}", w.mode, '?'), 1)]),
+                label_width=70, top=top)
+    print_table("Wait time by waiting statement",
+                aggregate(waits, interval, lambda w: [((w.waiting[0], w.waiting[1]), 1)]), label_width=90, top=top)
+    print_table("Wait time caused by blocking statement",
+                aggregate(waits, interval, lambda w: [((fp[0], fp[1]), blocker_share(w))
+                                                       for _, _, fp in w.blockers.values()]), label_width=90, top=top)
+
+    if sampler.deadlocks:
+        print("\nDeadlocks")
+        patterns = defaultdict(int)
+        for deadlock in sampler.deadlocks:
+            print(f"  {deadlock['time']} (+{deadlock['seen_at']:.1f}s), rolled back ({deadlock['victim']})")
+            shape = []
+            for trx in deadlock['transactions']:
+                held = ', '.join(f"{lock['index'] or lock['table']} {lock['mode']}" for lock in trx['holds']) or '-'
+                wanted = ', '.join(f"{lock['index'] or lock['table']} {lock['mode']}" for lock in trx['waits']) or '-'
+                print(f"    ({trx['number']}) {trx['statement'][1][:90]}")
+                print(f"        holds {held[:100]}")
+                print(f"        waits {wanted[:100]}")
+                shape.append((trx['statement'][0], tuple(sorted({lock['index'] for lock in trx['waits']}))))
+            patterns[tuple(sorted(shape))] += 1
+        if len(patterns) < len(sampler.deadlocks):
+            print("  Recurring shapes (statement, index waited on):")
+            for shape, count in sorted(patterns.items(), key=lambda item: -item[1]):
+                print(f"    {count:>4}x " + ' <-> '.join(f"{fp} on {'/'.join(indexes) or '-'}" for fp, indexes in shape))
+
+    # Hints for the attendance write path
+    gap = sum(w.seconds(interval) for w in waits if 'GAP' in (w.mode or '') or 'INSERT_INTENTION' in (w.mode or '')
+              or any('GAP' in (mode or '') for _, mode, _ in w.blockers.values()))
+    if total_wait and gap / total_wait > 0.3:
+        print(f"\n  {gap / total_wait * 100:.0f}% of wait time involves gap or insert-intention locks: duplicate checks "
+              f"on unique keys (unique_attendance) under REPEATABLE READ take next-key locks; "
+              f"READ COMMITTED or ordering upserts by key narrows them")
+    secondary = sum(w.seconds(interval) for w in waits if w.index not in ('PRIMARY', 'unique_attendance', ''))
+    if total_wait and secondary / total_wait > 0.2:
+        print(f"  {secondary / total_wait * 100:.0f}% of wait time is on secondary indexes; "
+              f"redundant ones (e.g. idx_student next to unique_attendance) add lock and write work")
+
+    print_timeline(sampler, bucket, interval)
+
+def print_timeline(sampler, bucket, interval):
+    buckets = defaultdict(lambda: {'peak': 0, 'new': 0, 'wait': 0.0, 'waits': 0, 'deadlocks': 0, 'timeouts': 0})
+    for t, waiting, deltas in sampler.ticks:
+        b = buckets[int(t // bucket)]
+        b['peak'] = max(b['peak'], waiting)
+        b['waits'] += deltas.get('lock_row_lock_waits', 0)
+        b['deadlocks'] += deltas.get('lock_deadlocks', 0)
+        b['timeouts'] += deltas.get('lock_timeouts', 0)
+    for wait in sampler.finished:
+        b = buckets[int(max(wait.started, 0) // bucket)]
+        b['new'] += 1
+        b['wait'] += wait.seconds(interval)
+    if not buckets:
+        return
+    widest = max(b['peak'] for b in buckets.values()) or 1
+    print(f"\nTimeline ({bucket:g}s buckets)")
+    print(f"  {'t':>7} {'Waiting':>8} {'New':>5} {'Wait s':>8} {'InnoDB':>7} {'DL':>3} {'TO':>3}")
+    for index in range(max(buckets) + 1):
+        b = buckets[index]
+        bar = '#' * round(b['peak'] / widest * 30)
+        print(f"  {index * bucket:>6.0f}s {b['peak']:>8} {b['new']:>5} {b['wait']:>8.2f} {b['waits']:>7} "
+              f"{b['deadlocks']:>3} {b['timeouts']:>3} {bar}")
+
+def write_json(path, sampler, driver_results):
+    with open(path, 'w') as f:
+        json.dump({
+            'elapsed_seconds': sampler.elapsed, 'samples': sampler.samples, 'interval': sampler.interval,
+            'metrics': sampler.totals, 'driver': driver_results,
+            'waits': [w.to_dict(sampler.interval) for w in sampler.finished],
+            'deadlocks': sampler.deadlocks,
+            'timeline': [{'t': round(t, 4), 'waiting': waiting, **deltas} for t, waiting, deltas in sampler.ticks],
+        }, f, indent=2, default=str)
+    print(f"\n✓ Wrote {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile InnoDB lock waits and deadlocks during a workload")
+    parser.add_argument('--duration', type=float, default=60, help="Seconds to sample")
+    parser.add_argument('--interval', type=float, default=SAMPLE_SECONDS, help="Seconds between lock samples")
+    parser.add_argument('--status-interval', type=float, default=STATUS_SECONDS,
+                        help="Seconds between SHOW ENGINE INNODB STATUS polls")
+    parser.add_argument('--bucket', type=float, default=BUCKET_SECONDS, help="Timeline bucket size in seconds")
+    parser.add_argument('--drive', type=int, default=0, help="Run N concurrent attendance-marking teachers")
+    parser.add_argument('--hot-classes', type=int, default=3, help="Classes the driver's teachers pick from")
+    parser.add_argument('--top', type=int, default=TOP)
+    parser.add_argument('-o', '--output', help="Write raw waits, deadlocks and timeline as JSON")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+    conn.autocommit = True
+
+    stop = threading.Event()
+    driver_results = defaultdict(int) if args.drive else None
+    try:
+        sampler = LockSampler(conn, args.interval, args.status_interval)
+        threads = drive_attendance(args.drive, args.hot_classes, stop, driver_results) if args.drive else []
+        print(f"Sampling lock waits every {args.interval * 1000:.0f} ms for {args.duration:g}s"
+              + (f" with {args.drive} attendance-marking teachers" if args.drive else "") + " (Ctrl+C to stop)...")
+        try:
+            sampler.run(args.duration, stop)
+        except KeyboardInterrupt:
+            sampler.finished.extend(sampler.active.values())
+            sampler.elapsed = time.perf_counter() - sampler.start
+            sampler.totals = {}
+        stop.set()
+        for thread in threads:
+            thread.join()
+        report(sampler, driver_results, args.bucket, args.top)
+        if args.output:
+            write_json(args.output, sampler, dict(driver_results) if driver_results is not None else None)
+    except Error as e:
+        stop.set()
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+-- Migration: Derived tables maintained by database/binlog_cdc.py
+-- Description: Incrementally updated rollups fed from the row binlog, plus the
+-- consumer checkpoint so the service resumes from its last applied position.
+
+USE studentportal;
+
+-- Per-student, per-subject attendance counters
+CREATE TABLE IF NOT EXISTS student_attendance_summary (
+    student_id INT NOT NULL,
+    subject_id INT NOT NULL,
+    session_id INT NOT NULL,
+    present_count INT NOT NULL DEFAULT 0,
+    absent_count INT NOT NULL DEFAULT 0,
+    late_count INT NOT NULL DEFAULT 0,
+    excused_count INT NOT NULL DEFAULT 0,
+    total_count INT AS (present_count + absent_count + late_count + excused_count) STORED,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (student_id, subject_id, session_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Per-student, per-semester GPA rollup (SGPA = credit_points / credit_hours)
+CREATE TABLE IF NOT EXISTS student_gpa_rollup (
+    student_id INT NOT NULL,
+    session_id INT NOT NULL,
+    semester INT NOT NULL,
+    subject_count INT NOT NULL DEFAULT 0,
+    credit_hours INT NOT NULL DEFAULT 0,
+    credit_points DECIMAL(8,2) NOT NULL DEFAULT 0,
+    sgpa DECIMAL(4,2) AS (IF(credit_hours > 0, credit_points / credit_hours, NULL)) STORED,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (student_id, session_id, semester)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Per-student completed payment totals
+CREATE TABLE IF NOT EXISTS student_payment_totals (
+    student_id INT PRIMARY KEY,
+    payment_count INT NOT NULL DEFAULT 0,
+    amount_paid DECIMAL(12,2) NOT NULL DEFAULT 0,
+    late_fine DECIMAL(12,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Notices listed per department ('' = all departments)
+CREATE TABLE IF NOT EXISTS department_notice_index (
+    department VARCHAR(100) NOT NULL,
+    notice_id INT NOT NULL,
+    target_audience VARCHAR(20) NOT NULL,
+    semester INT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    expiry_date DATE NULL,
+    created_at TIMESTAMP NULL,
+
+    PRIMARY KEY (department, notice_id),
+    INDEX idx_notice (notice_id),
+    INDEX idx_department_created (department, is_active, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Binlog position of the last transaction applied by each consumer
+CREATE TABLE IF NOT EXISTS cdc_checkpoints (
+    consumer VARCHAR(50) PRIMARY KEY,
+    log_file VARCHAR(255) NOT NULL,
+    log_pos BIGINT UNSIGNED NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Success message
+SELECT 'CDC derived tables created successfully!' AS message;
@@ -0,0 +1,34 @@
+-- Migration: Indexes for off-request-path purging
+-- Description: Lets database/rate_limit_maintenance.py purge expired rate_limits
+-- rows in small indexed batches now that RateLimiter.php no longer deletes on
+-- every request.
+
+USE studentportal;
+
+-- Tables are normally created lazily by RateLimiter.php / TokenBlacklist.php
+CREATE TABLE IF NOT EXISTS rate_limits (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    ip_address VARCHAR(45) NOT NULL,
+    endpoint VARCHAR(255) NOT NULL,
+    requests INT DEFAULT 1,
+    start_time INT NOT NULL,
+    INDEX idx_ip_endpoint (ip_address, endpoint)
+);
+
+CREATE TABLE IF NOT EXISTS token_blacklist (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    jti VARCHAR(255) NOT NULL UNIQUE,
+    expires_at INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_jti (jti),
+    INDEX idx_expires (expires_at)
+);
+
+SET @exist := (SELECT COUNT(*) FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = 'studentportal' AND TABLE_NAME = 'rate_limits' AND INDEX_NAME = 'idx_start_time');
+SET @sqlstmt := IF(@exist = 0, 'ALTER TABLE rate_limits ADD INDEX idx_start_time (start_time)', 'SELECT "Index idx_start_time already exists"');
+PREPARE stmt FROM @sqlstmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Success message
+SELECT 'Rate limit purge indexes added successfully!' AS message;
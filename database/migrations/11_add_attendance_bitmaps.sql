@@ -0,0 +1,33 @@
+-- Migration: Compact attendance bitmaps
+-- Description: One row per (student, subject, session) holding a held-day bitset
+-- and a 2-bit status per class-day, maintained by database/attendance_bitmap.py
+-- alongside the attendance table. Day i is start_date + i days.
+
+USE studentportal;
+
+CREATE TABLE IF NOT EXISTS attendance_bitmaps (
+    student_id INT NOT NULL,
+    subject_id INT NOT NULL,
+    session_id INT NOT NULL,
+    start_date DATE NOT NULL,
+    days SMALLINT UNSIGNED NOT NULL,
+    held VARBINARY(128) NOT NULL COMMENT '1 bit per day: class recorded',
+    statuses VARBINARY(256) NOT NULL COMMENT '2 bits per day: present/absent/late/excused',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (student_id, subject_id, session_id),
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
+    FOREIGN KEY (subject_id) REFERENCES subjects(id),
+    FOREIGN KEY (session_id) REFERENCES sessions(id),
+
+    INDEX idx_session_subject (session_id, subject_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Sync position (max attendance.marked_at already folded in)
+CREATE TABLE IF NOT EXISTS attendance_bitmap_sync (
+    id TINYINT PRIMARY KEY,
+    synced_until TIMESTAMP NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Success message
+SELECT 'Attendance bitmap tables created successfully!' AS message;
@@ -0,0 +1,34 @@
+-- Migration: Content-addressed upload index
+-- Description: Tracks files under backend/uploads/cas/ (named by SHA-256) and
+-- the study_materials / assignments / assignment_submissions rows that use
+-- them, so database/upload_store.py finds orphaned and expired blobs with an
+-- indexed query instead of scanning the uploads directory.
+
+USE studentportal;
+
+CREATE TABLE IF NOT EXISTS upload_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    storage_path VARCHAR(255) NOT NULL COMMENT 'Relative to backend/',
+    size_bytes BIGINT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    orphaned_at TIMESTAMP NULL DEFAULT NULL COMMENT 'First gc pass that found no references',
+    expires_at TIMESTAMP NULL DEFAULT NULL,
+
+    INDEX idx_orphaned (orphaned_at),
+    INDEX idx_expires (expires_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS upload_refs (
+    source_table VARCHAR(32) NOT NULL,
+    source_id INT NOT NULL,
+    sha256 CHAR(64) NOT NULL,
+    db_path VARCHAR(500) NOT NULL COMMENT 'file_path value the row had when indexed',
+    original_path VARCHAR(500) NOT NULL,
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (source_table, source_id),
+    INDEX idx_sha256 (sha256)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Success message
+SELECT 'Upload blob index created successfully!' AS message;
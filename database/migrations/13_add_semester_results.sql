@@ -0,0 +1,42 @@
+-- Migration: Published semester results
+-- Description: One row per (student, session, semester) written by
+-- database/publish_results.py when a semester's results are published:
+-- credits and credit points for the semester (SGPA) and cumulatively up to
+-- and including it (CGPA), rounded the way grade_calculator.php rounds.
+
+USE studentportal;
+
+CREATE TABLE IF NOT EXISTS semester_results (
+    student_id INT NOT NULL,
+    session_id INT NOT NULL,
+    semester INT NOT NULL,
+    subject_count INT NOT NULL DEFAULT 0,
+    failed_count INT NOT NULL DEFAULT 0,
+    credit_hours INT NOT NULL DEFAULT 0,
+    credit_points DECIMAL(8,2) NOT NULL DEFAULT 0,
+    sgpa DECIMAL(4,2) NOT NULL DEFAULT 0,
+    cumulative_credit_hours INT NOT NULL DEFAULT 0,
+    cumulative_credit_points DECIMAL(9,2) NOT NULL DEFAULT 0,
+    cgpa DECIMAL(4,2) NOT NULL DEFAULT 0,
+    published_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (student_id, session_id, semester),
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
+    FOREIGN KEY (session_id) REFERENCES sessions(id),
+    INDEX idx_session_semester (session_id, semester)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Repair rows written by api/marks/enter_semester_marks.php before its bind order
+-- was fixed: those stored the ISA in esa_marks and the ESA in isa_marks, while
+-- internal_marks/external_marks got the right values. publish_results.py reads
+-- esa_marks/isa_marks, so restore them from the columns that were written
+-- correctly. Rows already in order have isa_marks = internal_marks and are skipped.
+UPDATE marks
+SET esa_marks = external_marks,
+    isa_marks = internal_marks
+WHERE esa_marks = internal_marks
+  AND isa_marks = external_marks
+  AND esa_marks <> isa_marks;
+
+-- Success message
+SELECT 'Semester results table created successfully!' AS message;
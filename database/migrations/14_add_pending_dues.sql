@@ -0,0 +1,38 @@
+-- Migration: Materialized pending fee dues
+-- Description: One row per unpaid (student, fee) with the late fine accrued as
+-- of the last run of database/fee_dues.py, so the admin pending-students screen
+-- and fee notifications read a keyed table instead of joining
+-- students x fees x payments per request. Payment endpoints delete the row
+-- when a fee is paid; the job re-derives everything else.
+
+USE studentportal;
+
+CREATE TABLE IF NOT EXISTS pending_dues (
+    student_id INT NOT NULL,
+    fee_id INT NOT NULL,
+    session_id INT NOT NULL,
+    department VARCHAR(100),
+    semester INT NOT NULL,
+    amount DECIMAL(10,2) NOT NULL,
+    due_date DATE NOT NULL,
+    days_overdue INT NOT NULL DEFAULT 0,
+    late_fine DECIMAL(10,2) NOT NULL DEFAULT 0,
+    total_due DECIMAL(10,2) AS (amount + late_fine) STORED,
+    computed_at DATETIME NOT NULL,
+    notified_at DATETIME NULL,
+
+    PRIMARY KEY (student_id, fee_id),
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
+    FOREIGN KEY (fee_id) REFERENCES fees(id) ON DELETE CASCADE,
+    INDEX idx_session_department (session_id, department, semester),
+    INDEX idx_fee (fee_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Anti-join probe for "no completed payment for this fee"
+SET @exist := (SELECT COUNT(*) FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = 'studentportal' AND TABLE_NAME = 'payments' AND INDEX_NAME = 'idx_student_fee_status');
+SET @sqlstmt := IF(@exist = 0, 'ALTER TABLE payments ADD INDEX idx_student_fee_status (student_id, fee_id, status)', 'SELECT "Index idx_student_fee_status already exists"');
+PREPARE stmt FROM @sqlstmt;
+EXECUTE stmt;
+
+-- Success message
+SELECT 'Pending dues table created successfully!' AS message;
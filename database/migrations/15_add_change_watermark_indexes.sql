@@ -0,0 +1,27 @@
+-- Migration: Indexes on change-timestamp watermarks
+-- Description: database/analytics_export.py reads only rows whose marked_at /
+-- updated_at passed its stored watermark. Without an index on those columns
+-- every incremental export is a full scan of the OLTP tables.
+
+USE studentportal;
+
+SET @exist := (SELECT COUNT(*) FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = 'studentportal' AND TABLE_NAME = 'attendance' AND INDEX_NAME = 'idx_marked_at');
+SET @sqlstmt := IF(@exist = 0, 'ALTER TABLE attendance ADD INDEX idx_marked_at (marked_at)', 'SELECT "Index idx_marked_at already exists"');
+PREPARE stmt FROM @sqlstmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @exist := (SELECT COUNT(*) FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = 'studentportal' AND TABLE_NAME = 'marks' AND INDEX_NAME = 'idx_updated_at');
+SET @sqlstmt := IF(@exist = 0, 'ALTER TABLE marks ADD INDEX idx_updated_at (updated_at)', 'SELECT "Index idx_updated_at already exists"');
+PREPARE stmt FROM @sqlstmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @exist := (SELECT COUNT(*) FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = 'studentportal' AND TABLE_NAME = 'payments' AND INDEX_NAME = 'idx_updated_at');
+SET @sqlstmt := IF(@exist = 0, 'ALTER TABLE payments ADD INDEX idx_updated_at (updated_at)', 'SELECT "Index idx_updated_at already exists"');
+PREPARE stmt FROM @sqlstmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Success message
+SELECT 'Change watermark indexes added successfully!' AS message;
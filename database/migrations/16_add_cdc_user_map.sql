@@ -0,0 +1,26 @@
+-- Migration: User/student map and notice owners for database/binlog_cdc.py
+-- Description: Deleting a user cascades to its students row and its notices
+-- without writing either to the binlog. The CDC service keeps its own
+-- user -> student map, committed with its checkpoint, so a user delete replayed
+-- after a restart still finds the student even though the live students row is
+-- gone; department_notice_index records each notice's creator for the same
+-- reason. Run `python database/binlog_cdc.py --rebuild` after applying.
+
+USE studentportal;
+
+-- students.user_id as of the CDC checkpoint
+CREATE TABLE IF NOT EXISTS cdc_student_users (
+    student_id INT PRIMARY KEY,
+    user_id INT NOT NULL,
+
+    INDEX idx_user (user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+SET @exist := (SELECT COUNT(*) FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = 'studentportal' AND TABLE_NAME = 'department_notice_index' AND COLUMN_NAME = 'created_by');
+SET @sqlstmt := IF(@exist = 0, 'ALTER TABLE department_notice_index ADD COLUMN created_by INT NULL AFTER notice_id, ADD INDEX idx_created_by (created_by)', 'SELECT "Column created_by already exists"');
+PREPARE stmt FROM @sqlstmt;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Success message
+SELECT 'CDC user map created successfully!' AS message;
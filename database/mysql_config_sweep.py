@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+"""
+MySQL Config Sweep for Student Portal
+Benchmarks candidate variants of docker/mysql/my.cnf against the same data and
+workload and recommends the best one for our data size. For each variant a
+throwaway mysql:8.0 container is started the way production/docker runs it
+(variant file mounted as conf.d/custom.cnf, memory-limited), the generated
+dataset is loaded from a cached dump, and a fixed mixed workload runs on
+concurrent connections:
+
+    mark_attendance   teacher marks a class (mark_attendance.php upserts, one transaction)
+    read_results      student marks + CGPA (get_marks.php)
+    read_attendance   student's month of attendance (get_attendance.php daily view)
+    report            department performance / subject attendance report aggregations
+
+Every client replays the same seeded operation sequence in every variant, so
+variants differ only in configuration. Per variant the sweep records load
+time, throughput, p50/p95/p99 latency per operation, buffer pool hit ratio
+and redo/IO counters (SHOW GLOBAL STATUS deltas over the measured phase),
+then ranks variants and writes a recommended my.cnf.
+
+Usage:
+    python database/mysql_config_sweep.py run [--scale 2] [--clients 16] [--ops 2000]
+    python database/mysql_config_sweep.py run --only current,bp-1G,durable
+    python database/mysql_config_sweep.py run --variant "bp-768M:innodb_buffer_pool_size=768M"
+    python database/mysql_config_sweep.py run --grid innodb_buffer_pool_size=256M,512M,1G
+    python database/mysql_config_sweep.py report database/config_sweep/sweep_20250101_120000.json
+    python database/mysql_config_sweep.py variants
+
+Requires docker. Datasets are generated once per scale with
+generate_realistic_data.py (scale 1 = 1000 students, 100 teachers) and cached
+as dumps under database/config_sweep/.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+from mysql.connector import Error
+
+from sql_loader import load_file, load_parallel
+
+DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_CNF = os.path.join(DATABASE_DIR, '..', 'docker', 'mysql', 'my.cnf')
+SCHEMA_FILE = os.path.join(DATABASE_DIR, 'schema.sql')
+MIGRATIONS_DIR = os.path.join(DATABASE_DIR, 'migrations')
+OUTPUT_DIR = os.path.join(DATABASE_DIR, 'config_sweep')
+
+IMAGE = 'mysql:8.0'
+CONTAINER = 'studentportal_config_sweep'
+ROOT_PASSWORD = 'root'
+DB_NAME = 'studentportal'
+PORT = 3307
+MEMORY_LIMIT = '2g'
+STARTUP_TIMEOUT = 300
+
+# Errors re-applied migrations raise on objects schema.sql or earlier migrations already created
+MIGRATION_IGNORE = (1050, 1060, 1061, 1068, 1091, 1826)
+
+# Candidate overrides of the [mysqld] section; 'current' is my.cnf as committed
+VARIANTS = {
+    'current': {},
+    'bp-128M': {'innodb_buffer_pool_size': '128M'},
+    'bp-512M': {'innodb_buffer_pool_size': '512M'},
+    'bp-1G': {'innodb_buffer_pool_size': '1G'},
+    'log-256M': {'innodb_log_file_size': '256M'},
+    'bp-512M-log-256M': {'innodb_buffer_pool_size': '512M', 'innodb_log_file_size': '256M'},
+    'durable': {'innodb_flush_log_at_trx_commit': '1'},
+    'relaxed-binlog': {'sync_binlog': '0'},
+    'io-capacity': {'innodb_io_capacity': '1000', 'innodb_io_capacity_max': '2000'},
+    'connections-100': {'max_connections': '100'},
+}
+
+# Operation mix (weights) of the measured workload
+WORKLOAD = [
+    ('mark_attendance', 40),
+    ('read_results', 35),
+    ('read_attendance', 15),
+    ('report', 10),
+]
+CLASS_SIZE = 30
+WARMUP_OPS = 200
+
+# SHOW GLOBAL STATUS counters sampled around the measured phase
+STATUS_COUNTERS = [
+    'Innodb_buffer_pool_read_requests', 'Innodb_buffer_pool_reads', 'Innodb_buffer_pool_wait_free',
+    'Innodb_buffer_pool_pages_flushed', 'Innodb_os_log_written', 'Innodb_log_writes',
+    'Innodb_os_log_fsyncs', 'Innodb_log_waits', 'Innodb_data_reads', 'Innodb_data_writes',
+    'Innodb_data_read', 'Innodb_data_written', 'Innodb_data_fsyncs', 'Innodb_row_lock_waits',
+    'Innodb_row_lock_time', 'Binlog_cache_disk_use', 'Created_tmp_disk_tables',
+]
+
+SIZE_RE = re.compile(r'^(\d+(?:\.\d+)?)([KMG]?)$', re.I)
+
+def parse_size(value):
+    """my.cnf size ('256M', '1G', '134217728') in bytes"""
+    match = SIZE_RE.match(str(value).strip())
+    if not match:
+        return None
+    return int(float(match.group(1)) * 1024 ** ' KMG'.index(match.group(2).upper() or ' '))
+
+# ---------------------------------------------------------------------------
+# Configuration variants
+# ---------------------------------------------------------------------------
+
+def read_base_settings(path=BASE_CNF):
+    """key -> value of the [mysqld] section of my.cnf"""
+    settings, section = {}, None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('['):
+                section = line.strip('[]')
+            elif section == 'mysqld' and line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                settings[key.strip().replace('-', '_')] = value.strip()
+    return settings
+
+def render_cnf(overrides, path=BASE_CNF, note=None):
+    """my.cnf with [mysqld] keys replaced in place and new keys appended to the section"""
+    with open(path) as f:
+        lines = f.read().splitlines()
+    pending = {key.replace('-', '_'): value for key, value in overrides.items()}
+    out, section = [], None
+
+    def flush_pending():
+        if pending:
+            out.append(f"# {note}" if note else "# Added by mysql_config_sweep.py")
+            out.extend(f"{key}={value}" for key, value in pending.items())
+            out.append('')
+            pending.clear()
+
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('['):
+            if section == 'mysqld':
+                flush_pending()
+            section = stripped.strip('[]')
+        elif section == 'mysqld' and stripped and not stripped.startswith('#') and '=' in stripped:
+            key = stripped.split('=', 1)[0].strip().replace('-', '_')
+            if key in pending:
+                line = f"{stripped.split('=', 1)[0].strip()}={pending.pop(key)}"
+        out.append(line)
+    if section == 'mysqld':
+        flush_pending()
+    return '\n'.join(out) + '\n'
+
+def parse_variant(spec):
+    """'name:key=value,key=value' -> (name, overrides)"""
+    name, _, assignments = spec.partition(':')
+    overrides = {}
+    for assignment in filter(None, assignments.split(',')):
+        key, _, value = assignment.partition('=')
+        if not value:
+            raise ValueError(f"expected key=value in {spec!r}")
+        overrides[key.strip()] = value.strip()
+    return name.strip(), overrides
+
+def grid_variants(specs):
+    """Cartesian product of 'key=v1,v2' specs, as named variants"""
+    axes = []
+    for spec in specs:
+        key, _, values = spec.partition('=')
+        axes.append([(key.strip(), value.strip()) for value in values.split(',') if value.strip()])
+    variants = {}
+    for combination in itertools.product(*axes):
+        name = '-'.join(f"{key.replace('innodb_', '')}={value}" for key, value in combination)
+        variants[name] = dict(combination)
+    return variants
+
+def is_durable(settings):
+    """Commits survive an OS crash: redo and binlog flushed at every commit"""
+    return (str(settings.get('innodb_flush_log_at_trx_commit', '1')) == '1'
+            and str(settings.get('sync_binlog', '1')) == '1')
+
+# ---------------------------------------------------------------------------
+# Container lifecycle
+# ---------------------------------------------------------------------------
+
+def docker(*args, check=True, **kwargs):
+    return subprocess.run(['docker', *args], check=check, text=True, **kwargs)
+
+def connect(port, database=DB_NAME):
+    return mysql.connector.connect(host='127.0.0.1', port=port, user='root',
+                                   password=ROOT_PASSWORD, database=database)
+
+def start_server(cnf_path, port, memory, cpus, init_schema=False):
+    """Start a fresh container with the given config and wait until it accepts connections"""
+    stop_server()
+    command = ['run', '-d', '--name', CONTAINER,
+               '-e', f'MYSQL_ROOT_PASSWORD={ROOT_PASSWORD}', '-e', f'MYSQL_DATABASE={DB_NAME}',
+               '-p', f'127.0.0.1:{port}:3306', '--memory', memory,
+               '-v', f'{os.path.abspath(cnf_path)}:/etc/mysql/conf.d/custom.cnf:ro',
+               '--tmpfs', '/var/log/mysql:mode=1777']
+    if cpus:
+        command += ['--cpus', str(cpus)]
+    if init_schema:
+        command += ['-v', f'{os.path.abspath(SCHEMA_FILE)}:/docker-entrypoint-initdb.d/01-schema.sql:ro']
+    docker(*command, IMAGE, '--default-authentication-plugin=mysql_native_password',
+           stdout=subprocess.DEVNULL)
+
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        # The entrypoint's init server runs with networking off, so TCP only answers once ready
+        try:
+            conn = connect(port)
+            conn.close()
+            return
+        except Error:
+            state = docker('inspect', '-f', '{{.State.Running}}', CONTAINER,
+                           capture_output=True, check=False).stdout.strip()
+            if state == 'false':
+                logs = docker('logs', '--tail', '20', CONTAINER, capture_output=True, check=False)
+                raise RuntimeError(f"mysqld exited during startup:\n{logs.stdout}{logs.stderr}")
+            time.sleep(2)
+    raise RuntimeError(f"mysqld did not accept connections within {STARTUP_TIMEOUT}s")
+
+def stop_server():
+    docker('rm', '-f', '-v', CONTAINER, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+# ---------------------------------------------------------------------------
+# Dataset
+# ---------------------------------------------------------------------------
+
+def generate_dataset(port, scale):
+    """Run generate_realistic_data.py's phases against the sweep server at scale x its defaults"""
+    import generate_realistic_data as generator
+
+    generator.DB_CONFIG.update(host='127.0.0.1', port=port, user='root', password=ROOT_PASSWORD)
+    generator.random.seed(42)
+    conn = generator.connect_db()
+    cursor = conn.cursor()
+    generator.clear_existing_data(cursor)
+    generator.create_admin(cursor)
+    sessions = generator.create_sessions_and_semesters(cursor)
+    teachers = generator.create_teachers(cursor, int(100 * scale))
+    subjects = generator.create_subjects(cursor, teachers, sessions)
+    students = generator.create_students(cursor, sessions, int(1000 * scale))
+    conn.commit()
+    generator.create_marks_and_attendance(cursor, students, subjects, sessions, teachers)
+    generator.create_fees_and_payments(cursor, students, sessions)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+def apply_migrations(port):
+    """Numbered migrations on top of schema.sql, as deployed databases have them"""
+    failures = []
+    conn = connect(port)
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if re.match(r'^\d+_.*\.sql$', name):
+            load_file(conn, os.path.join(MIGRATIONS_DIR, name), ignore_errnos=MIGRATION_IGNORE,
+                      on_error=lambda sql, e, name=name: failures.append((name, e)))
+    conn.close()
+    for name, e in failures:
+        print(f"  ! {name}: {e}")
+
+def dataset_dump(args):
+    """Path of the cached dump for args.scale, building it on a server running the base my.cnf"""
+    path = os.path.join(args.output, f"dataset_scale{args.scale:g}.sql")
+    if os.path.exists(path) and not args.regenerate:
+        return path
+    print(f"Building scale {args.scale:g} dataset...")
+    start_server(BASE_CNF, args.port, args.memory, args.cpus, init_schema=True)
+    try:
+        apply_migrations(args.port)
+        generate_dataset(args.port, args.scale)
+        with open(path + '.tmp', 'w') as f:
+            docker('exec', CONTAINER, 'mysqldump', '-uroot', f'-p{ROOT_PASSWORD}', '--single-transaction',
+                   '--routines', '--triggers', '--set-gtid-purged=OFF', DB_NAME, stdout=f)
+        os.replace(path + '.tmp', path)
+    finally:
+        stop_server()
+    print(f"✓ Dataset dump: {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+    return path
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+
+class Universe:
+    """Ids the workload draws from, read once per variant after loading"""
+
+    def __init__(self, cursor):
+        cursor.execute("SELECT id FROM sessions WHERE is_active = 1 LIMIT 1")
+        rows = cursor.fetchall()
+        self.active_session = rows[0][0] if rows else None
+        cursor.execute("SELECT id, session_id, semester, department FROM students ORDER BY id")
+        self.students = cursor.fetchall()
+        cursor.execute("SELECT id, semester, department FROM subjects ORDER BY id")
+        self.subjects = cursor.fetchall()
+        cursor.execute("SELECT user_id FROM teachers ORDER BY id")
+        self.teachers = [row[0] for row in cursor.fetchall()]
+        self.sessions = sorted({student[1] for student in self.students})
+        self.semesters = sorted({student[2] for student in self.students})
+        self.by_class = defaultdict(list)
+        for student in self.students:
+            self.by_class[(student[3], student[2])].append(student)
+        if not (self.students and self.subjects and self.teachers):
+            raise RuntimeError("dataset has no students, subjects or teachers")
+
+def mark_attendance(cursor, conn, rng, universe):
+    subject_id, semester, department = rng.choice(universe.subjects)
+    roster = universe.by_class.get((department, semester)) or rng.choice(list(universe.by_class.values()))
+    attendance_date = date.today() - timedelta(days=rng.randint(0, 30))
+    teacher = rng.choice(universe.teachers)
+    conn.start_transaction()
+    for student_id, session_id, _, _ in rng.sample(roster, min(CLASS_SIZE, len(roster))):
+        cursor.execute("SELECT id FROM students WHERE id = %s", (student_id,))
+        cursor.fetchall()
+        cursor.execute("""
+            INSERT INTO attendance
+            (student_id, subject_id, session_id, attendance_date, status, remarks, marked_by, marked_at)
+            VALUES (%s, %s, %s, %s, %s, NULL, %s, NOW())
+            ON DUPLICATE KEY UPDATE
+            status = VALUES(status),
+            remarks = VALUES(remarks),
+            marked_by = VALUES(marked_by),
+            marked_at = NOW()
+        """, (student_id, subject_id, session_id, attendance_date,
+              'present' if rng.random() < 0.8 else rng.choice(['absent', 'late']), teacher))
+    conn.commit()
+
+def read_results(cursor, conn, rng, universe):
+    student_id, session_id, semester, _ = rng.choice(universe.students)
+    cursor.execute("""
+        SELECT m.id, m.internal_marks, m.external_marks, m.total_marks, m.grade_point,
+               m.letter_grade, m.remarks, s.subject_code, s.subject_name, s.credit_hours,
+               (m.grade_point * s.credit_hours) as credit_points
+        FROM marks m
+        JOIN subjects s ON m.subject_id = s.id
+        WHERE m.student_id = %s AND m.semester = %s AND m.session_id = %s
+        ORDER BY s.subject_code
+    """, (student_id, rng.randint(1, semester), session_id))
+    cursor.fetchall()
+    cursor.execute("""
+        SELECT SUM(m.grade_point * s.credit_hours) as total_points, SUM(s.credit_hours) as total_credits
+        FROM marks m
+        JOIN subjects s ON m.subject_id = s.id
+        WHERE m.student_id = %s AND m.session_id = %s
+    """, (student_id, session_id))
+    cursor.fetchall()
+
+def read_attendance(cursor, conn, rng, universe):
+    student_id, _, semester, _ = rng.choice(universe.students)
+    day = date.today() - timedelta(days=rng.randint(0, 120))
+    cursor.execute("""
+        SELECT a.id, a.attendance_date, a.status, a.remarks, s.subject_code, s.subject_name, s.semester
+        FROM attendance a
+        JOIN subjects s ON a.subject_id = s.id
+        WHERE a.student_id = %s AND s.semester = %s
+          AND MONTH(a.attendance_date) = %s AND YEAR(a.attendance_date) = %s
+        ORDER BY a.attendance_date DESC, s.subject_name
+    """, (student_id, semester, day.month, day.year))
+    cursor.fetchall()
+
+def report(cursor, conn, rng, universe):
+    if rng.random() < 0.5:
+        cursor.execute("""
+            SELECT s.department, m.semester, COUNT(DISTINCT m.student_id) as total_students,
+                   ROUND(AVG(m.grade_point), 2) as average_gpa,
+                   ROUND((SUM(CASE WHEN m.grade_point >= 1.50 THEN 1 ELSE 0 END) / COUNT(*)) * 100, 2) as pass_percentage
+            FROM marks m
+            JOIN students s ON m.student_id = s.id
+            WHERE m.session_id = %s AND m.semester = %s
+            GROUP BY s.department, m.semester
+        """, (rng.choice(universe.sessions), rng.choice(universe.semesters)))
+    else:
+        subject_id = rng.choice(universe.subjects)[0]
+        cursor.execute("""
+            SELECT s.id as student_id, s.student_id as student_number, s.first_name, s.last_name,
+                   COUNT(*) as total_classes,
+                   SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) as present_count,
+                   SUM(CASE WHEN a.status = 'absent' THEN 1 ELSE 0 END) as absent_count,
+                   SUM(CASE WHEN a.status = 'late' THEN 1 ELSE 0 END) as late_count,
+                   ROUND((SUM(CASE WHEN a.status = 'present' THEN 1 ELSE 0 END) / COUNT(*)) * 100, 2) as percentage
+            FROM attendance a
+            JOIN students s ON a.student_id = s.id
+            WHERE a.subject_id = %s AND a.session_id = %s
+            GROUP BY s.id, s.student_id, s.first_name, s.last_name
+            ORDER BY percentage DESC, s.student_id
+        """, (subject_id, rng.choice(universe.sessions)))
+    cursor.fetchall()
+
+OPERATIONS = {
+    'mark_attendance': mark_attendance,
+    'read_results': read_results,
+    'read_attendance': read_attendance,
+    'report': report,
+}
+
+def client_plan(seed, ops):
+    """The client's operation sequence; identical in every variant"""
+    rng = random.Random(seed)
+    names = [name for name, _ in WORKLOAD]
+    weights = [weight for _, weight in WORKLOAD]
+    return rng, rng.choices(names, weights, k=ops)
+
+def run_clients(port, universe, clients, ops, seed_base):
+    """Run the plans on one connection per client; returns (latencies by op, errors, elapsed)"""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+
+    def client(index):
+        conn = connect(port)
+        conn.autocommit = True  # As PDO runs the endpoints
+        cursor = conn.cursor()
+        rng, plan = client_plan(seed_base + index, ops)
+        local, failed = defaultdict(list), defaultdict(int)
+        barrier.wait()
+        for name in plan:
+            start = time.perf_counter()
+            try:
+                OPERATIONS[name](cursor, conn, rng, universe)
+            except Error:
+                conn.rollback()
+                failed[name] += 1
+                continue
+            local[name].append(time.perf_counter() - start)
+        cursor.close()
+        conn.close()
+        with lock:
+            for name, values in local.items():
+                latencies[name].extend(values)
+            for name, count in failed.items():
+                errors[name] += count
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+def global_status(cursor):
+    cursor.execute("SHOW GLOBAL STATUS")
+    values = dict(cursor.fetchall())
+    return {name: int(values.get(name, 0)) for name in STATUS_COUNTERS}
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+def latency_summary(values):
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'p50_ms': percentile(values, 0.50) * 1000 if values else None,
+        'p95_ms': percentile(values, 0.95) * 1000 if values else None,
+        'p99_ms': percentile(values, 0.99) * 1000 if values else None,
+        'max_ms': values[-1] * 1000 if values else None,
+    }
+
+def server_settings(cursor):
+    names = ['innodb_buffer_pool_size', 'innodb_log_file_size', 'innodb_redo_log_capacity', 'max_connections',
+             'innodb_flush_log_at_trx_commit', 'sync_binlog', 'innodb_io_capacity', 'innodb_flush_method']
+    cursor.execute(f"SHOW GLOBAL VARIABLES WHERE Variable_name IN ({', '.join(['%s'] * len(names))})", names)
+    return dict(cursor.fetchall())
+
+def data_size(cursor):
+    cursor.execute("""
+        SELECT COALESCE(SUM(data_length + index_length), 0) FROM information_schema.TABLES
+        WHERE table_schema = %s
+    """, (DB_NAME,))
+    return int(cursor.fetchall()[0][0])
+
+def run_variant(name, overrides, dump_path, args):
+    """Start, load and benchmark one variant; returns its result record"""
+    cnf_path = os.path.join(args.output, f"{name}.cnf")
+    with open(cnf_path, 'w') as f:
+        f.write(render_cnf(overrides, note=f"Sweep variant {name}"))
+
+    print(f"\n[{name}] {', '.join(f'{k}={v}' for k, v in overrides.items()) or 'my.cnf as committed'}")
+    start_server(cnf_path, args.port, args.memory, args.cpus)
+    try:
+        start = time.perf_counter()
+        stats, problems = load_parallel(lambda: connect(args.port), dump_path, args.load_workers,
+                                        on_error=lambda sql, e: print(f"  ! load: {e}"))
+        load_seconds = time.perf_counter() - start
+        print(f"  Loaded dataset in {load_seconds:.1f}s")
+
+        conn = connect(args.port)
+        cursor = conn.cursor()
+        universe = Universe(cursor)
+        size = data_size(cursor)
+        settings = server_settings(cursor)
+
+        run_clients(args.port, universe, args.clients, WARMUP_OPS, seed_base=10_000)
+        before = global_status(cursor)
+        latencies, errors, elapsed = run_clients(args.port, universe, args.clients, args.ops, seed_base=0)
+        after = global_status(cursor)
+        cursor.close()
+        conn.close()
+    finally:
+        if not args.keep:
+            stop_server()
+
+    delta = {key: after[key] - before[key] for key in STATUS_COUNTERS}
+    completed = sum(len(values) for values in latencies.values())
+    all_latencies = [value for values in latencies.values() for value in values]
+    requests = delta['Innodb_buffer_pool_read_requests']
+    result = {
+        'variant': name,
+        'overrides': overrides,
+        'settings': settings,
+        'durable': is_durable({**read_base_settings(), **overrides}),
+        'data_bytes': size,
+        'load_seconds': round(load_seconds, 2),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_ops': completed / elapsed if elapsed else 0.0,
+        'errors': dict(errors),
+        'latency': latency_summary(all_latencies),
+        'operations': {op: latency_summary(values) for op, values in sorted(latencies.items())},
+        'buffer_pool_hit_ratio': 1 - delta['Innodb_buffer_pool_reads'] / requests if requests else None,
+        'redo_mb_per_s': delta['Innodb_os_log_written'] / elapsed / 1024 / 1024 if elapsed else 0.0,
+        'status_delta': delta,
+    }
+    hit_ratio = result['buffer_pool_hit_ratio']
+    hit = f"{hit_ratio * 100:.2f}%" if hit_ratio is not None else 'n/a'
+    print(f"  {result['throughput_ops']:.0f} ops/s, p95 {result['latency']['p95_ms']:.1f} ms, "
+          f"p99 {result['latency']['p99_ms']:.1f} ms, buffer pool hit ratio {hit}")
+    return result
+
+# ---------------------------------------------------------------------------
+# Ranking and recommendation
+# ---------------------------------------------------------------------------
+
+def rank(results):
+    """Score = throughput relative to the best, scaled down by p99 worse than the best p99"""
+    best_throughput = max(r['throughput_ops'] for r in results) or 1.0
+    best_p99 = min(r['latency']['p99_ms'] for r in results if r['latency']['p99_ms'] is not None)
+    for r in results:
+        p99 = r['latency']['p99_ms'] or best_p99
+        r['score'] = round(r['throughput_ops'] / best_throughput * min(1.0, best_p99 / p99), 4)
+    return sorted(results, key=lambda r: (-r['score'], r['variant']))
+
+def print_ranking(ranked):
+    print(f"\n{'#':>2} {'Variant':<26} {'Score':>6} {'Ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'BP hit':>8} {'Redo MB/s':>9} {'Fsyncs/s':>9} {'Load s':>7}")
+    for position, r in enumerate(ranked, 1):
+        latency = r['latency']
+        elapsed = r['elapsed_seconds'] or 1
+        hit = f"{r['buffer_pool_hit_ratio'] * 100:.2f}%" if r['buffer_pool_hit_ratio'] is not None else '-'
+        fsyncs = (r['status_delta']['Innodb_data_fsyncs'] + r['status_delta']['Innodb_os_log_fsyncs']) / elapsed
+        flag = '' if r['durable'] else ' *'
+        print(f"{position:>2} {r['variant'] + flag:<26} {r['score']:>6.3f} {r['throughput_ops']:>8.0f} "
+              f"{latency['p50_ms']:>8.2f} {latency['p95_ms']:>8.2f} {latency['p99_ms']:>8.2f} "
+              f"{hit:>8} {r['redo_mb_per_s']:>9.2f} {fsyncs:>9.0f} {r['load_seconds']:>7.1f}")
+    if any(not r['durable'] for r in ranked):
+        print(" * not crash-durable: up to ~1s of commits can be lost on an OS crash or power loss")
+
+    print("\nPer-operation p95 (ms):")
+    operations = [name for name, _ in WORKLOAD]
+    print(f"   {'Variant':<26} " + ' '.join(f"{op:>16}" for op in operations))
+    for r in ranked:
+        cells = [r['operations'].get(op, {}).get('p95_ms') for op in operations]
+        print(f"   {r['variant']:<26} " + ' '.join(f"{c:>16.2f}" if c is not None else f"{'-':>16}" for c in cells))
+
+def recommend(ranked, require_durable, memory):
+    """Best-ranked variant allowed by the durability requirement, plus buffer-pool fit notes"""
+    candidates = [r for r in ranked if r['durable'] or not require_durable]
+    if not candidates:
+        return None, ["No variant met the durability requirement; add one with innodb_flush_log_at_trx_commit=1"]
+    best = candidates[0]
+    notes = []
+    base = read_base_settings()
+    pool = parse_size(best['overrides'].get('innodb_buffer_pool_size', base.get('innodb_buffer_pool_size', '128M')))
+    if pool is not None and best['data_bytes'] > pool:
+        notes.append(f"Data ({best['data_bytes'] / 1024 / 1024:.0f} MB) exceeds the buffer pool "
+                     f"({pool / 1024 / 1024:.0f} MB); expect hit ratio to drop as data grows")
+    limit = parse_size(memory.upper().rstrip('B'))
+    if pool is not None and limit and pool > limit * 0.75:
+        notes.append(f"Buffer pool is over 75% of the {memory} memory limit the sweep ran with")
+    return best, notes
+
+def write_outputs(ranked, args):
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(args.output, f"sweep_{stamp}.json")
+    with open(path, 'w') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'scale': args.scale, 'clients': args.clients, 'ops_per_client': args.ops,
+            'memory': args.memory, 'cpus': args.cpus, 'workload': WORKLOAD,
+            'results': ranked,
+        }, f, indent=2, default=str)
+    print(f"\n✓ Results: {path}")
+    return path
+
+def print_recommendation(ranked, require_durable, memory, output):
+    best, notes = recommend(ranked, require_durable, memory)
+    for note in notes:
+        print(f"  ! {note}")
+    if best is None:
+        return
+    path = os.path.join(output, 'recommended.my.cnf')
+    with open(path, 'w') as f:
+        f.write(render_cnf(best['overrides'], note=f"Recommended by mysql_config_sweep.py (variant {best['variant']})"))
+    changes = ', '.join(f'{k}={v}' for k, v in best['overrides'].items()) or 'no changes'
+    print(f"✓ Recommended: {best['variant']} ({changes}) -> {path}")
+    print(f"  Review and copy over docker/mysql/my.cnf")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark my.cnf variants against a mixed workload")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_parser = sub.add_parser('run', help="Run the sweep")
+    run_parser.add_argument('--scale', type=float, default=1.0, help="Dataset scale (1 = 1000 students)")
+    run_parser.add_argument('--clients', type=int, default=16, help="Concurrent connections")
+    run_parser.add_argument('--ops', type=int, default=2000, help="Measured operations per client")
+    run_parser.add_argument('--only', help="Comma-separated subset of the built-in variants")
+    run_parser.add_argument('--variant', action='append', default=[],
+                            help="Extra variant 'name:key=value,key=value' (repeatable)")
+    run_parser.add_argument('--grid', action='append', default=[],
+                            help="Sweep 'key=v1,v2' combinations instead of the built-in variants (repeatable)")
+    run_parser.add_argument('--memory', default=MEMORY_LIMIT, help="Container memory limit")
+    run_parser.add_argument('--cpus', type=float, help="Container CPU limit")
+    run_parser.add_argument('--port', type=int, default=PORT)
+    run_parser.add_argument('--load-workers', type=int, default=4)
+    run_parser.add_argument('--output', default=OUTPUT_DIR)
+    run_parser.add_argument('--regenerate', action='store_true', help="Rebuild the cached dataset dump")
+    run_parser.add_argument('--keep', action='store_true', help="Leave the last container running")
+    run_parser.add_argument('--require-durable', action='store_true',
+                            help="Only recommend variants with flush_log_at_trx_commit=1 and sync_binlog=1")
+    report_parser = sub.add_parser('report', help="Re-rank a saved results file")
+    report_parser.add_argument('results')
+    report_parser.add_argument('--require-durable', action='store_true')
+    sub.add_parser('variants', help="List built-in variants")
+    args = parser.parse_args()
+
+    if args.command == 'variants':
+        base = read_base_settings()
+        for name, overrides in VARIANTS.items():
+            shown = ', '.join(f"{k}={v} (was {base.get(k, 'default')})" for k, v in overrides.items())
+            print(f"{name:<20} {shown or 'my.cnf as committed'}")
+        return
+
+    if args.command == 'report':
+        with open(args.results) as f:
+            saved = json.load(f)
+        ranked = rank(saved['results'])
+        print_ranking(ranked)
+        print_recommendation(ranked, args.require_durable, saved.get('memory', MEMORY_LIMIT),
+                             os.path.dirname(os.path.abspath(args.results)))
+        return
+
+    try:
+        if args.grid:
+            variants = {'current': {}, **grid_variants(args.grid)}
+        elif args.only:
+            unknown = [name for name in args.only.split(',') if name not in VARIANTS]
+            if unknown:
+                parser.error(f"unknown variants: {', '.join(unknown)}")
+            variants = {name: VARIANTS[name] for name in args.only.split(',')}
+        else:
+            variants = dict(VARIANTS)
+        variants.update(parse_variant(spec) for spec in args.variant)
+    except ValueError as e:
+        parser.error(str(e))
+
+    os.makedirs(args.output, exist_ok=True)
+    results = []
+    try:
+        dump_path = dataset_dump(args)
+        for name, overrides in variants.items():
+            results.append(run_variant(name, overrides, dump_path, args))
+    except KeyboardInterrupt:
+        print("\nInterrupted; ranking completed variants")
+    except (Error, RuntimeError, subprocess.CalledProcessError) as e:
+        print(f"✗ Sweep failed: {e}")
+        if not results:
+            sys.exit(1)
+    finally:
+        if not args.keep:
+            stop_server()
+
+    if results:
+        ranked = rank(results)
+        print_ranking(ranked)
+        write_outputs(ranked, args)
+        print_recommendation(ranked, args.require_durable, args.memory, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+PDF Pre-renderer for Student Portal
+Renders ID cards, receipts and performance reports ahead of time into the
+content-addressed cache read by the student download endpoints.
+
+Each document is keyed by a SHA-256 of the exact rows the endpoint renders it
+from (see getPDFCacheKey() in backend/includes/pdf_generator.php), so a
+changed marks or payment row simply produces a new key and stale files age
+out through size-based eviction. Files live in one directory per student under
+backend/cache/pdf/ (not served by nginx), which admin/students/delete.php
+removes with the student. Rendering still goes through TCPDF via
+backend/scripts/render_pdfs.php, run as a pool of PHP worker processes.
+
+Usage:
+    python database/prerender_pdfs.py                 # changes since the last run
+    python database/prerender_pdfs.py --all           # every student
+    python database/prerender_pdfs.py --since "2025-11-25 00:00:00"
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+# Outside uploads/, which nginx serves without auth; one directory per student code
+CACHE_DIR = os.path.join(BACKEND_DIR, 'cache', 'pdf')
+RENDER_SCRIPT = os.path.join(BACKEND_DIR, 'scripts', 'render_pdfs.php')
+WATERMARK_FILE = os.path.join(CACHE_DIR, '.watermark')
+
+# Must match PDF_CACHE_VERSION in pdf_generator.php
+CACHE_VERSION = '2'
+DEFAULT_MAX_CACHE_MB = 2048
+JOBS_PER_WORKER_CALL = 200
+
+# Column lists mirror the SELECTs in backend/api/student/download_*.php exactly,
+# since the cache key is computed from these rows on both sides.
+ID_CARD_QUERY = """
+    SELECT s.id, s.student_id, CONCAT(s.first_name, ' ', s.last_name) as full_name,
+           s.department, s.semester, s.enrollment_date, s.profile_image,
+           DATE_ADD(s.enrollment_date, INTERVAL 3 YEAR) as valid_until
+    FROM students s
+"""
+
+RECEIPT_QUERY = """
+    SELECT p.id, p.receipt_number, p.amount_paid, p.late_fine, p.total_amount,
+           p.payment_date, p.payment_method, p.transaction_id, f.fee_type, f.fee_name,
+           f.amount as base_amount, CONCAT(s.first_name, ' ', s.last_name) as student_name,
+           s.student_id, s.department, s.semester
+    FROM payments p
+    JOIN fees f ON p.fee_id = f.id
+    JOIN students s ON p.student_id = s.id
+"""
+
+REPORT_STUDENT_QUERY = """
+    SELECT s.id, s.student_id, CONCAT(s.first_name, ' ', s.last_name) as full_name,
+           s.department, s.semester, s.enrollment_date
+    FROM students s
+"""
+
+REPORT_MARKS_QUERY = """
+    SELECT m.student_id as _student, m.semester, s.subject_code, s.subject_name, s.credit_hours,
+           m.internal_marks, m.external_marks, m.total_marks, m.letter_grade, m.grade_point,
+           (m.grade_point * s.credit_hours) as credit_points
+    FROM marks m
+    JOIN subjects s ON m.subject_id = s.id
+"""
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def normalize(value):
+    """Stringify scalars the way normalizePDFCacheData() does in PHP"""
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8')
+    return str(value)
+
+def cache_key(doc_type, data):
+    payload = {'data': normalize(data), 'type': doc_type, 'version': CACHE_VERSION}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+def cache_path(student_code, key):
+    """Mirror getPDFCachePath() in pdf_generator.php"""
+    return os.path.join(CACHE_DIR, re.sub(r'[^A-Za-z0-9_-]', '_', str(student_code)), key + '.pdf')
+
+def student_code(doc_type, data):
+    return data['student']['student_id'] if doc_type == 'performance_report' else data['student_id']
+
+def fetch_dicts(cursor, query, params=()):
+    cursor.execute(query, params)
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def collect_jobs(cursor, since):
+    """Build render jobs for documents whose source rows changed since a timestamp"""
+    where, params = ("", ()) if since is None else (" WHERE {col} >= %s", (since,))
+    jobs = []
+
+    for row in fetch_dicts(cursor, ID_CARD_QUERY + where.format(col='s.updated_at'), params):
+        jobs.append(('id_card', row))
+
+    for row in fetch_dicts(cursor, RECEIPT_QUERY + where.format(col='p.updated_at'), params):
+        jobs.append(('receipt', row))
+
+    # Performance reports depend on all of a student's marks, so find the affected students first
+    if since is None:
+        cursor.execute("SELECT DISTINCT student_id FROM marks")
+    else:
+        cursor.execute("SELECT DISTINCT student_id FROM marks WHERE updated_at >= %s", params)
+    student_ids = [row[0] for row in cursor.fetchall()]
+
+    for start in range(0, len(student_ids), 1000):
+        chunk = student_ids[start:start + 1000]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        students = fetch_dicts(cursor, REPORT_STUDENT_QUERY + f" WHERE s.id IN ({placeholders})", chunk)
+        marks = fetch_dicts(cursor, REPORT_MARKS_QUERY
+                            + f" WHERE m.student_id IN ({placeholders}) ORDER BY m.semester, s.subject_code",
+                            chunk)
+        marks_by_student = {}
+        for mark in marks:
+            marks_by_student.setdefault(mark.pop('_student'), []).append(mark)
+        for student in students:
+            if student['id'] in marks_by_student:
+                jobs.append(('performance_report', {'student': student, 'marks': marks_by_student[student['id']]}))
+
+    return jobs
+
+def render_chunk(php_binary, lines):
+    """Render a chunk of jobs in one PHP process and return (ok, errors)"""
+    result = subprocess.run([php_binary, RENDER_SCRIPT], input='\n'.join(lines) + '\n',
+                            capture_output=True, text=True)
+    ok, errors = 0, []
+    for line in result.stdout.splitlines():
+        if line.startswith('OK '):
+            ok += 1
+        elif line.startswith('ERR '):
+            errors.append(line[4:])
+    if result.returncode != 0:
+        errors.append(result.stderr.strip() or f"render_pdfs.php exited with {result.returncode}")
+    return ok, errors
+
+def evict(max_bytes):
+    """Delete least recently used cache files until the cache fits in max_bytes"""
+    files = []
+    total = 0
+    for student_dir in os.scandir(CACHE_DIR):
+        if not student_dir.is_dir():
+            continue
+        for entry in os.scandir(student_dir.path):
+            if entry.name.endswith('.pdf'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+    if total <= max_bytes:
+        return 0, total
+
+    # Evict down to 90% so the next run does not immediately evict again
+    target = max_bytes * 0.9
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed, total
+
+def read_watermark():
+    try:
+        with open(WATERMARK_FILE) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def write_watermark(value):
+    with open(WATERMARK_FILE, 'w') as f:
+        f.write(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render student PDFs into the download cache")
+    parser.add_argument('--all', action='store_true', help="Render documents for every student")
+    parser.add_argument('--since', help="Only rows updated at or after this timestamp")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="PHP worker processes")
+    parser.add_argument('--php', default='php', help="PHP CLI binary")
+    parser.add_argument('--max-cache-mb', type=int, default=DEFAULT_MAX_CACHE_MB)
+    args = parser.parse_args()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    since = None if args.all else (args.since or read_watermark())
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        cursor = conn.cursor()
+        # Take the watermark from the server clock before reading, so concurrent writes are not missed
+        cursor.execute("SELECT NOW()")
+        run_started = str(cursor.fetchone()[0])
+        print(f"Collecting documents changed since {since or 'the beginning'}...")
+        jobs = collect_jobs(cursor, since)
+        cursor.close()
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    # Identical rows hash to an existing file, so only genuinely new documents are rendered
+    pending = []
+    for doc_type, data in jobs:
+        key = cache_key(doc_type, data)
+        student = student_code(doc_type, data)
+        if not os.path.exists(cache_path(student, key)):
+            pending.append(json.dumps({'key': key, 'student': normalize(student), 'type': doc_type,
+                                       'data': normalize(data)}, ensure_ascii=False))
+    print(f"  {len(jobs)} documents affected, {len(pending)} not cached")
+
+    rendered, errors = 0, []
+    chunks = [pending[i:i + JOBS_PER_WORKER_CALL] for i in range(0, len(pending), JOBS_PER_WORKER_CALL)]
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for ok, chunk_errors in pool.map(lambda chunk: render_chunk(args.php, chunk), chunks):
+            rendered += ok
+            errors.extend(chunk_errors)
+            print(f"  Rendered {rendered} documents...")
+
+    for error in errors:
+        print(f"  ✗ {error}")
+
+    removed, cache_bytes = evict(args.max_cache_mb * 1024 * 1024)
+    if not errors:
+        write_watermark(run_started)
+
+    elapsed = time.perf_counter() - start
+    print(f"✓ Rendered {rendered} documents in {elapsed:.1f}s "
+          f"(evicted {removed}, cache {cache_bytes / 1048576:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
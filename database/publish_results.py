@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Semester Results Publication for Student Portal
+Publishes a whole semester in one run: streams the semester's marks rows once,
+adds the ISA (out of 20) and ESA (out of 80) teachers entered through
+enter_semester_marks.php, and grades, credits and GPAs every student with
+array lookups instead of the per-request branch ladder. marks rows and semester_results (migration 13) are
+upserted in batched transactions, one per chunk of students.
+
+Grades, credit points, SGPA and CGPA follow backend/includes/grade_calculator.php
+(the same scale as GRADE_POINTS / MARKS_RANGES in generate_realistic_data.py),
+computed in exact integer cents so PHP's round-half-up results are reproduced.
+
+Rows with an ESA but no ISA are reported and skipped. With --derive-isa their
+ISA is instead derived from exam_marks as 20 x sum(marks_obtained) /
+sum(max_marks) over all of the student's exam_marks rows for the subject and
+semester, rounded half up to two decimals. The backend has no such formula;
+use it only where internals were recorded per exam and never entered as ISA.
+Stored isa_marks are never replaced. Apply migration 13 first: it also restores
+esa_marks/isa_marks on rows enter_semester_marks.php stored swapped.
+
+Usage:
+    python database/publish_results.py --session 3 --semester 5
+    python database/publish_results.py --session 3 --semester 5 --dry-run
+    python database/publish_results.py --session 3 --semester 5 --derive-isa
+"""
+
+import argparse
+import sys
+import os
+import time
+from collections import Counter
+from decimal import Decimal
+
+import numpy as np
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+# calculateGrade(): lower bound of each band in cents, ascending, with its
+# letter and grade point in quarter points (4.00 = 16)
+GRADE_BOUNDS = np.array([4000, 4500, 5000, 5500, 6000, 6500, 7000, 7500, 8000, 8500, 9000], dtype=np.int64)
+LETTERS = ['F', 'E', 'D', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+']
+GRADE_QUARTERS = np.array([0, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16], dtype=np.int64)
+FAIL = 0
+
+ISA_MAX_CENTS = 2000  # Internal Semester Assessment is out of 20
+DEFAULT_CREDITS = 4   # enter_semester_marks.php falls back to 4 credit hours
+CHUNK_ROWS = 20000
+KEY_SHIFT = 32
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def cents(value):
+    return int(round(value * 100))
+
+def decimal(value_cents):
+    return Decimal(int(value_cents)).scaleb(-2)
+
+def divide_half_up(numerator, denominator):
+    """numerator / denominator rounded half up (PHP round()), 0 where denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    safe = np.where(denominator > 0, denominator, 1)
+    return np.where(denominator > 0, (2 * numerator + safe) // (2 * safe), 0)
+
+def pair_keys(students, subjects):
+    return (np.asarray(students, dtype=np.int64) << KEY_SHIFT) | np.asarray(subjects, dtype=np.int64)
+
+class SortedLookup:
+    """Vectorized dict: int64 keys to value rows via searchsorted"""
+
+    def __init__(self, keys, values, width=1):
+        order = np.argsort(np.asarray(keys, dtype=np.int64), kind='stable')
+        self.keys = np.asarray(keys, dtype=np.int64)[order]
+        self.values = np.asarray(values, dtype=np.int64).reshape(len(self.keys), width)[order]
+
+    def get(self, keys, default):
+        """Values for keys (default where absent) and a found mask"""
+        keys = np.asarray(keys, dtype=np.int64)
+        result = np.full((len(keys), self.values.shape[1]), default, dtype=np.int64)
+        if not len(self.keys):
+            return result, np.zeros(len(keys), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[pos] == keys
+        result[found] = self.values[pos[found]]
+        return result, found
+
+def load_credit_hours(cursor):
+    """subjects.credit_hours indexed by subject id"""
+    cursor.execute("SELECT id, credit_hours FROM subjects")
+    rows = cursor.fetchall()
+    credits = np.full(max((r[0] for r in rows), default=0) + 1, DEFAULT_CREDITS, dtype=np.int64)
+    for subject_id, credit_hours in rows:
+        if credit_hours is not None:
+            credits[subject_id] = credit_hours
+    return credits
+
+def load_exam_isa(cursor, session_id, semester):
+    """exam_marks totals (obtained, maximum) in cents per (student, subject), for --derive-isa"""
+    cursor.execute("""
+        SELECT em.student_id, em.subject_id, SUM(em.marks_obtained), SUM(em.max_marks)
+        FROM exam_marks em
+        JOIN students ON students.id = em.student_id
+        WHERE students.session_id = %s AND em.semester = %s
+        GROUP BY em.student_id, em.subject_id
+    """, (session_id, semester))
+    rows = cursor.fetchall()
+    return SortedLookup(pair_keys([r[0] for r in rows], [r[1] for r in rows]),
+                        [(cents(r[2]), cents(r[3])) for r in rows], width=2)
+
+def load_prior_totals(cursor, session_id, semester):
+    """Credit hours and credit-point cents from earlier graded semesters, per student"""
+    cursor.execute("""
+        SELECT marks.student_id, SUM(subjects.credit_hours), SUM(marks.grade_point * subjects.credit_hours)
+        FROM marks
+        JOIN subjects ON marks.subject_id = subjects.id
+        WHERE marks.session_id = %s AND marks.semester < %s AND marks.grade_point IS NOT NULL
+        GROUP BY marks.student_id
+    """, (session_id, semester))
+    rows = cursor.fetchall()
+    return SortedLookup([r[0] for r in rows], [(int(r[1]), cents(r[2])) for r in rows], width=2)
+
+def stream_chunks(cursor, session_id, semester):
+    """Yield (student, subject, esa, isa) arrays in cents (isa -1 when not entered), cut only between students"""
+    cursor.execute("""
+        SELECT student_id, subject_id, esa_marks, isa_marks FROM marks
+        WHERE session_id = %s AND semester = %s AND esa_marks IS NOT NULL
+        ORDER BY student_id, subject_id
+    """, (session_id, semester))
+    buffered = []
+    while True:
+        rows = cursor.fetchmany(CHUNK_ROWS)
+        buffered.extend(rows)
+        if rows and len(buffered) < CHUNK_ROWS:
+            continue
+        if not buffered:
+            return
+        if rows:
+            # Hold back the last student, whose rows may continue in the next fetch
+            last = buffered[-1][0]
+            cut = len(buffered)
+            while cut and buffered[cut - 1][0] == last:
+                cut -= 1
+            if cut == 0:
+                continue
+            chunk, buffered = buffered[:cut], buffered[cut:]
+        else:
+            chunk, buffered = buffered, []
+        yield (np.array([r[0] for r in chunk], dtype=np.int64),
+               np.array([r[1] for r in chunk], dtype=np.int64),
+               np.array([cents(r[2]) for r in chunk], dtype=np.int64),
+               np.array([cents(r[3]) if r[3] is not None else -1 for r in chunk], dtype=np.int64))
+        if not rows:
+            return
+
+def grade_chunk(chunk, credits, exam_isa, prior):
+    """Per-subject results and per-student GPA rows for one chunk of students"""
+    students, subjects, esa_values, isa = chunk
+    missing = isa < 0
+    derived = 0
+    if exam_isa is not None and missing.any():
+        totals, found = exam_isa.get(pair_keys(students[missing], subjects[missing]), 0)
+        found &= totals[:, 1] > 0
+        isa[np.flatnonzero(missing)[found]] = divide_half_up(ISA_MAX_CENTS * totals[found, 0], totals[found, 1])
+        derived = int(found.sum())
+        missing = isa < 0
+    pending = int(missing.sum())
+    graded = ~missing
+    students, subjects, isa, esa_values = students[graded], subjects[graded], isa[graded], esa_values[graded]
+
+    total = esa_values + isa
+    grade = np.searchsorted(GRADE_BOUNDS, total, side='right')
+    quarters = GRADE_QUARTERS[grade]
+    known = subjects < len(credits)
+    credit_hours = np.where(known, credits[np.where(known, subjects, 0)], DEFAULT_CREDITS)
+    credit_points = quarters * credit_hours * 25  # GP x credits, in cents
+
+    subject_rows = [(int(s), int(sub), decimal(e), decimal(i), decimal(i), decimal(e), decimal(t),
+                     decimal(q * 25), LETTERS[g], decimal(cp))
+                    for s, sub, e, i, t, q, g, cp in zip(students, subjects, esa_values, isa, total,
+                                                         quarters, grade, credit_points)]
+
+    if not len(students):
+        return subject_rows, [], pending, derived, grade
+    bounds = np.flatnonzero(np.r_[True, students[1:] != students[:-1]])
+    ids = students[bounds]
+    subject_count = np.diff(np.r_[bounds, len(students)])
+    failed = np.add.reduceat((grade == FAIL).astype(np.int64), bounds)
+    hours = np.add.reduceat(credit_hours, bounds)
+    points = np.add.reduceat(credit_points, bounds)
+    sgpa = divide_half_up(points, hours)
+
+    earlier, _ = prior.get(ids, 0)
+    cumulative_hours = earlier[:, 0] + hours
+    cumulative_points = earlier[:, 1] + points
+    cgpa = divide_half_up(cumulative_points, cumulative_hours)
+
+    gpa_rows = [(int(i), int(n), int(f), int(h), decimal(p), decimal(g), int(ch), decimal(cp), decimal(c))
+                for i, n, f, h, p, g, ch, cp, c in zip(ids, subject_count, failed, hours, points, sgpa,
+                                                       cumulative_hours, cumulative_points, cgpa)]
+    return subject_rows, gpa_rows, pending, derived, grade
+
+def write_results(cursor, session_id, semester, subject_rows, gpa_rows):
+    cursor.executemany("""
+        INSERT INTO marks (student_id, subject_id, session_id, semester, esa_marks, isa_marks,
+                           internal_marks, external_marks, total_marks, grade_point, letter_grade, credit_points)
+        VALUES (%s, %s, {0}, {1}, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            esa_marks = VALUES(esa_marks),
+            isa_marks = VALUES(isa_marks),
+            internal_marks = VALUES(internal_marks),
+            external_marks = VALUES(external_marks),
+            total_marks = VALUES(total_marks),
+            grade_point = VALUES(grade_point),
+            letter_grade = VALUES(letter_grade),
+            credit_points = VALUES(credit_points)
+    """.format(int(session_id), int(semester)), subject_rows)
+    cursor.executemany("""
+        INSERT INTO semester_results (student_id, session_id, semester, subject_count, failed_count,
+                                      credit_hours, credit_points, sgpa,
+                                      cumulative_credit_hours, cumulative_credit_points, cgpa)
+        VALUES (%s, {0}, {1}, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            subject_count = VALUES(subject_count),
+            failed_count = VALUES(failed_count),
+            credit_hours = VALUES(credit_hours),
+            credit_points = VALUES(credit_points),
+            sgpa = VALUES(sgpa),
+            cumulative_credit_hours = VALUES(cumulative_credit_hours),
+            cumulative_credit_points = VALUES(cumulative_credit_points),
+            cgpa = VALUES(cgpa),
+            published_at = CURRENT_TIMESTAMP
+    """.format(int(session_id), int(semester)), gpa_rows)
+
+def publish(read_conn, write_conn, session_id, semester, dry_run=False, derive_isa=False):
+    """Grade the semester chunk by chunk; returns summary counters"""
+    read_conn.start_transaction(consistent_snapshot=True, readonly=True)
+    read_cursor = read_conn.cursor()
+    credits = load_credit_hours(read_cursor)
+    exam_isa = load_exam_isa(read_cursor, session_id, semester) if derive_isa else None
+    prior = load_prior_totals(read_cursor, session_id, semester)
+    write_cursor = write_conn.cursor() if write_conn else None
+    summary = {'subjects': 0, 'students': 0, 'missing_isa': 0, 'derived_isa': 0, 'sgpa_cents': 0,
+               'grades': Counter()}
+    for chunk in stream_chunks(read_cursor, session_id, semester):
+        subject_rows, gpa_rows, pending, derived, grades = grade_chunk(chunk, credits, exam_isa, prior)
+        if not dry_run and subject_rows:
+            write_results(write_cursor, session_id, semester, subject_rows, gpa_rows)
+            write_conn.commit()
+        summary['subjects'] += len(subject_rows)
+        summary['students'] += len(gpa_rows)
+        summary['missing_isa'] += pending
+        summary['derived_isa'] += derived
+        summary['sgpa_cents'] += sum(cents(row[5]) for row in gpa_rows)
+        summary['grades'].update(LETTERS[g] for g in grades)
+    read_conn.commit()
+    read_cursor.close()
+    if write_cursor:
+        write_cursor.close()
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a semester's results in one batched run")
+    parser.add_argument('--session', type=int, required=True, help="sessions.id")
+    parser.add_argument('--semester', type=int, required=True)
+    parser.add_argument('--dry-run', action='store_true', help="Compute and report without writing")
+    parser.add_argument('--derive-isa', action='store_true',
+                        help="Derive missing ISA from exam_marks (20 x sum obtained / sum max)")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    write_conn = None if args.dry_run else create_connection()
+    if not conn or (not args.dry_run and not write_conn):
+        sys.exit(1)
+
+    try:
+        start = time.perf_counter()
+        summary = publish(conn, write_conn, args.session, args.semester, args.dry_run, args.derive_isa)
+        elapsed = time.perf_counter() - start
+        verb = "Graded" if args.dry_run else "Published"
+        print(f"✓ {verb} {summary['subjects']} subject results for {summary['students']} students "
+              f"(session {args.session}, semester {args.semester}) in {elapsed:.1f}s")
+        if summary['students']:
+            print(f"  Mean SGPA: {summary['sgpa_cents'] / summary['students'] / 100:.2f}")
+        print("  Grades: " + ", ".join(f"{letter} {summary['grades'][letter]}"
+                                       for letter in reversed(LETTERS) if summary['grades'][letter]))
+        if summary['derived_isa']:
+            print(f"  {summary['derived_isa']} ISA marks derived from exam_marks (--derive-isa)")
+        if summary['missing_isa']:
+            hint = "" if args.derive_isa else "; --derive-isa fills them from exam_marks"
+            print(f"  {summary['missing_isa']} ESA entries have no ISA marks (skipped{hint})")
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        if write_conn:
+            write_conn.rollback()
+        sys.exit(1)
+    finally:
+        conn.close()
+        if write_conn:
+            write_conn.close()
+
+if __name__ == "__main__":
+    main()
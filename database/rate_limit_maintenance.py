@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Rate Limit & Token Blacklist Maintenance for Student Portal
+Purges expired rate_limits and token_blacklist rows in small batches off the
+request path, and benchmarks alternative rate limiter table designs by
+replaying a synthetic request stream against each of them.
+
+Usage:
+    python database/rate_limit_maintenance.py purge [--batch-size 500]
+    python database/rate_limit_maintenance.py bench [--requests 20000 --workers 8]
+
+Cron job example (every minute):
+    * * * * * /usr/bin/python3 /path/to/database/rate_limit_maintenance.py purge
+
+Benchmark designs (all run on scratch bench_* tables):
+    legacy          original RateLimiter.php: DELETE expired + SELECT + UPDATE/INSERT
+    reset_in_place  current RateLimiter.php: SELECT + UPDATE/INSERT, stale windows restarted
+    fixed_window    one INSERT ... ON DUPLICATE KEY UPDATE per request
+    sliding_window  fixed-window upsert plus a read of the previous window, weighted
+
+Global InnoDB counters are used for redo and lock waits, so run the benchmark
+on an otherwise idle server.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+# Longest window passed to RateLimiter::check() (cors.php and login.php both use 60s)
+MAX_WINDOW = 60
+PURGE_BATCH_SIZE = 500
+PURGE_PAUSE = 0.05
+
+# Endpoints the limiter sees most during the day
+BENCH_ENDPOINTS = [
+    'login_attempt', '/api/auth/verify.php', '/api/student/get_marks.php',
+    '/api/student/get_attendance.php', '/api/notices/get_all.php',
+    '/api/teacher/mark_attendance.php', '/api/student/get_fees.php'
+]
+
+BENCH_TABLES = {
+    'legacy': """
+        CREATE TABLE bench_rate_limits_legacy (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            ip_address VARCHAR(45) NOT NULL,
+            endpoint VARCHAR(255) NOT NULL,
+            requests INT DEFAULT 1,
+            start_time INT NOT NULL,
+            INDEX idx_ip_endpoint (ip_address, endpoint)
+        )
+    """,
+    'reset_in_place': """
+        CREATE TABLE bench_rate_limits_reset_in_place (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            ip_address VARCHAR(45) NOT NULL,
+            endpoint VARCHAR(255) NOT NULL,
+            requests INT DEFAULT 1,
+            start_time INT NOT NULL,
+            INDEX idx_ip_endpoint (ip_address, endpoint),
+            INDEX idx_start_time (start_time)
+        )
+    """,
+    'fixed_window': """
+        CREATE TABLE bench_rate_limits_fixed_window (
+            ip_address VARCHAR(45) NOT NULL,
+            endpoint VARCHAR(255) NOT NULL,
+            window_start INT NOT NULL,
+            requests INT NOT NULL DEFAULT 1,
+            PRIMARY KEY (ip_address, endpoint, window_start),
+            INDEX idx_window_start (window_start)
+        )
+    """,
+    'sliding_window': """
+        CREATE TABLE bench_rate_limits_sliding_window (
+            ip_address VARCHAR(45) NOT NULL,
+            endpoint VARCHAR(255) NOT NULL,
+            window_start INT NOT NULL,
+            requests INT NOT NULL DEFAULT 1,
+            PRIMARY KEY (ip_address, endpoint, window_start),
+            INDEX idx_window_start (window_start)
+        )
+    """
+}
+
+GLOBAL_COUNTERS = ['Innodb_row_lock_waits', 'Innodb_row_lock_time', 'Innodb_os_log_written',
+                   'Innodb_rows_inserted', 'Innodb_rows_updated', 'Innodb_rows_deleted']
+HANDLER_WRITES = ['Handler_write', 'Handler_update', 'Handler_delete']
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def purge_expired(conn, table, column, cutoff, batch_size=PURGE_BATCH_SIZE, pause=PURGE_PAUSE):
+    """Delete rows with column < cutoff in small committed batches to keep lock hold times short"""
+    cursor = conn.cursor()
+    total = 0
+    try:
+        while True:
+            cursor.execute(f"DELETE FROM {table} WHERE {column} < %s ORDER BY {column} LIMIT %s",
+                           (cutoff, batch_size))
+            deleted = cursor.rowcount
+            conn.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
+            # Give request-path writers a chance at the index pages between batches
+            time.sleep(pause)
+    except Error as e:
+        conn.rollback()
+        if e.errno == 1146:  # Table not created yet
+            return total
+        raise
+    finally:
+        cursor.close()
+
+def purge(conn, batch_size, max_window):
+    now = int(time.time())
+    start = time.perf_counter()
+    rate_limits = purge_expired(conn, 'rate_limits', 'start_time', now - max_window, batch_size)
+    tokens = purge_expired(conn, 'token_blacklist', 'expires_at', now, batch_size)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✓ Purged {rate_limits} rate_limits and {tokens} token_blacklist rows in {elapsed:.0f} ms")
+
+def check_legacy(cursor, ip, endpoint, now, limit, window):
+    cursor.execute("DELETE FROM bench_rate_limits_legacy WHERE start_time < %s", (now - window,))
+    cursor.execute("SELECT id, requests FROM bench_rate_limits_legacy WHERE ip_address = %s AND endpoint = %s",
+                   (ip, endpoint))
+    row = cursor.fetchone()
+    if row:
+        if row[1] >= limit:
+            return False
+        cursor.execute("UPDATE bench_rate_limits_legacy SET requests = requests + 1 WHERE id = %s", (row[0],))
+    else:
+        cursor.execute("""
+            INSERT INTO bench_rate_limits_legacy (ip_address, endpoint, requests, start_time)
+            VALUES (%s, %s, 1, %s)
+        """, (ip, endpoint, now))
+    return True
+
+def check_reset_in_place(cursor, ip, endpoint, now, limit, window):
+    cursor.execute("""
+        SELECT id, requests, start_time FROM bench_rate_limits_reset_in_place
+        WHERE ip_address = %s AND endpoint = %s
+    """, (ip, endpoint))
+    row = cursor.fetchone()
+    if row and row[2] < now - window:
+        cursor.execute("UPDATE bench_rate_limits_reset_in_place SET requests = 1, start_time = %s WHERE id = %s",
+                       (now, row[0]))
+    elif row:
+        if row[1] >= limit:
+            return False
+        cursor.execute("UPDATE bench_rate_limits_reset_in_place SET requests = requests + 1 WHERE id = %s",
+                       (row[0],))
+    else:
+        cursor.execute("""
+            INSERT INTO bench_rate_limits_reset_in_place (ip_address, endpoint, requests, start_time)
+            VALUES (%s, %s, 1, %s)
+        """, (ip, endpoint, now))
+    return True
+
+def upsert_window(cursor, table, ip, endpoint, window_start):
+    """Increment a window counter and return the new count in a single statement"""
+    # LAST_INSERT_ID(expr) makes the updated count come back in the OK packet
+    cursor.execute(f"""
+        INSERT INTO {table} (ip_address, endpoint, window_start, requests) VALUES (%s, %s, %s, 1)
+        ON DUPLICATE KEY UPDATE requests = LAST_INSERT_ID(requests + 1)
+    """, (ip, endpoint, window_start))
+    return cursor.lastrowid or 1
+
+def check_fixed_window(cursor, ip, endpoint, now, limit, window):
+    window_start = now - now % window
+    return upsert_window(cursor, 'bench_rate_limits_fixed_window', ip, endpoint, window_start) <= limit
+
+def check_sliding_window(cursor, ip, endpoint, now, limit, window):
+    window_start = now - now % window
+    current = upsert_window(cursor, 'bench_rate_limits_sliding_window', ip, endpoint, window_start)
+    cursor.execute("""
+        SELECT requests FROM bench_rate_limits_sliding_window
+        WHERE ip_address = %s AND endpoint = %s AND window_start = %s
+    """, (ip, endpoint, window_start - window))
+    row = cursor.fetchone()
+    previous = row[0] if row else 0
+    # Weight the previous window by how much of it still overlaps the sliding window
+    overlap = 1 - (now - window_start) / window
+    return previous * overlap + current <= limit
+
+DESIGNS = {
+    'legacy': check_legacy,
+    'reset_in_place': check_reset_in_place,
+    'fixed_window': check_fixed_window,
+    'sliding_window': check_sliding_window
+}
+
+def generate_stream(count, ips, rate, seed):
+    """Synthetic (ip, endpoint, timestamp) stream with a few hot campus NAT addresses"""
+    rng = random.Random(seed)
+    start = int(time.time())
+    stream = []
+    for i in range(count):
+        # Pareto-distributed index: a handful of shared IPs carry most of the traffic
+        ip_index = int(rng.paretovariate(1.2)) % ips
+        ip = f"10.{ip_index // 65536 % 256}.{ip_index // 256 % 256}.{ip_index % 256}"
+        stream.append((ip, rng.choice(BENCH_ENDPOINTS), start + int(i / rate)))
+    return stream
+
+def read_status(cursor, scope, names):
+    placeholders = ', '.join(['%s'] * len(names))
+    cursor.execute(f"SHOW {scope} STATUS WHERE Variable_name IN ({placeholders})", names)
+    return {name: int(value) for name, value in cursor.fetchall()}
+
+def run_design(design, stream, workers, limit, window):
+    """Replay the stream against one design and return its metrics"""
+    check = DESIGNS[design]
+    table = f"bench_rate_limits_{design}"
+
+    admin = create_connection()
+    cursor = admin.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(BENCH_TABLES[design])
+    before = read_status(cursor, 'GLOBAL', GLOBAL_COUNTERS)
+
+    latencies = []
+    handler_writes = [0]
+    denied = [0]
+    errors = []
+    lock = threading.Lock()
+
+    def worker(index):
+        conn = create_connection()
+        # PDO runs in autocommit mode, so each statement is its own transaction here too
+        conn.autocommit = True
+        cur = conn.cursor()
+        start_status = read_status(cur, 'SESSION', HANDLER_WRITES)
+        local_latencies = []
+        local_denied = 0
+        try:
+            for ip, endpoint, now in stream[index::workers]:
+                started = time.perf_counter()
+                if not check(cur, ip, endpoint, now, limit, window):
+                    local_denied += 1
+                local_latencies.append(time.perf_counter() - started)
+        except Error as e:
+            with lock:
+                errors.append(str(e))
+        end_status = read_status(cur, 'SESSION', HANDLER_WRITES)
+        cur.close()
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            denied[0] += local_denied
+            handler_writes[0] += sum(end_status[k] - start_status[k] for k in HANDLER_WRITES)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    after = read_status(cursor, 'GLOBAL', GLOBAL_COUNTERS)
+    delta = {k: after[k] - before[k] for k in GLOBAL_COUNTERS}
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.close()
+    admin.close()
+
+    latencies.sort()
+    requests = len(latencies) or 1
+    return {
+        'design': design,
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0,
+        'p99_ms': latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000 if latencies else 0,
+        'rows_written_per_req': handler_writes[0] / requests,
+        'redo_bytes_per_req': delta['Innodb_os_log_written'] / requests,
+        'lock_waits': delta['Innodb_row_lock_waits'],
+        'lock_wait_ms': delta['Innodb_row_lock_time'],
+        'denied': denied[0],
+        'errors': errors
+    }
+
+def bench(args):
+    stream = generate_stream(args.requests, args.ips, args.rate, args.seed)
+    print(f"Replaying {len(stream)} requests from {args.ips} IPs with {args.workers} workers...")
+
+    results = []
+    for design in args.designs:
+        print(f"  Running {design}...")
+        results.append(run_design(design, stream, args.workers, args.limit, args.window))
+
+    print()
+    print(f"{'design':<16}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'rows/req':>10}"
+          f"{'redo B/req':>12}{'lock waits':>12}{'wait ms':>9}{'denied':>8}")
+    for r in results:
+        print(f"{r['design']:<16}{r['throughput']:>10.0f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+              f"{r['rows_written_per_req']:>10.2f}{r['redo_bytes_per_req']:>12.0f}"
+              f"{r['lock_waits']:>12}{r['lock_wait_ms']:>9}{r['denied']:>8}")
+        for error in r['errors']:
+            print(f"  ✗ {r['design']}: {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain and benchmark the rate limiter tables")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    purge_parser = sub.add_parser('purge', help="Delete expired rate limits and blacklisted tokens")
+    purge_parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE)
+    purge_parser.add_argument('--max-window', type=int, default=MAX_WINDOW,
+                              help="Longest rate limit window in seconds")
+
+    bench_parser = sub.add_parser('bench', help="Compare rate limiter designs on a synthetic stream")
+    bench_parser.add_argument('--requests', type=int, default=20000)
+    bench_parser.add_argument('--ips', type=int, default=2000)
+    bench_parser.add_argument('--rate', type=float, default=500.0, help="Simulated requests per second")
+    bench_parser.add_argument('--workers', type=int, default=8)
+    bench_parser.add_argument('--limit', type=int, default=100)
+    bench_parser.add_argument('--window', type=int, default=MAX_WINDOW)
+    bench_parser.add_argument('--seed', type=int, default=42)
+    bench_parser.add_argument('--designs', nargs='+', choices=list(DESIGNS), default=list(DESIGNS))
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        try:
+            bench(args)
+        except Error as e:
+            print(f"✗ Database Error: {e}")
+            sys.exit(1)
+        return
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        purge(conn, args.batch_size, args.max_window)
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
+import os
+
 import mysql.connector
 from mysql.connector import Error
 
+# For repeated resets between test suites, snapshot once with
+# `python database/fixture_reset.py snapshot --seed-users` and then use
+# `python database/fixture_reset.py restore`, which only rewrites changed tables.
+
 # Database configuration
 DB_CONFIG = {
     'host': 'localhost',
     'user': 'root',
-    'password': '', # Try empty password first, as per QUICK_START.md (XAMPP default)
+    'password': os.environ.get('DB_PASSWORD', ''), # DB_PASSWORD if set, else empty (XAMPP default per QUICK_START.md)
     'database': 'studentportal'
 }
 
@@ -18,8 +24,8 @@ def create_connection():
         connection = mysql.connector.connect(**DB_CONFIG)
         return connection
     except Error as e:
-        # Try with password 'root' if empty failed
-        if e.errno == 1045: # Access denied
+        # Try with password 'root' if empty failed and DB_PASSWORD was not given
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
             try:
                 DB_CONFIG['password'] = 'root'
                 connection = mysql.connector.connect(**DB_CONFIG)
@@ -0,0 +1,839 @@
+#!/usr/bin/env python3
+"""
+Response Cache Warmer for Student Portal
+Precomputes the JSON payloads of the hot read-only student endpoints straight
+from the database into the file-backed cache read by
+backend/includes/ResponseCache.php, so result day and term start are served
+from disk instead of every request re-running the same joins:
+
+    student/get_marks.php            student/<id>/marks-<session>-<semester>
+    student/get_current_results.php  student/<id>/current_results-<semester>
+    student/get_attendance.php       student/<id>/attendance-daily-<semester>-<month>-<year>
+    student/get_fees.php             student/<id>/fees-<session>
+    notices/get_all.php              notices/<department>/<semester>
+
+Payloads are built with one set-based query per endpoint and chunk of students
+and mirror each endpoint's value types (PDO native ints, DECIMALs as strings,
+PHP float casts and round()). Entries carry a TTL (until midnight for payloads
+that depend on today's date), the cache is size-bounded with LRU eviction by
+mtime, and `watch` invalidates and rewarms only the students whose marks,
+exam marks, attendance, payments or fees changed, plus the notice lists a
+changed notice targets. Each poll re-scans a short window behind its
+watermarks for rows committed late, and cached students that were deleted
+are dropped. MemoryCache is an in-process stand-in with the same
+interface for tests.
+
+Usage:
+    python database/response_cache.py warm [--student 42 ...] [--only marks,fees]
+    python database/response_cache.py watch [--interval 5]
+    python database/response_cache.py invalidate --student 42 [--endpoint fees]
+    python database/response_cache.py invalidate --notices [--department "Computer Science"]
+    python database/response_cache.py evict [--max-mb 512]
+    python database/response_cache.py stats [--reset]
+"""
+
+import argparse
+import calendar
+import json
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from urllib.parse import quote
+
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+CACHE_DIR = os.path.join(BACKEND_DIR, 'cache', 'response')  # Must match RESPONSE_CACHE_DIR in ResponseCache.php
+METRICS_FILE = 'metrics.log'
+STATE_FILE = '.watermarks.json'
+
+DEFAULT_TTL = 3600  # Must match RESPONSE_CACHE_TTL in ResponseCache.php
+DEFAULT_MAX_CACHE_MB = 512
+POLL_SECONDS = 5
+OVERLAP_SECONDS = 10  # How far behind its watermark each poll re-scans
+STUDENT_CHUNK = 1000
+ENDPOINTS = ['marks', 'current_results', 'attendance', 'fees', 'notices']
+EXAM_TYPES = ['class_test', 'internal_1', 'internal_2']
+
+# Source table, change column, and the per-student endpoints it feeds
+CHANGE_SOURCES = [
+    ('marks', 'updated_at', ['marks']),
+    ('exam_marks', 'updated_at', ['current_results']),
+    ('attendance', 'marked_at', ['attendance']),
+    ('payments', 'updated_at', ['fees']),
+    ('students', 'updated_at', ['marks', 'current_results', 'attendance', 'fees']),
+]
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+# ---------------------------------------------------------------------------
+# PHP value semantics
+# ---------------------------------------------------------------------------
+
+def php_round(value, places=2):
+    """round() as PHP does it: half away from zero on the shortest decimal repr"""
+    return float(Decimal(repr(float(value))).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP))
+
+def php_float(value):
+    return float(value) if value is not None else 0.0
+
+def pdo_value(value):
+    """What PDO (native prepares) hands PHP for a column value"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8')
+    return value
+
+def php_json(data):
+    """json_encode() with default flags: escaped slashes and unicode"""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=True).replace('/', '\\/')
+
+def segment(department):
+    """ResponseCache::segment(): rawurlencode, '_' for an empty department"""
+    return '_' if not department else quote(department, safe='')
+
+def ttl_until_midnight(now=None):
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1, min(DEFAULT_TTL, int((midnight - now).total_seconds())))
+
+# ---------------------------------------------------------------------------
+# Cache backends
+# ---------------------------------------------------------------------------
+
+class MemoryCache:
+    """In-process LRU stand-in for FileCache with the same interface"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_CACHE_MB * 1024 * 1024, clock=time.time):
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.size = 0
+        self.stats = Counter()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] < self.clock():
+            self._remove(key)
+            self.stats['expired'] += 1
+            entry = None
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry[1]
+
+    def set(self, key, body, ttl=DEFAULT_TTL):
+        self._remove(key)
+        self.entries[key] = (self.clock() + ttl, body)
+        self.size += len(body)
+        self.stats['sets'] += 1
+        while self.size > self.max_bytes and self.entries:
+            self._remove(next(iter(self.entries)))
+            self.stats['evictions'] += 1
+
+    def invalidate(self, prefix):
+        keys = [key for key in self.entries if key.startswith(prefix)]
+        for key in keys:
+            self._remove(key)
+        self.stats['invalidations'] += len(keys)
+        return len(keys)
+
+    def invalidate_endpoint(self, endpoint):
+        """Drop one endpoint's entries for every student (student/*/<endpoint>-*)"""
+        keys = [key for key in self.entries
+                if key.startswith('student/') and key.split('/', 2)[2].startswith(endpoint + '-')]
+        for key in keys:
+            self._remove(key)
+        self.stats['invalidations'] += len(keys)
+        return len(keys)
+
+    def cached_students(self):
+        return {int(key.split('/')[1]) for key in self.entries if key.startswith('student/')}
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+class FileCache:
+    """Entry files under CACHE_DIR: expiry timestamp line, then the payload"""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=DEFAULT_MAX_CACHE_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.size = None
+        self.stats = Counter()
+
+    def path(self, key):
+        return os.path.join(self.root, key + '.json')
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at = int(f.readline() or 0)
+                body = f.read().decode('utf-8')
+        except FileNotFoundError:
+            self.stats['misses'] += 1
+            return None
+        if expires_at < time.time() or not body:
+            self._unlink(path)
+            self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return None
+        os.utime(path)
+        self.stats['hits'] += 1
+        return body
+
+    def set(self, key, body, ttl=DEFAULT_TTL):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = f"{int(time.time()) + ttl}\n{body}".encode('utf-8')
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self.stats['sets'] += 1
+        if self.size is not None:
+            self.size += len(data) - previous
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def invalidate(self, prefix):
+        """Same matching as ResponseCache::invalidate(): a directory, or name prefix within it"""
+        directory = os.path.dirname(os.path.join(self.root, prefix + 'x'))
+        base = '' if prefix.endswith('/') else os.path.basename(prefix)
+        removed = 0
+        for dirpath, _, filenames in os.walk(directory):
+            for name in filenames:
+                if name.startswith(base) and name.endswith('.json'):
+                    removed += self._unlink(os.path.join(dirpath, name))
+        self.stats['invalidations'] += removed
+        return removed
+
+    def _student_dirs(self):
+        try:
+            return [entry for entry in os.scandir(os.path.join(self.root, 'student'))
+                    if entry.is_dir() and entry.name.isdigit()]
+        except FileNotFoundError:
+            return []
+
+    def invalidate_endpoint(self, endpoint):
+        """Drop one endpoint's entries for every student (student/*/<endpoint>-*)"""
+        removed = 0
+        for student_dir in self._student_dirs():
+            for name in os.listdir(student_dir.path):
+                if name.startswith(endpoint + '-') and name.endswith('.json'):
+                    removed += self._unlink(os.path.join(student_dir.path, name))
+        self.stats['invalidations'] += removed
+        return removed
+
+    def cached_students(self):
+        return {int(entry.name) for entry in self._student_dirs()}
+
+    def _unlink(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        if self.size is not None:
+            self.size -= size
+        return 1
+
+    def scan(self):
+        """(mtime, size, path, expired) for every entry; also resets the size tally"""
+        entries, total, now = [], 0, time.time()
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                    with open(path, 'rb') as f:
+                        expired = int(f.readline() or 0) < now
+                except (OSError, ValueError):
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path, expired))
+                total += stat.st_size
+        self.size = total
+        return entries
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones down to 90% of max_bytes"""
+        entries = self.scan()
+        removed = 0
+        for _, _, path, expired in entries:
+            if expired:
+                removed += self._unlink(path)
+        if self.size > self.max_bytes:
+            target = self.max_bytes * 0.9
+            for _, _, path, expired in sorted(entries):
+                if self.size <= target:
+                    break
+                if not expired:
+                    removed += self._unlink(path)
+        self.stats['evictions'] += removed
+        return removed
+
+    def metrics(self, reset=False):
+        """Hit/miss counts per endpoint recorded by ResponseCache.php"""
+        path = os.path.join(self.root, METRICS_FILE)
+        if reset and os.path.exists(path):
+            rotated = path + '.1'
+            os.replace(path, rotated)
+            path = rotated
+        counts = Counter()
+        try:
+            with open(path) as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2:
+                        counts[(parts[1], parts[0])] += 1
+        except FileNotFoundError:
+            pass
+        return counts
+
+# ---------------------------------------------------------------------------
+# Payload builders (one per endpoint, mirroring its response)
+# ---------------------------------------------------------------------------
+
+def fetch_dicts(cursor, query, params=()):
+    cursor.execute(query, params)
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def in_list(ids):
+    return ', '.join(['%s'] * len(ids))
+
+class PayloadBuilder:
+    """Builds (key, payload, ttl) entries for chunks of students"""
+
+    def __init__(self, cursor, today=None):
+        self.cursor = cursor
+        self.today = today or date.today()
+        cursor.execute("SELECT id FROM sessions WHERE is_active = 1 LIMIT 1")
+        rows = cursor.fetchall()
+        self.session_id = rows[0][0] if rows else None
+
+    def students(self, ids=None):
+        query = "SELECT id, semester, department, program FROM students"
+        if ids is None:
+            return fetch_dicts(self.cursor, query + " ORDER BY id")
+        students = []
+        for start in range(0, len(ids), STUDENT_CHUNK):
+            chunk = list(ids[start:start + STUDENT_CHUNK])
+            students += fetch_dicts(self.cursor, query + f" WHERE id IN ({in_list(chunk)}) ORDER BY id", chunk)
+        return students
+
+    def marks(self, students):
+        """get_marks.php for the active session: current semester plus every semester with marks"""
+        if self.session_id is None:
+            return
+        ids = [s['id'] for s in students]
+        rows = fetch_dicts(self.cursor, f"""
+            SELECT m.student_id AS _student, m.semester AS _semester,
+                   m.id, m.internal_marks, m.external_marks, m.total_marks, m.grade_point,
+                   m.letter_grade, m.remarks, s.subject_code, s.subject_name, s.credit_hours,
+                   (m.grade_point * s.credit_hours) as credit_points
+            FROM marks m
+            JOIN subjects s ON m.subject_id = s.id
+            WHERE m.session_id = %s AND m.student_id IN ({in_list(ids)})
+            ORDER BY m.student_id, m.semester, s.subject_code
+        """, [self.session_id] + ids)
+        by_student = {}
+        for row in rows:
+            by_student.setdefault(row.pop('_student'), {}).setdefault(row.pop('_semester'), []).append(row)
+
+        for student in students:
+            semesters = by_student.get(student['id'], {})
+            # calculateCGPAFromDB(): every marks row of the session
+            all_rows = [row for rows in semesters.values() for row in rows]
+            total_points = sum((row['credit_points'] for row in all_rows if row['credit_points'] is not None), Decimal(0))
+            total_credits = sum(row['credit_hours'] for row in all_rows)
+            cgpa = php_round(float(total_points) / total_credits) if total_credits else 0.0
+
+            for semester in sorted(set(semesters) | {student['semester']}):
+                marks, credits, credit_points = [], 0, 0.0
+                for row in semesters.get(semester, []):
+                    mark = {key: pdo_value(value) for key, value in row.items()}
+                    for key in ('internal_marks', 'external_marks', 'total_marks', 'grade_point', 'credit_points'):
+                        mark[key] = php_float(row[key])
+                    mark['credit_hours'] = int(row['credit_hours'])
+                    credits += mark['credit_hours']
+                    credit_points += mark['credit_points']
+                    marks.append(mark)
+                yield (f"student/{student['id']}/marks-{self.session_id}-{semester}", {
+                    'marks': marks,
+                    'summary': {
+                        'semester': semester,
+                        'total_subjects': len(marks),
+                        'total_credits': credits,
+                        'total_credit_points': php_round(credit_points),
+                        'gpa': php_round(credit_points / credits) if credits > 0 else 0.0,
+                        'cgpa': cgpa
+                    }
+                }, DEFAULT_TTL)
+
+    def current_results(self, students):
+        """get_current_results.php: exam marks of the student's current semester"""
+        ids = [s['id'] for s in students]
+        rows = fetch_dicts(self.cursor, f"""
+            SELECT em.student_id AS _student, em.exam_type, em.marks_obtained, em.max_marks,
+                   em.exam_date, sub.subject_name, sub.subject_code, sub.credit_hours
+            FROM exam_marks em
+            JOIN subjects sub ON em.subject_id = sub.id
+            JOIN students st ON st.id = em.student_id
+            WHERE em.student_id IN ({in_list(ids)}) AND em.semester = st.semester
+            ORDER BY em.student_id, em.exam_type, sub.subject_name
+        """, ids)
+        by_student = {}
+        for row in rows:
+            results = by_student.setdefault(row.pop('_student'), {exam_type: [] for exam_type in EXAM_TYPES})
+            results[row['exam_type']].append({key: pdo_value(value) for key, value in row.items()})
+
+        for student in students:
+            yield (f"student/{student['id']}/current_results-{student['semester']}", {
+                'student': {'id': student['id'], 'semester': student['semester'],
+                            'department': student['department']},
+                'results': by_student.get(student['id'], {exam_type: [] for exam_type in EXAM_TYPES})
+            }, DEFAULT_TTL)
+
+    def attendance(self, students):
+        """get_attendance.php default daily view: this month, current semester"""
+        ids = [s['id'] for s in students]
+        first = self.today.replace(day=1)
+        last = self.today.replace(day=calendar.monthrange(self.today.year, self.today.month)[1])
+        rows = fetch_dicts(self.cursor, f"""
+            SELECT a.student_id AS _student, a.id, a.attendance_date, a.status, a.remarks,
+                   s.subject_code, s.subject_name, s.semester
+            FROM attendance a
+            JOIN subjects s ON a.subject_id = s.id
+            JOIN students st ON st.id = a.student_id
+            WHERE a.student_id IN ({in_list(ids)}) AND s.semester = st.semester
+              AND a.attendance_date BETWEEN %s AND %s
+            ORDER BY a.student_id, a.attendance_date DESC, s.subject_name
+        """, ids + [first, last])
+        by_student = {}
+        for row in rows:
+            by_student.setdefault(row.pop('_student'), []).append({key: pdo_value(v) for key, v in row.items()})
+
+        ttl = ttl_until_midnight()
+        for student in students:
+            records = by_student.get(student['id'], [])
+            counts = Counter(record['status'] for record in records)
+            total = len(records)
+            yield (f"student/{student['id']}/attendance-daily-{student['semester']}-{self.today.month}-{self.today.year}", {
+                'view_type': 'daily',
+                'semester': student['semester'],
+                'month': self.today.month,
+                'year': str(self.today.year),  # date('Y') when the request omits year
+                'records': records,
+                'stats': {
+                    'total': total,
+                    'present': counts['present'],
+                    'absent': counts['absent'],
+                    'late': counts['late'],
+                    'excused': counts['excused'],
+                    'percentage': php_round(counts['present'] / total * 100) if total > 0 else 0
+                },
+                'current_semester': student['semester']
+            }, ttl)
+
+    def fees(self, students):
+        """get_fees.php: fees of the active session that apply to each student"""
+        if self.session_id is None:
+            return
+        ids = [s['id'] for s in students]
+        rows = fetch_dicts(self.cursor, f"""
+            SELECT st.id AS _student,
+                   f.id, f.fee_type, f.fee_name, f.amount, f.due_date, f.late_fine_per_day,
+                   f.max_late_fine, f.description, f.semester,
+                   p.id as payment_id, p.status as payment_status, p.amount_paid,
+                   p.late_fine as paid_late_fine, p.payment_date, p.receipt_number,
+                   CASE
+                       WHEN CURDATE() > f.due_date AND p.id IS NULL
+                       THEN LEAST(DATEDIFF(CURDATE(), f.due_date) * f.late_fine_per_day, f.max_late_fine)
+                       ELSE 0
+                   END as current_late_fine
+            FROM students st
+            JOIN fees f ON f.session_id = %s
+                AND f.is_active = 1
+                AND (f.semester IS NULL OR f.semester = st.semester)
+                AND (f.department IS NULL OR f.department = st.department)
+                AND (f.program IS NULL OR f.program = st.program)
+            LEFT JOIN payments p ON f.id = p.fee_id AND p.student_id = st.id
+            WHERE st.id IN ({in_list(ids)})
+            ORDER BY st.id, f.due_date, f.fee_type
+        """, [self.session_id] + ids)
+        by_student = {}
+        for row in rows:
+            by_student.setdefault(row.pop('_student'), []).append(row)
+
+        ttl = ttl_until_midnight()
+        for student in students:
+            fees = []
+            pending = paid = fines = 0.0
+            pending_count = paid_count = 0
+            for row in by_student.get(student['id'], []):
+                fee = {key: pdo_value(value) for key, value in row.items()}
+                for key in ('amount', 'late_fine_per_day', 'max_late_fine', 'current_late_fine'):
+                    fee[key] = php_float(row[key])
+                fee['semester'] = int(row['semester']) if row['semester'] else None
+                if row['payment_id']:
+                    fee['status'] = 'paid'
+                    fee['amount_paid'] = php_float(row['amount_paid'])
+                    fee['paid_late_fine'] = php_float(row['paid_late_fine'])
+                    paid += fee['amount_paid']
+                    paid_count += 1
+                else:
+                    fee['status'] = 'pending'
+                    pending += fee['amount'] + fee['current_late_fine']
+                    fines += fee['current_late_fine']
+                    pending_count += 1
+                    for key in ('payment_id', 'payment_status', 'amount_paid', 'paid_late_fine',
+                                'payment_date', 'receipt_number'):
+                        del fee[key]
+                fees.append(fee)
+            yield (f"student/{student['id']}/fees-{self.session_id}", {
+                'fees': fees,
+                'summary': {
+                    'total_fees': len(fees),
+                    'pending_count': pending_count,
+                    'paid_count': paid_count,
+                    'total_pending': php_round(pending),
+                    'total_paid': php_round(paid),
+                    'total_late_fines': php_round(fines)
+                }
+            }, ttl)
+
+    def notices(self, groups):
+        """notices/get_all.php as seen by students of each (department, semester)"""
+        rows = fetch_dicts(self.cursor, """
+            SELECT n.id, n.title, n.content, n.type, n.target_audience, n.department, n.semester,
+                   n.attachment_url, n.created_at, n.updated_at, u.username as created_by_name
+            FROM notices n
+            LEFT JOIN users u ON n.created_by = u.id
+            WHERE is_active = 1 AND (expiry_date IS NULL OR expiry_date >= CURDATE())
+              AND target_audience IN ('all', 'students')
+            ORDER BY n.created_at DESC
+        """)
+        notices = []
+        for row in rows:
+            notice = {key: pdo_value(value) for key, value in row.items()}
+            notice['category'] = notice['type']
+            notice['image_url'] = notice['attachment_url']
+            notice['priority'] = 'normal'
+            notice['created_by'] = notice['created_by_name'] if notice['created_by_name'] is not None else 'Admin'
+            notices.append(notice)
+
+        ttl = ttl_until_midnight()
+        for department, semester in groups:
+            # Department comparison follows the column's case-insensitive collation
+            folded = department.casefold() if department is not None else None
+            visible = [n for n in notices
+                       if n['target_audience'] == 'all'
+                       or n['department'] is None
+                       or (folded is not None and n['department'].casefold() == folded
+                           and (n['semester'] is None or n['semester'] == semester))]
+            yield (f"notices/{segment(department)}/{semester}", {'notices': visible, 'total': len(visible)}, ttl)
+
+    def notice_groups(self, departments=None):
+        rows = fetch_dicts(self.cursor, "SELECT DISTINCT department, semester FROM students")
+        return [(r['department'], r['semester']) for r in rows
+                if departments is None or r['department'] in departments]
+
+def warm(cursor, cache, student_ids=None, endpoints=ENDPOINTS, notice_departments=None):
+    """Build and store payloads; returns entries written per endpoint"""
+    builder = PayloadBuilder(cursor)
+    written = Counter()
+    student_endpoints = [e for e in endpoints if e != 'notices']
+    if student_endpoints:
+        students = builder.students(student_ids)
+        for start in range(0, len(students), STUDENT_CHUNK):
+            chunk = students[start:start + STUDENT_CHUNK]
+            for endpoint in student_endpoints:
+                for key, payload, ttl in getattr(builder, endpoint)(chunk):
+                    cache.set(key, php_json(payload), ttl)
+                    written[endpoint] += 1
+    if 'notices' in endpoints:
+        for key, payload, ttl in builder.notices(builder.notice_groups(notice_departments)):
+            cache.set(key, php_json(payload), ttl)
+            written['notices'] += 1
+    return written
+
+# ---------------------------------------------------------------------------
+# Change tracking
+# ---------------------------------------------------------------------------
+
+def read_state(cache):
+    try:
+        with open(os.path.join(cache.root, STATE_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def write_state(cache, state):
+    os.makedirs(cache.root, exist_ok=True)
+    path = os.path.join(cache.root, STATE_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+def current_marks(cursor):
+    """Latest change timestamp of every watched table; fees also carry a row count"""
+    marks = {}
+    for table, column, _ in CHANGE_SOURCES + [('notices', 'updated_at', None)]:
+        cursor.execute(f"SELECT MAX({column}) FROM {table}")
+        value = cursor.fetchall()[0][0]
+        marks[table] = str(value) if value is not None else None
+    cursor.execute("SELECT MAX(updated_at), COUNT(*) FROM fees")
+    latest, count = cursor.fetchall()[0]
+    marks['fees'] = f"{latest}|{count}"
+    return marks
+
+def recent_rows(cursor, table, columns, column, since):
+    """Rows changed at or after the watermark, re-scanning OVERLAP_SECONDS before it.
+
+    Timestamps are taken before commit and have second precision, so a row
+    can become visible after the watermark already moved past its timestamp.
+    """
+    if since is None:
+        cursor.execute(f"SELECT id, {columns}, {column} FROM {table} WHERE {column} IS NOT NULL")
+    else:
+        cursor.execute(f"SELECT id, {columns}, {column} FROM {table} "
+                       f"WHERE {column} >= %s - INTERVAL {OVERLAP_SECONDS} SECOND", (since,))
+    return cursor.fetchall()
+
+def unseen(rows, table, state, seen):
+    """Rows not handled by an earlier poll; advances the table watermark"""
+    handled = seen.setdefault(table, set())
+    fresh = []
+    for row in rows:
+        row_id, changed = row[0], row[-1]
+        if (row_id, changed) in handled:
+            continue
+        handled.add((row_id, changed))
+        fresh.append(row)
+        if state.get(table) is None or str(changed) > state[table]:
+            state[table] = str(changed)
+    if state.get(table) is not None:
+        cutoff = datetime.fromisoformat(state[table]) - timedelta(seconds=OVERLAP_SECONDS)
+        seen[table] = {entry for entry in handled if entry[1] >= cutoff}
+    return fresh
+
+def changed_since(cursor, state, seen):
+    """Students per endpoint, notice departments, and whether fee definitions changed.
+
+    Updates state (per-table watermarks) and seen (rows already handled inside
+    the overlap window) in place.
+    """
+    students = {}
+    for table, column, endpoints in CHANGE_SOURCES:
+        key = 'id' if table == 'students' else 'student_id'
+        for row in unseen(recent_rows(cursor, table, key, column, state.get(table)), table, state, seen):
+            students.setdefault(row[1], set()).update(endpoints)
+
+    departments = None
+    rows = unseen(recent_rows(cursor, 'notices', "IF(target_audience = 'students', department, NULL)",
+                              'updated_at', state.get('notices')), 'notices', state, seen)
+    if rows:
+        departments = {row[1] for row in rows}
+
+    cursor.execute("SELECT MAX(updated_at), COUNT(*) FROM fees")
+    latest, count = cursor.fetchall()[0]
+    fees = f"{latest}|{count}"
+    fees_changed = state.get('fees') != fees
+    state['fees'] = fees
+    return students, departments, fees_changed
+
+def removed_students(cursor, cache):
+    """Cached students that no longer exist (deleting a user cascades to students)"""
+    cached = cache.cached_students()
+    if not cached:
+        return set()
+    cursor.execute("SELECT id FROM students")
+    return cached - {row[0] for row in cursor.fetchall()}
+
+def apply_changes(cursor, cache, students, departments, fees_changed, removed=()):
+    """Invalidate and rewarm exactly what the detected changes touch"""
+    for student_id in removed:
+        cache.invalidate(f"student/{student_id}/")
+    if fees_changed:
+        cache.invalidate_endpoint('fees')
+        warm(cursor, cache, endpoints=['fees'])
+    by_endpoints = {}
+    for student_id, endpoints in students.items():
+        for endpoint in endpoints:
+            cache.invalidate(f"student/{student_id}/{endpoint}")
+        by_endpoints.setdefault(frozenset(endpoints), []).append(student_id)
+    for endpoints, ids in by_endpoints.items():
+        if fees_changed:
+            endpoints = endpoints - {'fees'}
+        if endpoints:
+            warm(cursor, cache, ids, sorted(endpoints))
+
+    if departments is not None:
+        if None in departments:
+            # General notices reach every department
+            cache.invalidate('notices/')
+            warm(cursor, cache, endpoints=['notices'])
+        else:
+            for department in departments:
+                cache.invalidate(f"notices/{segment(department)}/")
+            warm(cursor, cache, endpoints=['notices'], notice_departments=departments)
+
+def watch(conn, cache, interval):
+    state = read_state(cache)
+    seen = {}
+    print(f"Watching for changes every {interval}s (Ctrl+C to stop)...")
+    while True:
+        cursor = conn.cursor()
+        if not state:
+            state = current_marks(cursor)  # Nothing to compare against yet: assume a warm just ran
+        students, departments, fees_changed = changed_since(cursor, state, seen)
+        removed = removed_students(cursor, cache)
+        if students or departments is not None or fees_changed or removed:
+            apply_changes(cursor, cache, students, departments, fees_changed, removed)
+            print(f"  {datetime.now():%H:%M:%S} refreshed {len(students)} students"
+                  + (f", notices for {len(departments)} departments" if departments else "")
+                  + (", all fees" if fees_changed else "")
+                  + (f", dropped {len(removed)} deleted students" if removed else ""))
+        write_state(cache, state)
+        conn.commit()  # End the snapshot so the next poll sees new rows
+        cursor.close()
+        if cache.size is not None and cache.size > cache.max_bytes:
+            cache.evict()
+        time.sleep(interval)
+
+def print_stats(cache, reset):
+    counts = cache.metrics(reset)
+    entries = cache.scan()
+    live = sum(1 for e in entries if not e[3])
+    print(f"Cache: {live} live entries ({len(entries) - live} expired), "
+          f"{cache.size / 1024 / 1024:.1f} MB of {cache.max_bytes / 1024 / 1024:.0f} MB")
+    print(f"{'Endpoint':<18} {'Hits':>10} {'Misses':>10} {'Hit ratio':>10}")
+    total_hits = total_misses = 0
+    for endpoint in ENDPOINTS:
+        hits, misses = counts[(endpoint, 'hit')], counts[(endpoint, 'miss')]
+        total_hits += hits
+        total_misses += misses
+        ratio = f"{hits / (hits + misses) * 100:.1f}%" if hits + misses else '-'
+        print(f"{endpoint:<18} {hits:>10} {misses:>10} {ratio:>10}")
+    if total_hits + total_misses:
+        print(f"{'Total':<18} {total_hits:>10} {total_misses:>10} "
+              f"{total_hits / (total_hits + total_misses) * 100:>9.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm and maintain the student endpoint response cache")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--max-mb', type=int, default=DEFAULT_MAX_CACHE_MB, help="Cache size bound")
+    sub = parser.add_subparsers(dest='command', required=True)
+    warm_parser = sub.add_parser('warm', help="Precompute payloads")
+    warm_parser.add_argument('--student', type=int, action='append', help="students.id (repeatable; default all)")
+    warm_parser.add_argument('--only', help=f"Comma-separated subset of {','.join(ENDPOINTS)}")
+    watch_parser = sub.add_parser('watch', help="Invalidate and rewarm on data changes")
+    watch_parser.add_argument('--interval', type=float, default=POLL_SECONDS)
+    invalidate_parser = sub.add_parser('invalidate', help="Drop entries")
+    invalidate_parser.add_argument('--student', type=int)
+    invalidate_parser.add_argument('--endpoint', choices=[e for e in ENDPOINTS if e != 'notices'])
+    invalidate_parser.add_argument('--notices', action='store_true')
+    invalidate_parser.add_argument('--department')
+    sub.add_parser('evict', help="Enforce TTLs and the size bound")
+    stats_parser = sub.add_parser('stats', help="Hit/miss metrics and cache size")
+    stats_parser.add_argument('--reset', action='store_true', help="Start a new metrics window")
+    args = parser.parse_args()
+
+    cache = FileCache(args.cache_dir, args.max_mb * 1024 * 1024)
+
+    if args.command == 'invalidate':
+        if args.notices:
+            prefix = 'notices/' + (f"{segment(args.department)}/" if args.department else '')
+        elif args.student:
+            prefix = f"student/{args.student}/" + (args.endpoint or '')
+        else:
+            parser.error("invalidate needs --student or --notices")
+        print(f"✓ Removed {cache.invalidate(prefix)} entries under {prefix}")
+        return
+    if args.command == 'evict':
+        removed = cache.evict()
+        print(f"✓ Evicted {removed} entries, cache now {cache.size / 1024 / 1024:.1f} MB")
+        return
+    if args.command == 'stats':
+        print_stats(cache, args.reset)
+        return
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+
+    try:
+        cursor = conn.cursor()
+        if args.command == 'warm':
+            endpoints = args.only.split(',') if args.only else ENDPOINTS
+            unknown = set(endpoints) - set(ENDPOINTS)
+            if unknown:
+                parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+            # Record watermarks before reading so changes made during the warm are picked up by watch
+            state = current_marks(cursor)
+            cache.scan()
+            start = time.perf_counter()
+            written = warm(cursor, cache, args.student, endpoints)
+            if not args.student and endpoints == ENDPOINTS:
+                write_state(cache, state)
+            print(f"✓ Warmed {sum(written.values())} entries in {time.perf_counter() - start:.1f}s "
+                  f"({', '.join(f'{e} {written[e]}' for e in endpoints)})")
+            if cache.stats['evictions']:
+                print(f"  Evicted {cache.stats['evictions']} least recently used entries to stay under {args.max_mb} MB")
+        else:
+            cache.scan()
+            watch(conn, cache, args.interval)
+        cursor.close()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
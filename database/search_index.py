@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+People Search Index for Student Portal
+In-memory index over students, teachers and their user accounts (id, names,
+email, username) for the admin lookups that currently run six LIKE '%...%'
+predicates per keystroke (admin/students/list.php, admin/teachers/list.php,
+teacher/get_students.php).
+
+Matching, best tier first:
+    0  exact token       "sharma"
+    1  token prefix      "sha", "rahul sh"
+    2  substring         "arm" (trigram index, same hits as LIKE '%arm%')
+    3  typo tolerant     "shrama" (1 edit, 2 for terms of 8+ characters)
+
+Results are ordered by tier and then student/teacher code descending (the
+PHP lists' ORDER BY student_id DESC), with keyset cursors instead of OFFSET.
+
+Usage:
+    python database/search_index.py build
+    python database/search_index.py refresh
+    python database/search_index.py search "rahul sh" [--role students --department BCA]
+    python database/search_index.py bench --people 100000
+"""
+
+import argparse
+import base64
+import bisect
+import json
+import os
+import pickle
+import random
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search_index.pkl')
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+PEOPLE_QUERIES = {
+    'students': """
+        SELECT s.id, s.student_id, s.first_name, s.last_name, u.email, u.username,
+               s.department, s.semester, u.status, GREATEST(s.updated_at, u.updated_at) AS changed_at
+        FROM {students} s
+        JOIN {users} u ON s.user_id = u.id
+    """,
+    'teachers': """
+        SELECT t.id, t.teacher_id, t.first_name, t.last_name, u.email, u.username,
+               t.department, NULL AS semester, u.status, GREATEST(t.updated_at, u.updated_at) AS changed_at
+        FROM {teachers} t
+        JOIN {users} u ON t.user_id = u.id
+    """
+}
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def bigrams(token):
+    """Padded bigrams; unlike trigrams they survive a transposition in short names"""
+    padded = f"^{token}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+def within_edits(a, b, limit):
+    """Edit distance (adjacent transpositions count once) <= limit, exiting early"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= limit
+
+class SearchIndex:
+    """Token, prefix and trigram postings over people documents"""
+
+    def __init__(self):
+        self.docs = {}
+        self.token_postings = defaultdict(set)
+        self.gram_postings = defaultdict(set)
+        self.token_grams = defaultdict(set)
+        self.watermark = None
+        self._vocab = []
+        self._vocab_dirty = False
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, role, row):
+        """Insert or replace one person; row follows the PEOPLE_QUERIES column order"""
+        doc_id, code, first_name, last_name, email, username, department, semester, status = row[:9]
+        key = f"{role}:{doc_id}"
+        self.remove(key)
+
+        fields = [code or '', f"{first_name} {last_name}", email or '', username or '']
+        text = '|'.join(f.lower() for f in fields)
+        tokens = set(TOKEN_RE.findall(text))
+        doc = {
+            'key': key, 'role': role, 'id': doc_id, 'code': code, 'first_name': first_name,
+            'last_name': last_name, 'email': email, 'username': username, 'department': department,
+            'semester': semester, 'status': status, 'text': text, 'tokens': tokens
+        }
+        self.docs[key] = doc
+
+        for token in tokens:
+            if not self.token_postings[token]:
+                self._vocab_dirty = True
+                for gram in bigrams(token):
+                    self.token_grams[gram].add(token)
+            self.token_postings[token].add(key)
+        for gram in trigrams(text):
+            self.gram_postings[gram].add(key)
+
+    def remove(self, key):
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return
+        for token in doc['tokens']:
+            postings = self.token_postings[token]
+            postings.discard(key)
+            if not postings:
+                del self.token_postings[token]
+                self._vocab_dirty = True
+                for gram in bigrams(token):
+                    self.token_grams[gram].discard(token)
+        for gram in trigrams(doc['text']):
+            self.gram_postings[gram].discard(key)
+
+    def vocab(self):
+        if self._vocab_dirty:
+            self._vocab = sorted(self.token_postings)
+            self._vocab_dirty = False
+        return self._vocab
+
+    def prefix_docs(self, prefix):
+        vocab = self.vocab()
+        matches = set()
+        start = bisect.bisect_left(vocab, prefix)
+        for token in vocab[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self.token_postings[token]
+        return matches
+
+    def fuzzy_docs(self, term):
+        limit = 2 if len(term) >= 8 else 1
+        # Each edit (or transposition) changes at most three bigrams
+        grams = bigrams(term)
+        counts = defaultdict(int)
+        for gram in grams:
+            for token in self.token_grams.get(gram, ()):
+                counts[token] += 1
+        needed = max(1, len(grams) - 3 * limit)
+        matches = set()
+        for token, shared in counts.items():
+            if shared >= needed and within_edits(term, token, limit):
+                matches |= self.token_postings[token]
+        return matches
+
+    def substring_docs(self, query):
+        grams = sorted(trigrams(query), key=lambda g: len(self.gram_postings.get(g, ())))
+        if not grams:
+            return set()
+        candidates = set(self.gram_postings.get(grams[0], set()))
+        for gram in grams[1:]:
+            candidates &= self.gram_postings.get(gram, set())
+            if not candidates:
+                return candidates
+        return {key for key in candidates if query in self.docs[key]['text']}
+
+    def match(self, query, fuzzy=True):
+        """Return {doc key: best tier} for a query"""
+        query = query.strip().lower()
+        terms = TOKEN_RE.findall(query)
+        if not terms:
+            return {}
+        tiers = {}
+
+        def offer(keys, tier):
+            for key in keys:
+                if tiers.get(key, 99) > tier:
+                    tiers[key] = tier
+
+        # Tier 0/1: every term matches a token exactly or, for the last term, by prefix
+        exact = set.intersection(*(set(self.token_postings.get(t, ())) for t in terms))
+        offer(exact, 0)
+        prefixed = set.intersection(*[set(self.token_postings.get(t, ())) for t in terms[:-1]]
+                                    + [self.prefix_docs(terms[-1])])
+        offer(prefixed, 1)
+
+        if len(query) >= 3:
+            offer(self.substring_docs(query), 2)
+
+        if fuzzy and not tiers:
+            fuzzy_sets = [self.fuzzy_docs(t) | self.prefix_docs(t) for t in terms]
+            offer(set.intersection(*fuzzy_sets), 3)
+        return tiers
+
+    def search(self, query, role=None, department=None, semester=None, status=None,
+               limit=20, cursor=None, fuzzy=True):
+        """Return (page of docs, next cursor) ordered by tier, then code descending"""
+        tiers = self.match(query, fuzzy)
+        hits = []
+        for key, tier in tiers.items():
+            doc = self.docs[key]
+            if role and doc['role'] != role:
+                continue
+            if department is not None and doc['department'] != department:
+                continue
+            if semester is not None and doc['semester'] != semester:
+                continue
+            if status is not None and doc['status'] != status:
+                continue
+            hits.append((tier, doc['code'] or '', key))
+
+        # tier ascending, code descending, key ascending (stable sorts from last key to first)
+        hits.sort(key=lambda h: h[2])
+        hits.sort(key=lambda h: h[1], reverse=True)
+        hits.sort(key=lambda h: h[0])
+
+        if cursor:
+            c_tier, c_code, c_key = decode_cursor(cursor)
+            hits = [h for h in hits if h[0] > c_tier
+                    or (h[0] == c_tier and (h[1] < c_code or (h[1] == c_code and h[2] > c_key)))]
+
+        page = hits[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(hits) > limit else None
+        return [dict(self.docs[h[2]], tier=h[0]) for h in page], next_cursor
+
+def encode_cursor(hit):
+    return base64.urlsafe_b64encode(json.dumps(list(hit)).encode()).decode()
+
+def decode_cursor(cursor):
+    return tuple(json.loads(base64.urlsafe_b64decode(cursor.encode())))
+
+def load_people(cursor, index, since=None, tables=None):
+    """Add every person (or those changed since a timestamp) to the index; returns the new watermark"""
+    tables = tables or {'students': 'students', 'teachers': 'teachers', 'users': 'users'}
+    watermark = since
+    for role, query in PEOPLE_QUERIES.items():
+        sql = query.format(**tables)
+        params = ()
+        if since is not None:
+            alias = 's' if role == 'students' else 't'
+            sql += f" WHERE {alias}.updated_at >= %s OR u.updated_at >= %s"
+            params = (since, since)
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            for row in rows:
+                index.add(role, row)
+                changed = row[9]
+                if changed is not None and (watermark is None or changed > watermark):
+                    watermark = changed
+    return watermark
+
+def drop_deleted(cursor, index):
+    """Remove people whose rows no longer exist (one id-only scan per table)"""
+    live = set()
+    for role in ('students', 'teachers'):
+        cursor.execute(f"SELECT id FROM {role}")
+        live.update(f"{role}:{row[0]}" for row in cursor.fetchall())
+    stale = [key for key in index.docs if key not in live]
+    for key in stale:
+        index.remove(key)
+    return len(stale)
+
+def save_index(index, path=INDEX_FILE):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+def load_index(path=INDEX_FILE):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+# Synthetic people for the benchmark
+BENCH_FIRST = ['Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Krishna', 'Ishaan',
+               'Rohan', 'Ananya', 'Diya', 'Priya', 'Aadhya', 'Saanvi', 'Kavya', 'Meera', 'Riya',
+               'Neha', 'Pooja', 'Rahul', 'Amit', 'Sneha', 'Divya', 'Karthik', 'Lakshmi']
+BENCH_LAST = ['Sharma', 'Verma', 'Iyer', 'Nair', 'Reddy', 'Patel', 'Gupta', 'Singh', 'Kumar',
+              'Menon', 'Pillai', 'Rao', 'Das', 'Joshi', 'Mehta', 'Chopra', 'Bhat', 'Kulkarni']
+BENCH_DEPARTMENTS = ['BCA', 'BBA', 'B.Com']
+
+def bench_like(cursor, search, limit=20, offset=0):
+    """The students/list.php count + page queries against the scratch tables"""
+    pattern = f"%{search}%"
+    where = """
+        FROM bench_search_students s
+        JOIN bench_search_users u ON s.user_id = u.id
+        WHERE (s.student_id LIKE %s OR s.first_name LIKE %s OR s.last_name LIKE %s
+               OR CONCAT(s.first_name, ' ', s.last_name) LIKE %s OR u.email LIKE %s OR u.username LIKE %s)
+    """
+    cursor.execute("SELECT COUNT(*) " + where, (pattern,) * 6)
+    cursor.fetchall()
+    cursor.execute("SELECT s.id, s.student_id, s.first_name, s.last_name, u.email, u.username "
+                   + where + " ORDER BY s.student_id DESC LIMIT %s OFFSET %s", (pattern,) * 6 + (limit, offset))
+    return cursor.fetchall()
+
+def bench(conn, people, samples, seed):
+    rng = random.Random(seed)
+    cursor = conn.cursor()
+    print(f"Creating {people} synthetic students in scratch tables...")
+    cursor.execute("DROP TABLE IF EXISTS bench_search_students")
+    cursor.execute("DROP TABLE IF EXISTS bench_search_users")
+    cursor.execute("CREATE TABLE bench_search_users LIKE users")
+    cursor.execute("""
+        CREATE TABLE bench_search_students (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            student_id VARCHAR(20) NOT NULL,
+            first_name VARCHAR(50) NOT NULL,
+            last_name VARCHAR(50) NOT NULL,
+            department VARCHAR(100),
+            semester INT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_student_id (student_id),
+            INDEX idx_user_id (user_id)
+        )
+    """)
+    users, students = [], []
+    for i in range(1, people + 1):
+        first, last = rng.choice(BENCH_FIRST), rng.choice(BENCH_LAST)
+        dept = rng.choice(BENCH_DEPARTMENTS)
+        code = f"{dept.replace('.', '')[:3].upper()}{i:06d}"
+        users.append((i, code.lower(), 'x', f"{first.lower()}.{last.lower()}{i}@example.com", 'student'))
+        students.append((i, code, first, last, dept, rng.randint(1, 6)))
+    for start in range(0, people, 5000):
+        cursor.executemany("INSERT INTO bench_search_users (id, username, password, email, role) VALUES (%s, %s, %s, %s, %s)",
+                           users[start:start + 5000])
+        cursor.executemany("""
+            INSERT INTO bench_search_students (user_id, student_id, first_name, last_name, department, semester)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, students[start:start + 5000])
+    conn.commit()
+
+    print("Building index...")
+    index = SearchIndex()
+    start = time.perf_counter()
+    cursor.execute("""
+        SELECT s.id, s.student_id, s.first_name, s.last_name, u.email, u.username,
+               s.department, s.semester, u.status, s.updated_at
+        FROM bench_search_students s JOIN bench_search_users u ON s.user_id = u.id
+    """)
+    for row in cursor.fetchall():
+        index.add('students', row)
+    print(f"  {len(index)} documents indexed in {time.perf_counter() - start:.1f}s")
+
+    # Keystroke-style queries: prefixes, mid-word substrings, ids, and typos
+    queries = []
+    for _ in range(samples):
+        name = rng.choice(BENCH_LAST)
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(name[:rng.randint(2, len(name))])
+        elif kind < 0.6:
+            queries.append(name[1:4])
+        elif kind < 0.8:
+            queries.append(rng.choice(students)[1][:rng.randint(4, 9)])
+        else:
+            i = rng.randint(1, len(name) - 2)
+            queries.append(name[:i] + name[i + 1] + name[i] + name[i + 2:])
+
+    like_times, index_times = [], []
+    for q in queries:
+        start = time.perf_counter()
+        bench_like(cursor, q)
+        like_times.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        index.search(q, limit=20)
+        index_times.append((time.perf_counter() - start) * 1000)
+
+    cursor.execute("DROP TABLE IF EXISTS bench_search_students")
+    cursor.execute("DROP TABLE IF EXISTS bench_search_users")
+    cursor.close()
+
+    def pct(values, p):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * p))]
+
+    print(f"\n{'engine':<12}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    for name, values in (('LIKE', like_times), ('index', index_times)):
+        print(f"{name:<12}{pct(values, 0.5):>10.2f}{pct(values, 0.95):>10.2f}{statistics.mean(values):>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the admin people search index")
+    parser.add_argument('--index', default=INDEX_FILE, help="Index file")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help="Rebuild the index from scratch")
+    sub.add_parser('refresh', help="Apply changes since the last build/refresh")
+
+    search_parser = sub.add_parser('search', help="Query the index")
+    search_parser.add_argument('query')
+    search_parser.add_argument('--role', choices=['students', 'teachers'])
+    search_parser.add_argument('--department')
+    search_parser.add_argument('--semester', type=int)
+    search_parser.add_argument('--status')
+    search_parser.add_argument('--limit', type=int, default=20)
+    search_parser.add_argument('--cursor')
+    search_parser.add_argument('--no-fuzzy', action='store_true')
+
+    bench_parser = sub.add_parser('bench', help="Compare the index with the LIKE query")
+    bench_parser.add_argument('--people', type=int, default=100000)
+    bench_parser.add_argument('--samples', type=int, default=200)
+    bench_parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.command == 'search':
+        index = load_index(args.index)
+        start = time.perf_counter()
+        results, next_cursor = index.search(args.query, args.role, args.department, args.semester,
+                                            args.status, args.limit, args.cursor, not args.no_fuzzy)
+        elapsed = (time.perf_counter() - start) * 1000
+        for doc in results:
+            print(f"  [{doc['tier']}] {doc['code']:<12} {doc['first_name']} {doc['last_name']:<20} "
+                  f"{doc['email']} ({doc['role'][:-1]}, {doc['department']})")
+        print(f"{len(results)} results in {elapsed:.2f} ms" + (f", next cursor: {next_cursor}" if next_cursor else ""))
+        return
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        if args.command == 'bench':
+            bench(conn, args.people, args.samples, args.seed)
+        elif args.command == 'build':
+            start = time.perf_counter()
+            index = SearchIndex()
+            cursor = conn.cursor()
+            index.watermark = load_people(cursor, index)
+            cursor.close()
+            save_index(index, args.index)
+            print(f"✓ Indexed {len(index)} people in {time.perf_counter() - start:.1f}s")
+        else:
+            index = load_index(args.index)
+            cursor = conn.cursor()
+            before = len(index)
+            index.watermark = load_people(cursor, index, since=index.watermark)
+            removed = drop_deleted(cursor, index)
+            cursor.close()
+            save_index(index, args.index)
+            print(f"✓ Refreshed index: {len(index)} people ({len(index) - before + removed} added, {removed} removed)")
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
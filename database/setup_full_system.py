@@ -4,6 +4,7 @@ from faker import Faker
 import random
 import os
 from datetime import datetime, timedelta
+from sql_loader import load_file
 
 # Configuration
 DB_HOST = 'localhost'
@@ -27,21 +28,10 @@ def create_connection():
         return None
 
 def execute_file(connection, file_path):
-    cursor = connection.cursor()
-    with open(file_path, 'r') as f:
-        sql_script = f.read()
-    
-    # Split by semicolon but handle basic splitting
-    commands = sql_script.split(';')
-    for command in commands:
-        if command.strip():
-            try:
-                cursor.execute(command)
-            except Error as e:
-                # Ignore duplicate entry errors for seeding
-                if e.errno != 1062: 
-                    print(f"Error executing command: {e}")
-    connection.commit()
+    # Streamed statement by statement; single-row INSERTs are batched
+    load_file(connection, file_path,
+              ignore_errnos={1062},  # Ignore duplicate entry errors for seeding
+              on_error=lambda command, e: print(f"Error executing command: {e}"))
 
 def setup_system():
     print("Processing...")
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+SQL Loader for Student Portal
+Streams seed files, migrations and mysqldump output (database/backup/*.sql,
+UTF-8 or UTF-16 with BOM) statement by statement instead of reading the whole
+file and splitting on ';'. The tokenizer understands quoted strings, comments,
+/*!...*/ version comments and DELIMITER, and holds at most one statement in
+memory. Consecutive single-table INSERT ... VALUES statements are merged into
+multi-row batches.
+
+With --workers N, dump-style files (plain INSERT ... VALUES data, no session
+variables) load each table's rows on its own connection. Workers run with
+FOREIGN_KEY_CHECKS=0 (and UNIQUE_CHECKS=0 only if the dump itself disables
+them); foreign keys of the loaded tables are verified afterwards.
+
+Usage:
+    python database/sql_loader.py database/seeds/01_sessions.sql database/seeds/02_admin.sql
+    python database/sql_loader.py database/backup/studentportal_backup_20251125.sql --workers 4
+"""
+
+import argparse
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+CHUNK_SIZE = 64 * 1024
+BATCH_ROWS = 1000
+BATCH_BYTES = 1024 * 1024  # well under the 64M max_allowed_packet default
+COMMIT_EVERY = 20          # batches per worker transaction
+QUEUE_DEPTH = 8            # batches buffered per table in parallel mode
+
+INSERT_RE = re.compile(r"INSERT\s+(IGNORE\s+)?INTO\s+(`[^`]+`|[\w.]+)\s*(\([^)]*\))?\s*VALUES\s*", re.I)
+TABLE_STMT_RE = re.compile(r"(?:DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?|CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+                           r"|ALTER\s+TABLE\s+|LOCK\s+TABLES\s+|TRUNCATE\s+(?:TABLE\s+)?)(`[^`]+`|[\w.]+)", re.I)
+LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"", re.S)
+QUOTE_END_RE = {"'": re.compile(r"[\\']"), '"': re.compile(r'[\\"]')}
+DUMP_ONLY_RE = re.compile(r"^(/\*!\d+\s+)?(LOCK\s+TABLES|UNLOCK\s+TABLES|ALTER\s+TABLE\s+\S+\s+(DISABLE|ENABLE)\s+KEYS)", re.I)
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def open_sql(path):
+    """Open a SQL file as text, honouring UTF-16/UTF-8 byte order marks"""
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+        encoding = 'utf-16'
+    elif head.startswith(b'\xef\xbb\xbf'):
+        encoding = 'utf-8-sig'
+    else:
+        encoding = 'utf-8'
+    return open(path, 'r', encoding=encoding, newline='')
+
+def iter_statements(path, chunk_size=CHUNK_SIZE):
+    """Yield statements one at a time without reading the whole file"""
+    delimiter = ';'
+    parts = []          # pieces of the current statement already scanned
+    buf = ''
+    pos = 0             # scan position in buf
+    seg = 0             # start of buf text not yet copied into parts
+    state = None        # None, a quote character, 'line' or 'block' comment
+    keep_comment = False
+    at_start = True
+    eof = False
+
+    def special_re():
+        return re.compile("'|\"|`|--|#|/\\*|" + re.escape(delimiter))
+
+    special = special_re()
+
+    with open_sql(path) as f:
+        while True:
+            if not eof:
+                chunk = f.read(chunk_size)
+                if chunk:
+                    if state == 'line' or (state == 'block' and not keep_comment):
+                        buf = buf[pos:]
+                    else:
+                        parts.append(buf[seg:pos])
+                        buf = buf[pos:]
+                    pos = seg = 0
+                    buf += chunk
+                else:
+                    eof = True
+            lookahead = 0 if eof else max(3, len(delimiter) + 1)
+
+            while True:
+                if state is None:
+                    if at_start:
+                        while pos < len(buf) and buf[pos].isspace():
+                            pos += 1
+                        if pos + 10 > len(buf) and not eof:
+                            break  # room to recognise a DELIMITER line
+                        if buf[pos:pos + 10].upper() == 'DELIMITER ' and not ''.join(parts).strip() \
+                                and not buf[seg:pos].strip():
+                            newline = buf.find('\n', pos)
+                            if newline < 0 and not eof:
+                                break
+                            end = newline if newline >= 0 else len(buf)
+                            delimiter = buf[pos + 10:end].strip()
+                            special = special_re()
+                            pos = seg = end
+                            parts = []
+                            continue
+                        at_start = False
+
+                    match = special.search(buf, pos)
+                    if not match or match.start() > len(buf) - lookahead:
+                        if not eof:
+                            pos = max(pos, len(buf) - lookahead)
+                            break
+                        if not match:
+                            pos = len(buf)
+                            break
+                    token, start = match.group(), match.start()
+                    if token == delimiter:
+                        parts.append(buf[seg:start])
+                        statement = ''.join(parts).strip()
+                        parts = []
+                        pos = seg = start + len(delimiter)
+                        at_start = True
+                        if statement:
+                            yield statement
+                    elif token in ("'", '"', '`'):
+                        state = token
+                        pos = start + 1
+                    elif token == '--' and start + 2 < len(buf) and not buf[start + 2].isspace():
+                        pos = start + 2  # "--" without trailing whitespace is an operator
+                    elif token in ('--', '#'):
+                        parts.append(buf[seg:start])
+                        state = 'line'
+                        pos = start + len(token)
+                    else:  # /*
+                        keep_comment = buf.startswith('/*!', start)
+                        if not keep_comment:
+                            parts.append(buf[seg:start])
+                        state = 'block'
+                        pos = start + 2
+
+                elif state == 'line':
+                    newline = buf.find('\n', pos)
+                    if newline < 0:
+                        pos = len(buf)
+                        if eof:
+                            state, seg = None, len(buf)
+                            continue
+                        break
+                    state, pos, seg = None, newline, newline
+                    at_start = not ''.join(parts).strip()
+
+                elif state == 'block':
+                    end = buf.find('*/', pos)
+                    if end < 0:
+                        pos = max(pos, len(buf) - 1)
+                        if eof:
+                            raise ValueError(f"{path}: unterminated comment")
+                        break
+                    pos = end + 2
+                    if not keep_comment:
+                        seg = pos
+                        at_start = not ''.join(parts).strip()
+                    state = None
+
+                else:  # inside a quoted string or identifier
+                    if state == '`':
+                        end = buf.find('`', pos)
+                    else:
+                        match = QUOTE_END_RE[state].search(buf, pos)
+                        end = match.start() if match else -1
+                    if end < 0 or (end + 1 >= len(buf) and not eof):
+                        if eof:
+                            raise ValueError(f"{path}: unterminated {state} literal")
+                        pos = max(pos, end) if end >= 0 else len(buf)
+                        break
+                    if buf[end] == '\\':
+                        pos = end + 2
+                    elif end + 1 < len(buf) and buf[end + 1] == state:
+                        pos = end + 2  # doubled quote
+                    else:
+                        pos = end + 1
+                        state = None
+
+            if eof:
+                parts.append(buf[seg:])
+                statement = ''.join(parts).strip()
+                if statement:
+                    yield statement
+                return
+
+def count_tuples(values):
+    """Number of top-level (...) groups in a VALUES list, or None if anything else follows"""
+    depth = 0
+    tuples = 0
+    i = 0
+    expect_tuple = True
+    while i < len(values):
+        ch = values[i]
+        if ch in ("'", '"'):
+            j = i + 1
+            while j < len(values):
+                if values[j] == '\\':
+                    j += 2
+                    continue
+                if values[j] == ch:
+                    if j + 1 < len(values) and values[j + 1] == ch:
+                        j += 2
+                        continue
+                    break
+                j += 1
+            i = j + 1
+            continue
+        if ch == '(':
+            if depth == 0:
+                if not expect_tuple:
+                    return None
+                tuples += 1
+                expect_tuple = False
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif depth == 0:
+            if ch == ',' and not expect_tuple:
+                expect_tuple = True
+            elif not ch.isspace():
+                return None  # ON DUPLICATE KEY UPDATE, row alias, ...
+        i += 1
+    return tuples if depth == 0 and not expect_tuple else None
+
+def parse_insert(statement):
+    """Return (batch key, table, values text, row count) for a plain INSERT ... VALUES, else None"""
+    match = INSERT_RE.match(statement)
+    if not match:
+        return None
+    values = statement[match.end():]
+    rows = count_tuples(values)
+    if not rows:
+        return None
+    table = match.group(2).strip('`')
+    columns = re.sub(r'\s+', '', match.group(3) or '')
+    prefix = f"INSERT {'IGNORE ' if match.group(1) else ''}INTO {match.group(2)} {match.group(3) or ''} VALUES "
+    return (prefix.lower(), columns), prefix, table, values, rows
+
+def statement_table(statement):
+    match = TABLE_STMT_RE.match(statement.lstrip('/*!0123456789 '))
+    return match.group(1).strip('`') if match else None
+
+class Batch:
+    """Consecutive INSERTs sharing table, column list and verb"""
+
+    def __init__(self, key, prefix, table):
+        self.key = key
+        self.prefix = prefix
+        self.table = table
+        self.members = []
+        self.values = []
+        self.rows = 0
+        self.size = len(prefix)
+
+    def add(self, statement, values, rows):
+        self.members.append(statement)
+        self.values.append(values)
+        self.rows += rows
+        self.size += len(values) + 2
+
+    def sql(self, upto=None):
+        values = self.values[:upto]
+        return self.prefix + ', '.join(values) if len(values) > 1 else self.members[0]
+
+def batch_statements(statements, max_rows=BATCH_ROWS, max_bytes=BATCH_BYTES):
+    """Yield (sql, table, rows, original statements) with single-table INSERTs merged"""
+    batch = None
+
+    def flush(split_last=False):
+        if split_last and len(batch.members) > 1:
+            # LAST_INSERT_ID() must still see the final original row
+            head = batch.rows - count_tuples(batch.values[-1])
+            yield batch.sql(-1), batch.table, head, batch.members[:-1]
+            yield batch.members[-1], batch.table, batch.rows - head, batch.members[-1:]
+        else:
+            yield batch.sql(), batch.table, batch.rows, batch.members
+
+    for statement in statements:
+        parsed = parse_insert(statement)
+        if parsed:
+            key, prefix, table, values, rows = parsed
+            if batch and (batch.key != key or batch.rows + rows > max_rows
+                          or batch.size + len(values) > max_bytes):
+                yield from flush()
+                batch = None
+            if batch is None:
+                batch = Batch(key, prefix, table)
+            batch.add(statement, values, rows)
+            continue
+        if batch:
+            yield from flush(split_last='LAST_INSERT_ID' in statement.upper())
+            batch = None
+        yield statement, statement_table(statement), 0, [statement]
+    if batch:
+        yield from flush()
+
+class TableStats:
+    """Per-table statement, row, byte and time totals"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {}
+
+    def record(self, table, statements, rows, size, seconds):
+        with self.lock:
+            entry = self.tables.setdefault(table or '(other)', [0, 0, 0, 0.0])
+            entry[0] += statements
+            entry[1] += rows
+            entry[2] += size
+            entry[3] += seconds
+
+    def report(self, elapsed):
+        print(f"\n{'table':<28}{'stmts':>8}{'rows':>10}{'MB':>8}{'sec':>8}{'rows/s':>10}")
+        for table, (statements, rows, size, seconds) in sorted(self.tables.items(), key=lambda t: -t[1][3]):
+            rate = rows / seconds if seconds and rows else 0
+            print(f"{table:<28}{statements:>8}{rows:>10}{size / 1048576:>8.2f}{seconds:>8.2f}{rate:>10.0f}")
+        total_rows = sum(t[1] for t in self.tables.values())
+        print(f"Total: {total_rows} rows in {elapsed:.2f}s ({total_rows / elapsed if elapsed else 0:.0f} rows/s)")
+
+def print_error(statement, error):
+    print(f"Warning: {error}")
+
+def run_item(cursor, item, stats, ignore_errnos, on_error):
+    """Execute one (possibly merged) statement, retrying members one by one if the batch fails"""
+    sql, table, rows, members = item
+    start = time.perf_counter()
+    try:
+        cursor.execute(sql)
+        if cursor.with_rows:
+            cursor.fetchall()
+    except Error as e:
+        if len(members) > 1:
+            for member in members:
+                parsed = parse_insert(member)
+                run_item(cursor, (member, table, parsed[4] if parsed else 0, [member]),
+                         stats, ignore_errnos, on_error)
+            return
+        if e.errno not in ignore_errnos:
+            on_error(sql, e)
+    stats.record(table, len(members), rows, len(sql), time.perf_counter() - start)
+
+def load_file(connection, path, ignore_errnos=(), on_error=print_error, stats=None,
+              max_rows=BATCH_ROWS, max_bytes=BATCH_BYTES):
+    """Load a SQL file on one connection in file order; returns the TableStats"""
+    stats = stats or TableStats()
+    cursor = connection.cursor()
+    for item in batch_statements(iter_statements(path), max_rows, max_bytes):
+        run_item(cursor, item, stats, ignore_errnos, on_error)
+    connection.commit()
+    cursor.close()
+    return stats
+
+def uses_session_state(statement):
+    """True if a statement depends on user variables or LAST_INSERT_ID() set by earlier ones"""
+    bare = LITERAL_RE.sub("''", statement)
+    return bool(re.search(r"(?<!@)@(?!@)\w|LAST_INSERT_ID", bare, re.I))
+
+def parallel_safe(path):
+    """A file can load table-parallel if all row data is plain INSERT ... VALUES without session state"""
+    for statement in iter_statements(path):
+        if parse_insert(statement):
+            if uses_session_state(statement) or re.search(r'\bSELECT\b', LITERAL_RE.sub("''", statement), re.I):
+                return False
+            continue
+        bare = statement.lstrip('/*!0123456789 ')
+        head = bare.split(None, 1)[0].upper() if bare else ''
+        if head not in ('SET', 'CREATE', 'DROP', 'ALTER', 'LOCK', 'UNLOCK', 'USE', 'START', 'COMMIT'):
+            return False
+    return True
+
+def verify_foreign_keys(cursor, tables):
+    """Count child rows whose parent row is missing, for FKs on the given tables"""
+    if not tables:
+        return []
+    placeholders = ', '.join(['%s'] * len(tables))
+    cursor.execute(f"""
+        SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME, CONSTRAINT_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+          AND TABLE_NAME IN ({placeholders})
+    """, tuple(tables))
+    problems = []
+    for table, column, parent, parent_column, constraint in cursor.fetchall():
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM `{table}` c
+            LEFT JOIN `{parent}` p ON p.`{parent_column}` = c.`{column}`
+            WHERE c.`{column}` IS NOT NULL AND p.`{parent_column}` IS NULL
+        """)
+        orphans = cursor.fetchone()[0]
+        if orphans:
+            problems.append((constraint, table, orphans))
+    return problems
+
+def load_parallel(connect, path, workers, ignore_errnos=(), on_error=print_error,
+                  max_rows=BATCH_ROWS, max_bytes=BATCH_BYTES):
+    """Run DDL in file order on one connection and stream each table's rows to a worker"""
+    stats = TableStats()
+    main = connect()
+    cursor = main.cursor()
+    preamble = []
+    unique_checks_off = False
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+    loaded_tables = set()
+
+    def worker_cursor():
+        if not hasattr(local, 'conn'):
+            local.conn = connect()
+            local.cursor = local.conn.cursor()
+            with connections_lock:
+                connections.append(local.conn)
+            for statement in preamble:
+                local.cursor.execute(statement)
+            local.cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            if unique_checks_off:
+                local.cursor.execute("SET UNIQUE_CHECKS = 0")
+        return local.conn, local.cursor
+
+    def load_table(items):
+        conn, worker = worker_cursor()
+        done = 0
+        while True:
+            item = items.get()
+            if item is None:
+                break
+            run_item(worker, item, stats, ignore_errnos, on_error)
+            done += 1
+            if done % COMMIT_EVERY == 0:
+                conn.commit()
+        conn.commit()
+
+    futures = {}
+    current_table, current_queue = None, None
+    seen_data = False
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for item in batch_statements(iter_statements(path), max_rows, max_bytes):
+            sql, table, rows, members = item
+            if rows:
+                seen_data = True
+                if table != current_table:
+                    if current_queue:
+                        current_queue.put(None)
+                    current_table, current_queue = table, queue.Queue(QUEUE_DEPTH)
+                    loaded_tables.add(table)
+                    if table in futures:
+                        futures[table].result()  # table shows up again: keep its rows in order
+                    futures[table] = pool.submit(load_table, current_queue)
+                current_queue.put(item)
+                continue
+            if DUMP_ONLY_RE.match(sql):
+                continue  # table locks would serialize the workers; DISABLE KEYS is a no-op on InnoDB
+            if not seen_data and sql.lstrip('/*!0123456789 ').upper().startswith('SET'):
+                preamble.append(sql)
+                if re.search(r'UNIQUE_CHECKS\s*=\s*0', sql, re.I):
+                    unique_checks_off = True
+            if table and table == current_table:
+                current_queue.put(None)
+                current_table, current_queue = None, None
+            if table in futures:
+                futures[table].result()  # DDL on a table waits for its rows
+            run_item(cursor, item, stats, ignore_errnos, on_error)
+        if current_queue:
+            current_queue.put(None)
+        for future in futures.values():
+            future.result()
+
+    for conn in connections:
+        conn.close()
+    main.commit()
+    problems = verify_foreign_keys(cursor, sorted(loaded_tables))
+    cursor.close()
+    main.close()
+    return stats, problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream SQL files into the database")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--workers', type=int, default=1, help="Parallel table loaders for dump files")
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS)
+    parser.add_argument('--batch-bytes', type=int, default=BATCH_BYTES)
+    parser.add_argument('--ignore-duplicates', action='store_true', help="Skip duplicate-key errors (1062)")
+    args = parser.parse_args()
+    ignore = {1062} if args.ignore_duplicates else set()
+
+    def connect():
+        conn = create_connection()
+        if not conn:
+            sys.exit(1)
+        return conn
+
+    for path in args.files:
+        print(f"\nLoading {path}...")
+        start = time.perf_counter()
+        try:
+            if args.workers > 1 and parallel_safe(path):
+                stats, problems = load_parallel(connect, path, args.workers, ignore,
+                                                max_rows=args.batch_rows, max_bytes=args.batch_bytes)
+                stats.report(time.perf_counter() - start)
+                for constraint, table, orphans in problems:
+                    print(f"✗ {table}: {orphans} rows violate {constraint}")
+            else:
+                if args.workers > 1:
+                    print("  File uses session state or non-INSERT data statements; loading sequentially")
+                conn = connect()
+                stats = load_file(conn, path, ignore, max_rows=args.batch_rows, max_bytes=args.batch_bytes)
+                conn.close()
+                stats.report(time.perf_counter() - start)
+            print(f"✓ Loaded {path}")
+        except (Error, ValueError) as e:
+            print(f"✗ Failed to load {path}: {e}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
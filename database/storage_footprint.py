@@ -0,0 +1,727 @@
+#!/usr/bin/env python3
+"""
+Storage Footprint Analyzer for Student Portal
+Measures how much disk and buffer pool each table and index actually uses,
+looks at the real value distributions behind the declared column types, and
+generates a migration for a compact schema:
+
+    - integer columns narrowed to the smallest type that fits the observed
+      range times --headroom (ids change together with every column that
+      references them, so foreign keys stay type-compatible)
+    - redundant indexes dropped: exact duplicates and left prefixes of another
+      index (e.g. attendance.idx_student next to unique_attendance)
+    - optionally, department strings replaced by a departments lookup table
+      (--department-lookup; PHP queries filtering on department must join
+      departments before this can be deployed)
+    - optionally, ROW_FORMAT=COMPRESSED for large tables (--compress)
+
+Wide VARCHAR and TEXT columns are reported with their observed lengths but
+not changed: InnoDB stores them by actual length, so narrowing the
+declaration does not shrink the tablespace.
+
+`measure` copies every table into scratch schemas, applies the generated
+migration to one copy and reports measured before/after sizes and how the
+result fits the configured buffer pool. Run it on a database filled by
+generate_realistic_data.py at the scale of interest.
+
+Usage:
+    python database/storage_footprint.py analyze [--headroom 10]
+    python database/storage_footprint.py generate [--department-lookup] [--compress] [-o database/migrations/15_compact_schema.sql]
+    python database/storage_footprint.py measure [--department-lookup] [--compress] [--keep]
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+from collections import defaultdict
+
+import mysql.connector
+from mysql.connector import Error
+
+from sql_loader import load_file
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+HEADROOM = 10
+COMPRESS_MIN_MB = 16
+KEY_BLOCK_SIZE = 8
+DEPARTMENT_COLUMN_RE = re.compile(r'(^|_)department$')
+MB = 1024 * 1024
+
+# (type, bytes, signed max, unsigned max)
+INTEGER_TYPES = [
+    ('tinyint', 1, 127, 255),
+    ('smallint', 2, 32767, 65535),
+    ('mediumint', 3, 8388607, 16777215),
+    ('int', 4, 2147483647, 4294967295),
+    ('bigint', 8, 9223372036854775807, 18446744073709551615),
+]
+INTEGER_BYTES = {name: size for name, size, _, _ in INTEGER_TYPES}
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def fetch_dicts(cursor, query, params=()):
+    cursor.execute(query, params)
+    columns = [c[0].lower() for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def table_sizes(cursor, schema):
+    """Per table: rows, data/index/free bytes from TABLES, file size from INNODB_TABLESPACES"""
+    rows = fetch_dicts(cursor, """
+        SELECT t.TABLE_NAME AS name, t.TABLE_ROWS AS estimated_rows, t.DATA_LENGTH AS data_bytes,
+               t.INDEX_LENGTH AS index_bytes, t.DATA_FREE AS free_bytes, t.AVG_ROW_LENGTH AS avg_row,
+               t.ROW_FORMAT AS row_format, t.AUTO_INCREMENT AS auto_increment, ts.FILE_SIZE AS file_bytes, ts.ALLOCATED_SIZE AS allocated_bytes
+        FROM information_schema.TABLES t
+        LEFT JOIN information_schema.INNODB_TABLESPACES ts ON ts.NAME = CONCAT(t.TABLE_SCHEMA, '/', t.TABLE_NAME)
+        WHERE t.TABLE_SCHEMA = %s AND t.TABLE_TYPE = 'BASE TABLE' AND t.ENGINE = 'InnoDB'
+        ORDER BY t.DATA_LENGTH + t.INDEX_LENGTH DESC
+    """, (schema,))
+    return {row['name']: row for row in rows}
+
+def index_sizes(cursor, schema):
+    """(table, index) -> bytes, from persistent index statistics"""
+    cursor.execute("SELECT @@innodb_page_size")
+    page_size = cursor.fetchall()[0][0]
+    cursor.execute("""
+        SELECT table_name, index_name, stat_value FROM mysql.innodb_index_stats
+        WHERE database_name = %s AND stat_name = 'size'
+    """, (schema,))
+    return {(table, index): pages * page_size for table, index, pages in cursor.fetchall()}
+
+def index_definitions(cursor, schema):
+    """table -> index -> {'columns': [...], 'unique': bool}"""
+    cursor.execute("""
+        SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME, SUB_PART, EXPRESSION
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = %s
+        ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+    """, (schema,))
+    indexes = defaultdict(dict)
+    for table, index, non_unique, column, sub_part, expression in cursor.fetchall():
+        entry = indexes[table].setdefault(index, {'columns': [], 'unique': not non_unique})
+        entry['columns'].append(column if sub_part is None and expression is None
+                                else f"{column or expression}({sub_part or 'expr'})")
+    return indexes
+
+def index_usage(cursor, schema):
+    """(table, index) -> reads since server start, where performance_schema tracks it"""
+    try:
+        cursor.execute("""
+            SELECT OBJECT_NAME, INDEX_NAME, COUNT_READ FROM performance_schema.table_io_waits_summary_by_index_usage
+            WHERE OBJECT_SCHEMA = %s AND INDEX_NAME IS NOT NULL
+        """, (schema,))
+        return {(table, index): reads for table, index, reads in cursor.fetchall()}
+    except Error:
+        return {}
+
+def columns(cursor, schema):
+    """table -> list of column metadata in ordinal order"""
+    rows = fetch_dicts(cursor, """
+        SELECT TABLE_NAME AS table_name, COLUMN_NAME AS name, DATA_TYPE AS data_type, COLUMN_TYPE AS column_type,
+               IS_NULLABLE AS nullable, COLUMN_DEFAULT AS default_value, EXTRA AS extra,
+               CHARACTER_MAXIMUM_LENGTH AS max_length, COLUMN_KEY AS column_key, COLUMN_COMMENT AS comment
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = %s
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+    """, (schema,))
+    result = defaultdict(list)
+    for row in rows:
+        result[row['table_name']].append(row)
+    return result
+
+def foreign_keys(cursor, schema):
+    """List of (table, column, referenced table, referenced column, constraint)"""
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME, CONSTRAINT_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = %s AND REFERENCED_TABLE_SCHEMA = %s AND REFERENCED_TABLE_NAME IS NOT NULL
+    """, (schema, schema))
+    return cursor.fetchall()
+
+def distributions(cursor, schema, table, table_columns):
+    """Observed values per column: min/max for integers, lengths and distinct counts for strings"""
+    parts, keys = ['COUNT(*)'], []
+    for column in table_columns:
+        name = f"`{column['name']}`"
+        if column['data_type'] in INTEGER_BYTES:
+            parts += [f"MIN({name})", f"MAX({name})"]
+            keys.append((column['name'], ('min', 'max')))
+        elif column['data_type'] in ('varchar', 'char', 'text', 'mediumtext', 'longtext', 'tinytext'):
+            parts += [f"MAX(CHAR_LENGTH({name}))", f"AVG(CHAR_LENGTH({name}))", f"SUM({name} IS NULL)"]
+            fields = ('max_length', 'avg_length', 'nulls')
+            if column['data_type'] in ('varchar', 'char') and (column['max_length'] or 0) <= 255:
+                parts.append(f"COUNT(DISTINCT {name})")
+                fields += ('distinct',)
+            keys.append((column['name'], fields))
+    cursor.execute(f"SELECT {', '.join(parts)} FROM `{schema}`.`{table}`")
+    values = list(cursor.fetchall()[0])
+    stats = {'_rows': int(values.pop(0))}
+    for name, fields in keys:
+        stats[name] = {field: values.pop(0) for field in fields}
+    return stats
+
+class Footprint:
+    """Everything measured about one schema"""
+
+    def __init__(self, cursor, schema, analyze=True):
+        self.schema = schema
+        if analyze:
+            for table in table_sizes(cursor, schema):
+                cursor.execute(f"ANALYZE TABLE `{schema}`.`{table}`")
+                cursor.fetchall()
+        self.tables = table_sizes(cursor, schema)
+        self.index_bytes = index_sizes(cursor, schema)
+        self.indexes = index_definitions(cursor, schema)
+        self.usage = index_usage(cursor, schema)
+        self.columns = columns(cursor, schema)
+        self.foreign_keys = foreign_keys(cursor, schema)
+        self.stats = {table: distributions(cursor, schema, table, self.columns[table]) for table in self.tables}
+        cursor.execute("SELECT @@innodb_buffer_pool_size, @@innodb_file_per_table")
+        self.buffer_pool, self.file_per_table = cursor.fetchall()[0]
+
+    def rows(self, table):
+        return self.stats[table]['_rows']
+
+    def total_bytes(self):
+        return sum(t['data_bytes'] + t['index_bytes'] for t in self.tables.values())
+
+# ---------------------------------------------------------------------------
+# Proposals
+# ---------------------------------------------------------------------------
+
+def fitting_type(low, high, headroom):
+    """Smallest (type, unsigned) holding [low, high] with headroom on the magnitude"""
+    low, high = int(low or 0), int(high or 0)
+    unsigned = low >= 0
+    limit = max(abs(low), abs(high), 1) * headroom
+    for name, _, signed_max, unsigned_max in INTEGER_TYPES:
+        if limit <= (unsigned_max if unsigned else signed_max):
+            return name, unsigned
+    return 'bigint', unsigned
+
+def integer_families(footprint):
+    """Groups of columns that must share a type: a referenced column plus every column referencing it"""
+    parent = {}
+
+    def find(node):
+        while parent.setdefault(node, node) != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for table, column, ref_table, ref_column, _ in footprint.foreign_keys:
+        parent[find((table, column))] = find((ref_table, ref_column))
+    for table, table_columns in footprint.columns.items():
+        if table not in footprint.tables:
+            continue
+        for column in table_columns:
+            if column['data_type'] in INTEGER_BYTES and 'GENERATED' not in column['extra'].upper():
+                find((table, column['name']))
+    families = defaultdict(list)
+    for node in parent:
+        if node[0] in footprint.tables:
+            families[find(node)].append(node)
+    return list(families.values())
+
+def column_meta(footprint, table, name):
+    for column in footprint.columns[table]:
+        if column['name'] == name:
+            return column
+    return None
+
+def indexes_containing(footprint, table, column):
+    return [index for index, definition in footprint.indexes.get(table, {}).items()
+            if index != 'PRIMARY' and column in definition['columns']]
+
+def integer_proposals(footprint, headroom):
+    """Narrower types per family, with estimated bytes saved"""
+    proposals = []
+    for family in integer_families(footprint):
+        low = high = None
+        current = None
+        for table, name in family:
+            stats = footprint.stats[table].get(name)
+            meta = column_meta(footprint, table, name)
+            if not stats or meta is None:
+                continue
+            if stats['min'] is not None:
+                low = stats['min'] if low is None else min(low, stats['min'])
+                high = stats['max'] if high is None else max(high, stats['max'])
+            if 'auto_increment' in meta['extra'] and stats['max'] is not None:
+                high = max(high, int(footprint.tables[table]['auto_increment'] or 0))
+            current = max(current or 0, INTEGER_BYTES[meta['data_type']])
+        if current is None or high is None:
+            continue  # Empty columns give no evidence to narrow on
+        low = low if low is not None else 0
+        new_type, unsigned = fitting_type(low, high, headroom)
+        if INTEGER_BYTES[new_type] >= current:
+            continue
+        saved = 0
+        for table, name in family:
+            meta = column_meta(footprint, table, name)
+            if meta is None:
+                continue
+            width = INTEGER_BYTES[meta['data_type']] - INTEGER_BYTES[new_type]
+            copies = 1 + len(indexes_containing(footprint, table, name))
+            if name in footprint.indexes.get(table, {}).get('PRIMARY', {}).get('columns', []):
+                # The primary key is repeated in every secondary index entry
+                copies += len([i for i in footprint.indexes[table] if i != 'PRIMARY'])
+            saved += width * copies * footprint.rows(table)
+        proposals.append({
+            'columns': sorted(family),
+            'range': (low, high),
+            'type': f"{new_type}{' unsigned' if unsigned else ''}",
+            'saved_bytes': saved,
+        })
+    return sorted(proposals, key=lambda p: -p['saved_bytes'])
+
+def covers(index, definition, other, other_definition):
+    """Whether other makes index unnecessary: same leading columns and at least the same guarantees"""
+    columns_, other_columns = definition['columns'], other_definition['columns']
+    if other_columns[:len(columns_)] != columns_:
+        return False
+    if definition['unique']:
+        # A unique constraint on fewer columns is not implied by a longer index
+        if other_columns != columns_ or not other_definition['unique']:
+            return False
+        return other == 'PRIMARY' or other < index
+    if other_columns == columns_ and not other_definition['unique']:
+        return other < index  # Exact duplicates: keep the alphabetically first
+    return True
+
+def redundant_indexes(footprint):
+    """(table, index, covered by, reason) for duplicates and left prefixes of another index"""
+    redundant = []
+    for table, indexes in footprint.indexes.items():
+        if table not in footprint.tables:
+            continue
+        for name, definition in indexes.items():
+            if name == 'PRIMARY':
+                continue
+            for other, other_definition in indexes.items():
+                if other != name and covers(name, definition, other, other_definition):
+                    reason = 'duplicate of' if definition['columns'] == other_definition['columns'] else 'left prefix of'
+                    redundant.append((table, name, other, reason))
+                    break
+    return redundant
+
+def department_columns(footprint):
+    """(table, column) pairs holding department names as strings"""
+    found = []
+    for table, table_columns in footprint.columns.items():
+        if table not in footprint.tables or table == 'departments':
+            continue
+        for column in table_columns:
+            if DEPARTMENT_COLUMN_RE.search(column['name']) and column['data_type'] in ('varchar', 'char'):
+                found.append((table, column['name']))
+    return found
+
+def department_savings(footprint, pairs):
+    saved = 0
+    for table, column in pairs:
+        stats = footprint.stats[table].get(column, {})
+        rows = footprint.rows(table)
+        filled = rows - int(stats.get('nulls') or 0)
+        # A length byte plus the characters becomes a 1-byte id
+        per_row = float(stats.get('avg_length') or 0)
+        copies = 1 + len(indexes_containing(footprint, table, column))
+        saved += int(per_row * filled * copies)
+    return saved
+
+def compress_tables(footprint, explicit, enabled, min_mb):
+    if explicit:
+        return [table for table in explicit if table in footprint.tables]
+    if not enabled:
+        return []
+    return [table for table, sizes in footprint.tables.items()
+            if sizes['data_bytes'] + sizes['index_bytes'] >= min_mb * MB and sizes['row_format'] != 'Compressed']
+
+def wide_string_notes(footprint):
+    notes = []
+    for table, table_columns in footprint.columns.items():
+        if table not in footprint.tables:
+            continue
+        for column in table_columns:
+            stats = footprint.stats[table].get(column['name'])
+            if not stats or 'max_length' not in stats:
+                continue
+            declared = column['max_length'] or 0
+            longest = int(stats['max_length'] or 0)
+            if column['data_type'].endswith('text') or (declared >= 255 and longest * 4 < declared):
+                notes.append((table, column['name'], column['column_type'], longest,
+                              float(stats['avg_length'] or 0), int(stats['nulls'] or 0)))
+    return notes
+
+class Plan:
+    """The compact-schema changes chosen for a footprint"""
+
+    def __init__(self, footprint, headroom, department_lookup, compress, compress_min_mb, compress_only=None):
+        self.footprint = footprint
+        self.integers = integer_proposals(footprint, headroom)
+        self.redundant = redundant_indexes(footprint)
+        self.departments = department_columns(footprint) if department_lookup else []
+        self.compressed = compress_tables(footprint, compress_only, compress, compress_min_mb)
+
+    def estimated_savings(self):
+        index_saving = sum(self.footprint.index_bytes.get((table, index), 0) for table, index, _, _ in self.redundant)
+        return {
+            'integers': sum(p['saved_bytes'] for p in self.integers),
+            'indexes': index_saving,
+            'departments': department_savings(self.footprint, self.departments),
+        }
+
+# ---------------------------------------------------------------------------
+# Migration
+# ---------------------------------------------------------------------------
+
+def column_definition(meta, new_type=None):
+    """Full MODIFY definition of a column, optionally with a new type"""
+    definition = new_type or meta['column_type']
+    definition += ' NULL' if meta['nullable'] == 'YES' else ' NOT NULL'
+    if meta['default_value'] is not None:
+        definition += f" DEFAULT {meta['default_value']}" if re.match(r'^-?\d+(\.\d+)?$', str(meta['default_value'])) \
+            else f" DEFAULT '{meta['default_value']}'"
+    if 'auto_increment' in meta['extra']:
+        definition += ' AUTO_INCREMENT'
+    if meta['comment']:
+        definition += " COMMENT '" + meta['comment'].replace("'", "''") + "'"
+    return definition
+
+def guarded(check, statement, skip_message):
+    """Repo migration idiom: run a statement only if an information_schema count is zero"""
+    statement = statement.replace("'", "''")
+    return [
+        f"SET @exist := ({check});",
+        f"SET @sqlstmt := IF(@exist = 0, '{statement}', 'SELECT \"{skip_message}\"');",
+        "PREPARE stmt FROM @sqlstmt;",
+        "EXECUTE stmt;",
+        "DEALLOCATE PREPARE stmt;",
+    ]
+
+def index_exists_check(schema, table, index):
+    """Zero while the index exists, so guarded() drops it only once"""
+    return (f"SELECT COUNT(*) = 0 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = '{schema}' "
+            f"AND TABLE_NAME = '{table}' AND INDEX_NAME = '{index}'")
+
+def column_exists_check(schema, table, column):
+    return (f"SELECT COUNT(*) FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = '{schema}' "
+            f"AND TABLE_NAME = '{table}' AND COLUMN_NAME = '{column}'")
+
+def generate_migration(plan, schema, number_label):
+    footprint = plan.footprint
+    savings = plan.estimated_savings()
+    lines = [
+        f"-- Migration: Compact schema ({number_label})",
+        "-- Description: Generated by database/storage_footprint.py from measured value",
+        f"-- ranges on {footprint.schema} ({footprint.total_bytes() / MB:.1f} MB data + indexes). Narrows integer",
+        "-- columns (ids together with the columns referencing them), drops redundant",
+        "-- indexes" + (", moves department names to a lookup table" if plan.departments else "")
+        + (" and compresses large tables." if plan.compressed else "."),
+        f"-- Estimated savings: integers {savings['integers'] / MB:.1f} MB, indexes {savings['indexes'] / MB:.1f} MB"
+        + (f", departments {savings['departments'] / MB:.1f} MB" if plan.departments else "") + ".",
+    ]
+    if plan.departments:
+        lines.append("-- NOTE: department columns are replaced by department_id; queries that filter or")
+        lines.append("-- display department must join departments before this is deployed.")
+    lines += ['', f"USE {schema};", '', "SET FOREIGN_KEY_CHECKS = 0;", '']
+
+    if plan.redundant:
+        lines.append("-- Redundant indexes (each is a duplicate or left prefix of the index named)")
+        for table, index, other, reason in plan.redundant:
+            lines.append(f"-- {table}.{index}: {reason} {other}")
+            lines += guarded(index_exists_check(schema, table, index), f"ALTER TABLE {table} DROP INDEX {index}",
+                             f"Index {table}.{index} already dropped")
+        lines.append('')
+
+    if plan.departments:
+        lines += [
+            "-- Department lookup",
+            "CREATE TABLE IF NOT EXISTS departments (",
+            "    id TINYINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,",
+            "    name VARCHAR(100) NOT NULL,",
+            "    UNIQUE KEY unique_department_name (name)",
+            ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;",
+            '',
+        ]
+        sources = ' UNION '.join(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL AND {column} <> ''"
+                                 for table, column in plan.departments)
+        pairs = ', '.join(f"('{table}', '{column}')" for table, column in plan.departments)
+        check = (f"SELECT COUNT(*) < {len(plan.departments)} FROM information_schema.COLUMNS "
+                 f"WHERE TABLE_SCHEMA = '{schema}' AND (TABLE_NAME, COLUMN_NAME) IN ({pairs})")
+        lines += guarded(check, f"INSERT IGNORE INTO departments (name) {sources}",
+                         "Department columns already replaced")
+        lines.append('')
+        for table, column in plan.departments:
+            meta = column_meta(footprint, table, column)
+            id_column = f"{column}_id"
+            lines.append(f"-- {table}.{column} -> {id_column}")
+            lines += guarded(column_exists_check(schema, table, id_column),
+                             f"ALTER TABLE {table} ADD COLUMN {id_column} TINYINT UNSIGNED NULL AFTER {column}",
+                             f"Column {table}.{id_column} already exists")
+            lines += guarded(f"SELECT 1 - ({column_exists_check(schema, table, column)})",
+                             f"UPDATE {table} t JOIN departments d ON d.name = t.{column} "
+                             f"SET t.{id_column} = d.id WHERE t.{id_column} IS NULL",
+                             f"Column {table}.{column} already replaced")
+            alter = []
+            for index, definition in footprint.indexes.get(table, {}).items():
+                if column in definition['columns'] and index not in [r[1] for r in plan.redundant if r[0] == table]:
+                    replaced = ', '.join(id_column if c == column else c for c in definition['columns'])
+                    kind = 'UNIQUE INDEX' if definition['unique'] else 'INDEX'
+                    alter += [f"DROP INDEX {index}", f"ADD {kind} {index} ({replaced})"]
+            if meta and meta['nullable'] == 'NO':
+                alter.append(f"MODIFY {id_column} TINYINT UNSIGNED NOT NULL")
+            alter += [f"DROP COLUMN {column}",
+                      f"ADD CONSTRAINT fk_{table}_{id_column} FOREIGN KEY ({id_column}) REFERENCES departments(id)"]
+            lines += guarded(f"SELECT 1 - ({column_exists_check(schema, table, column)})",
+                             f"ALTER TABLE {table} " + ', '.join(alter),
+                             f"Column {table}.{column} already replaced")
+            lines.append('')
+
+    # One rebuild per table: type changes and row format together
+    modifications = defaultdict(list)
+    for proposal in plan.integers:
+        for table, name in proposal['columns']:
+            meta = column_meta(footprint, table, name)
+            if meta is not None:
+                modifications[table].append(f"MODIFY {name} {column_definition(meta, proposal['type'])}")
+    for table in plan.compressed:
+        modifications[table].append(f"ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE={KEY_BLOCK_SIZE}")
+    if modifications:
+        lines.append("-- Narrower integer types" + (" and compressed row format" if plan.compressed else ""))
+        for table in sorted(modifications):
+            for proposal in plan.integers:
+                for t, name in proposal['columns']:
+                    if t == table:
+                        low, high = proposal['range']
+                        lines.append(f"-- {table}.{name}: observed {low}..{high}")
+            lines.append(f"ALTER TABLE {table}\n    " + ',\n    '.join(modifications[table]) + ';')
+            lines.append('')
+
+    lines += ["SET FOREIGN_KEY_CHECKS = 1;", '', "-- Success message",
+              "SELECT 'Compact schema applied successfully!' AS message;", '']
+    return '\n'.join(lines)
+
+def next_migration_path():
+    numbers = [int(name.split('_', 1)[0]) for name in os.listdir(MIGRATIONS_DIR) if re.match(r'^\d+_', name)]
+    return os.path.join(MIGRATIONS_DIR, f"{max(numbers, default=0) + 1:02d}_compact_schema.sql")
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+def print_footprint(footprint, top):
+    print(f"Schema {footprint.schema}: {footprint.total_bytes() / MB:.1f} MB data + indexes, "
+          f"buffer pool {footprint.buffer_pool / MB:.0f} MB")
+    print(f"\n{'Table':<26} {'Rows':>10} {'Data MB':>9} {'Index MB':>9} {'File MB':>9} {'Free MB':>8} {'B/row':>7} {'Format':>10}")
+    for name, t in list(footprint.tables.items())[:top]:
+        rows = footprint.rows(name)
+        per_row = (t['data_bytes'] + t['index_bytes']) / rows if rows else 0
+        file_mb = f"{(t['file_bytes'] or 0) / MB:.2f}" if t['file_bytes'] is not None else '-'
+        print(f"{name:<26} {rows:>10} {t['data_bytes'] / MB:>9.2f} {t['index_bytes'] / MB:>9.2f} {file_mb:>9} "
+              f"{(t['free_bytes'] or 0) / MB:>8.2f} {per_row:>7.0f} {t['row_format']:>10}")
+
+def print_indexes(footprint, plan, top):
+    redundant = {(table, index): (other, reason) for table, index, other, reason in plan.redundant}
+    rows = sorted(footprint.index_bytes.items(), key=lambda item: -item[1])
+    print(f"\n{'Index':<48} {'MB':>8} {'Reads':>12}  Columns")
+    for (table, index), size in rows[:top]:
+        definition = footprint.indexes.get(table, {}).get(index)
+        if definition is None:
+            continue
+        reads = footprint.usage.get((table, index))
+        flag = ''
+        if (table, index) in redundant:
+            other, reason = redundant[(table, index)]
+            flag = f"  ✗ {reason} {other}"
+        elif reads == 0 and index != 'PRIMARY':
+            flag = "  (unused since server start)"
+        print(f"{table + '.' + index:<48} {size / MB:>8.2f} {reads if reads is not None else '-':>12}  "
+              f"{', '.join(definition['columns'])}{flag}")
+    extra = [key for key in redundant if key not in dict(rows[:top])]
+    for table, index in extra:
+        other, reason = redundant[(table, index)]
+        print(f"{table + '.' + index:<48} {footprint.index_bytes.get((table, index), 0) / MB:>8.2f} "
+              f"{'':>12}  ✗ {reason} {other}")
+
+def print_plan(plan):
+    footprint = plan.footprint
+    savings = plan.estimated_savings()
+    if plan.integers:
+        print("\nInteger narrowing (column family: observed range -> type, est. saving)")
+        for proposal in plan.integers:
+            names = ', '.join(f"{t}.{c}" for t, c in proposal['columns'])
+            low, high = proposal['range']
+            print(f"  {proposal['type']:<20} {low}..{high:<10} {proposal['saved_bytes'] / MB:>7.2f} MB  {names[:100]}")
+    if plan.departments:
+        print("\nDepartment lookup: " + ', '.join(f"{t}.{c}" for t, c in plan.departments))
+    notes = wide_string_notes(footprint)
+    if notes:
+        print("\nWide strings (stored by actual length; declaration left unchanged)")
+        for table, column, declared, longest, average, nulls in notes[:20]:
+            print(f"  {table + '.' + column:<40} {declared:<14} longest {longest:>6}, avg {average:>7.1f}, "
+                  f"{nulls} NULL of {footprint.rows(table)}")
+    if plan.compressed:
+        print("\nROW_FORMAT=COMPRESSED: " + ', '.join(plan.compressed))
+        if footprint.file_per_table != 1:
+            print("  ! innodb_file_per_table is off; compressed tables need it")
+    total = sum(savings.values())
+    print(f"\nEstimated saving: {total / MB:.1f} MB of {footprint.total_bytes() / MB:.1f} MB "
+          f"(integers {savings['integers'] / MB:.1f}, indexes {savings['indexes'] / MB:.1f}"
+          + (f", departments {savings['departments'] / MB:.1f}" if plan.departments else '') + ")")
+
+def fit_line(label, size, buffer_pool):
+    share = size / buffer_pool * 100 if buffer_pool else 0
+    verdict = 'fits' if size <= buffer_pool * 0.8 else ('tight' if size <= buffer_pool else 'does not fit')
+    return f"  {label:<8} {size / MB:>9.1f} MB = {share:>5.0f}% of the {buffer_pool / MB:.0f} MB buffer pool ({verdict})"
+
+# ---------------------------------------------------------------------------
+# Measure on scratch copies
+# ---------------------------------------------------------------------------
+
+def copy_schema(cursor, conn, source, target, tables, column_lists):
+    cursor.execute(f"DROP DATABASE IF EXISTS `{target}`")
+    cursor.execute(f"CREATE DATABASE `{target}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    for table in tables:
+        cursor.execute(f"CREATE TABLE `{target}`.`{table}` LIKE `{source}`.`{table}`")
+        names = ', '.join(f"`{c}`" for c in column_lists[table])
+        cursor.execute(f"INSERT INTO `{target}`.`{table}` ({names}) SELECT {names} FROM `{source}`.`{table}`")
+        conn.commit()
+
+def measure(conn, plan, keep):
+    footprint = plan.footprint
+    source = footprint.schema
+    before_schema, after_schema = f"{source}_footprint_before", f"{source}_footprint_after"
+    tables = list(footprint.tables)
+    column_lists = {table: [c['name'] for c in footprint.columns[table] if 'GENERATED' not in c['extra'].upper()]
+                    for table in tables}
+    cursor = conn.cursor()
+    try:
+        # Both sides are freshly built copies, so fragmentation in the live tables does not count as savings
+        print(f"Copying {len(tables)} tables into {before_schema} and {after_schema}...")
+        copy_schema(cursor, conn, source, before_schema, tables, column_lists)
+        copy_schema(cursor, conn, source, after_schema, tables, column_lists)
+
+        migration = generate_migration(plan, after_schema, 'measurement copy')
+        failures = []
+        with tempfile.NamedTemporaryFile('w', suffix='.sql', delete=False) as f:
+            f.write(migration)
+            path = f.name
+        try:
+            load_file(conn, path, on_error=lambda sql, e: failures.append((sql, e)))
+        finally:
+            os.unlink(path)
+        for sql, e in failures:
+            print(f"  ! {e}: {sql.strip()[:120]}")
+
+        before = Footprint(cursor, before_schema)
+        after = Footprint(cursor, after_schema)
+    finally:
+        if not keep:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{before_schema}`")
+            cursor.execute(f"DROP DATABASE IF EXISTS `{after_schema}`")
+        cursor.close()
+
+    print(f"\n{'Table':<26} {'Before MB':>10} {'After MB':>9} {'Change':>8} {'File before':>12} {'File after':>11}")
+    for table in sorted(before.tables, key=lambda t: -(before.tables[t]['data_bytes'] + before.tables[t]['index_bytes'])):
+        b = before.tables[table]
+        a = after.tables.get(table)
+        if a is None:
+            continue
+        size_before = b['data_bytes'] + b['index_bytes']
+        size_after = a['data_bytes'] + a['index_bytes']
+        change = (size_after - size_before) / size_before * 100 if size_before else 0
+        print(f"{table:<26} {size_before / MB:>10.2f} {size_after / MB:>9.2f} {change:>+7.1f}% "
+              f"{(b['file_bytes'] or 0) / MB:>12.2f} {(a['file_bytes'] or 0) / MB:>11.2f}")
+    for table in sorted(set(after.tables) - set(before.tables)):
+        a = after.tables[table]
+        print(f"{table + ' (new)':<26} {0:>10.2f} {(a['data_bytes'] + a['index_bytes']) / MB:>9.2f}")
+    total_before, total_after = before.total_bytes(), after.total_bytes()
+    files_before = sum(t['file_bytes'] or 0 for t in before.tables.values())
+    files_after = sum(t['file_bytes'] or 0 for t in after.tables.values())
+    print(f"\nMeasured: {total_before / MB:.1f} MB -> {total_after / MB:.1f} MB data + indexes "
+          f"({(total_after - total_before) / total_before * 100 if total_before else 0:+.1f}%), "
+          f"tablespace files {files_before / MB:.1f} MB -> {files_after / MB:.1f} MB")
+    print("Buffer pool fit:")
+    print(fit_line('live', footprint.total_bytes(), footprint.buffer_pool))
+    print(fit_line('before', total_before, footprint.buffer_pool))
+    print(fit_line('after', total_after, footprint.buffer_pool))
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure table footprint and generate a compact-schema migration")
+    parser.add_argument('command', choices=['analyze', 'generate', 'measure'])
+    parser.add_argument('--headroom', type=float, default=HEADROOM,
+                        help="Growth factor on observed integer ranges before narrowing")
+    parser.add_argument('--department-lookup', action='store_true', help="Replace department strings with a lookup table")
+    parser.add_argument('--compress', action='store_true', help="Compress tables of at least --compress-min-mb")
+    parser.add_argument('--compress-min-mb', type=float, default=COMPRESS_MIN_MB)
+    parser.add_argument('--compress-tables', help="Comma-separated tables to compress instead")
+    parser.add_argument('--no-analyze', action='store_true', help="Skip ANALYZE TABLE (use current statistics)")
+    parser.add_argument('--top', type=int, default=30)
+    parser.add_argument('-o', '--output', help="Migration path for generate (default: next number in migrations/)")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch schemas measure creates")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+
+    try:
+        cursor = conn.cursor()
+        footprint = Footprint(cursor, DB_CONFIG['database'], analyze=not args.no_analyze)
+        cursor.close()
+        compress_only = args.compress_tables.split(',') if args.compress_tables else None
+        plan = Plan(footprint, args.headroom, args.department_lookup, args.compress, args.compress_min_mb, compress_only)
+
+        if args.command == 'analyze':
+            print_footprint(footprint, args.top)
+            print_indexes(footprint, plan, args.top)
+            print_plan(plan)
+            print("\nBuffer pool fit:")
+            print(fit_line('live', footprint.total_bytes(), footprint.buffer_pool))
+        elif args.command == 'generate':
+            path = args.output or next_migration_path()
+            label = os.path.basename(path).split('_', 1)[0]
+            with open(path, 'w') as f:
+                f.write(generate_migration(plan, DB_CONFIG['database'], f"migration {label}"))
+            print_plan(plan)
+            print(f"\n✓ Wrote {path}; review it, then run `python database/storage_footprint.py measure` "
+                  f"with the same options before applying")
+        else:
+            print_plan(plan)
+            print()
+            measure(conn, plan, args.keep)
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Subset Extractor for Student Portal
+Writes a small, loadable, PII-masked copy of the database: a sample of
+students plus everything their rows reference (users, sessions, subjects,
+fees, teachers, teacher_subjects, ...) and everything that hangs off them
+(marks, exam_marks, attendance, payments, assignment submissions).
+
+Reference tables (sessions, semesters, subjects, fees, teachers, admins,
+teacher_subjects, assignments, notices, ...) are small and copied whole; only
+student-owned rows are sampled. Rows are streamed with unbuffered cursors and
+written as multi-row INSERTs after the source's own CREATE TABLE statements,
+so the output loads with sql_loader.py (parallel-safe) or the mysql client.
+
+Masking is deterministic (HMAC of the original value), so the same guardian
+or phone number masks to the same value everywhere and across runs with the
+same key. Dates of birth keep their year; profile pictures are dropped.
+All accounts get the password from seeds/populate_users.sql.
+
+Usage:
+    python database/subset_extract.py --department BCA --semester 5 -o subset.sql
+    python database/subset_extract.py --percent 5 --seed 7 -o subset.sql
+"""
+
+import argparse
+import hashlib
+import hmac
+import os
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import mysql.connector
+from mysql.connector import Error
+
+from value_pools import ValuePools
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+# password123 (see seeds/populate_users.sql)
+MASKED_PASSWORD = '$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi'
+ROWS_PER_INSERT = 500
+
+# Copied whole; user columns pull the referenced users into the subset
+REFERENCE_TABLES = ['sessions', 'semesters', 'subjects', 'fees', 'teachers', 'admins', 'teacher_subjects',
+                    'assignments', 'notices', 'fee_notifications', 'study_materials']
+# Sampled through their student_id column
+STUDENT_TABLES = ['marks', 'exam_marks', 'attendance', 'payments', 'assignment_submissions']
+USER_COLUMNS = {
+    'students': ['user_id'], 'teachers': ['user_id'], 'admins': ['user_id'],
+    'marks': ['entered_by'], 'attendance': ['marked_by'], 'payments': ['processed_by'],
+    'notices': ['created_by'], 'fee_notifications': ['sent_by'], 'study_materials': ['uploaded_by'],
+}
+
+# (column pattern, mask kind); checked in order against every column of users/students/teachers/admins
+MASK_RULES = [
+    (re.compile(r'^first_name$'), 'first_name'),
+    (re.compile(r'^last_name$'), 'last_name'),
+    (re.compile(r'^(guardian|parent)\d?_name$'), 'full_name'),
+    (re.compile(r'(^|_)email$'), 'email'),
+    (re.compile(r'(^|_)phone$'), 'phone'),
+    (re.compile(r'^address$'), 'address'),
+    (re.compile(r'^profile_(image|picture)$'), 'null'),
+    (re.compile(r'^date_of_birth$'), 'birth_date'),
+]
+MASKED_TABLES = {'users', 'students', 'teachers', 'admins'}
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+class Masker:
+    """Deterministic replacements keyed by an HMAC of the original value"""
+
+    def __init__(self, key):
+        self.key = key.encode()
+        self.pools = ValuePools('en_IN', 42).pools
+
+    def digest(self, kind, value):
+        return int.from_bytes(hmac.new(self.key, f"{kind}:{value}".encode(), hashlib.sha256).digest()[:8], 'big')
+
+    def pick(self, pool, kind, value):
+        values = self.pools[pool]
+        return str(values[self.digest(kind, value) % len(values)])
+
+    def mask(self, kind, value, row, table):
+        if value is None or kind == 'null':
+            return None
+        if kind in ('first_name', 'last_name', 'full_name'):
+            pool = 'female_names' if row.get('gender') == 'female' else 'male_names'
+            name = self.pick(pool, kind, value).split()
+            if kind == 'first_name':
+                return name[0]
+            if kind == 'last_name':
+                return name[-1]
+            return ' '.join(name)
+        if kind == 'email':
+            return f"{table[:-1]}{self.digest(kind, value) % 10**10:010d}@example.test"
+        if kind == 'phone':
+            return f"+919{self.digest(kind, value) % 10**9:09d}"[:15]
+        if kind == 'address':
+            return self.pick('addresses', kind, value)
+        if kind == 'birth_date':
+            # Same year, so ages and batch cohorts stay plausible
+            return date(value.year, 1, 1) + timedelta(days=self.digest(kind, value) % 365)
+        return value
+
+    def mask_row(self, table, columns, row):
+        if table not in MASKED_TABLES:
+            return row
+        record = dict(zip(columns, row))
+        for column in columns:
+            if table == 'users' and column == 'username':
+                record[column] = f"{record.get('role', 'user')}{record['id']}"
+            elif table == 'users' and column == 'password':
+                record[column] = MASKED_PASSWORD
+            else:
+                for pattern, kind in MASK_RULES:
+                    if pattern.search(column):
+                        record[column] = self.mask(kind, record[column], record, table)
+                        break
+        return tuple(record[c] for c in columns)
+
+def sql_literal(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return f"'{value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()}'"
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return f"'{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}'"
+    if isinstance(value, (bytes, bytearray)):
+        return f"X'{bytes(value).hex()}'" if value else "''"
+    if isinstance(value, set):
+        value = ','.join(sorted(value))
+    text = str(value).replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n') \
+        .replace('\r', '\\r').replace('\x00', '\\0').replace('\x1a', '\\Z')
+    return f"'{text}'"
+
+def existing_tables(cursor):
+    cursor.execute("SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()")
+    return {row[0] for row in cursor.fetchall()}
+
+def fill_ids(cursor, table, ids):
+    """Insert ids into a temporary table in batches"""
+    ids = list(ids)
+    for start in range(0, len(ids), ROWS_PER_INSERT):
+        cursor.executemany(f"INSERT IGNORE INTO {table} (id) VALUES (%s)",
+                           [(i,) for i in ids[start:start + ROWS_PER_INSERT]])
+
+# The sample is read with plain SELECTs and written to the temporary tables from
+# Python: INSERT ... SELECT would be a locking read inside the snapshot
+# transaction, holding shared next-key locks on production rows until the dump
+# finishes (and reading the latest committed rows rather than the snapshot).
+
+def select_students(cursor, args):
+    """Fill the subset_students temporary table; returns the sample size"""
+    cursor.execute("CREATE TEMPORARY TABLE subset_students (id INT PRIMARY KEY)")
+    where, params = [], []
+    if args.department:
+        where.append("department = %s")
+        params.append(args.department)
+    if args.semester:
+        where.append("semester = %s")
+        params.append(args.semester)
+    if args.session:
+        where.append("session_id = %s")
+        params.append(args.session)
+    if args.percent is not None:
+        # Stable per-seed sample: the same students come out on every run
+        where.append("CRC32(CONCAT(id, ':', %s)) %% 10000 < %s")
+        params.extend([args.seed, int(args.percent * 100)])
+    sql = "SELECT id FROM students"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if args.limit:
+        sql += " ORDER BY id LIMIT %s"
+        params.append(args.limit)
+    cursor.execute(sql, tuple(params))
+    ids = [row[0] for row in cursor.fetchall()]
+    fill_ids(cursor, 'subset_students', ids)
+    return len(ids)
+
+def select_users(cursor, tables):
+    """Collect every user referenced by the sampled students and the reference tables"""
+    cursor.execute("CREATE TEMPORARY TABLE subset_users (id INT PRIMARY KEY)")
+    users = set()
+    for table, columns in USER_COLUMNS.items():
+        if table not in tables:
+            continue
+        for column in columns:
+            source = f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL"
+            if table == 'students':
+                source += " AND id IN (SELECT id FROM subset_students)"
+            elif table in STUDENT_TABLES:
+                source += " AND student_id IN (SELECT id FROM subset_students)"
+            cursor.execute(source)
+            users.update(row[0] for row in cursor.fetchall())
+    fill_ids(cursor, 'subset_users', sorted(users))
+    return len(users)
+
+def table_plan(tables):
+    """(table, WHERE clause) in parent-first order"""
+    plan = [('users', "id IN (SELECT id FROM subset_users)")]
+    plan += [(t, None) for t in REFERENCE_TABLES if t in tables]
+    plan.append(('students', "id IN (SELECT id FROM subset_students)"))
+    plan += [(t, "student_id IN (SELECT id FROM subset_students)") for t in STUDENT_TABLES if t in tables]
+    return plan
+
+def dump_table(conn, out, table, where, masker):
+    """Stream one table's selected rows as multi-row INSERTs; returns (rows, bytes)"""
+    cursor = conn.cursor()
+    cursor.execute(f"SHOW CREATE TABLE `{table}`")
+    create = cursor.fetchall()[0][1]
+    create = re.sub(r' AUTO_INCREMENT=\d+', '', create)
+    out.write(f"\n--\n-- Table `{table}`\n--\n\nDROP TABLE IF EXISTS `{table}`;\n{create};\n\n")
+
+    cursor.execute(f"SELECT * FROM `{table}`" + (f" WHERE {where}" if where else "") + " ORDER BY 1")
+    columns = cursor.column_names
+    column_list = ', '.join(f"`{c}`" for c in columns)
+    rows = written = 0
+    while True:
+        batch = cursor.fetchmany(ROWS_PER_INSERT)
+        if not batch:
+            break
+        values = ',\n'.join('(' + ', '.join(sql_literal(v) for v in masker.mask_row(table, columns, row)) + ')'
+                            for row in batch)
+        statement = f"INSERT INTO `{table}` ({column_list}) VALUES\n{values};\n"
+        out.write(statement)
+        rows += len(batch)
+        written += len(statement)
+    cursor.close()
+    return rows, written
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract a masked, referentially consistent student subset")
+    parser.add_argument('-o', '--output', required=True, help="SQL file to write")
+    parser.add_argument('--department')
+    parser.add_argument('--semester', type=int)
+    parser.add_argument('--session', type=int, help="sessions.id")
+    parser.add_argument('--percent', type=float, help="Sample this percentage of matching students")
+    parser.add_argument('--limit', type=int, help="At most this many students")
+    parser.add_argument('--seed', type=int, default=42, help="Sampling seed for --percent")
+    parser.add_argument('--mask-key', default=os.environ.get('SUBSET_MASK_KEY', 'studentportal-subset'),
+                        help="HMAC key for masking (or SUBSET_MASK_KEY)")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+    start = time.perf_counter()
+    try:
+        cursor = conn.cursor(buffered=True)
+        tables = existing_tables(cursor)
+        # One consistent snapshot for the sample and every table read afterwards
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        students = select_students(cursor, args)
+        users = select_users(cursor, tables)
+        print(f"✓ Sampled {students} students ({users} referenced users)")
+
+        cursor.execute("""
+            SELECT TABLE_NAME, DATA_LENGTH + INDEX_LENGTH FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE()
+        """)
+        source_sizes = dict(cursor.fetchall())
+        cursor.close()
+
+        masker = Masker(args.mask_key)
+        total_rows = total_bytes = 0
+        with open(args.output, 'w', encoding='utf-8') as out:
+            out.write("-- Student Portal masked subset\n")
+            out.write(f"-- Generated {datetime.now():%Y-%m-%d %H:%M:%S}; filters: department={args.department} "
+                      f"semester={args.semester} session={args.session} percent={args.percent} limit={args.limit}\n\n")
+            out.write("SET NAMES utf8mb4;\nSET FOREIGN_KEY_CHECKS = 0;\n")
+            for table, where in table_plan(tables):
+                rows, size = dump_table(conn, out, table, where, masker)
+                total_rows += rows
+                total_bytes += size
+                print(f"  {table:<24}{rows:>9} rows  {size / 1024:>9.1f} KB")
+            out.write("\nSET FOREIGN_KEY_CHECKS = 1;\n")
+        conn.rollback()
+
+        source_total = sum(source_sizes.get(t, 0) or 0 for t, _ in table_plan(tables))
+        print(f"\n✓ Wrote {total_rows} rows ({total_bytes / 1048576:.2f} MB) to {args.output} "
+              f"in {time.perf_counter() - start:.1f}s")
+        if source_total:
+            print(f"  Source tables occupy {source_total / 1048576:.2f} MB on disk "
+                  f"(subset data is {total_bytes / source_total * 100:.1f}% of that)")
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
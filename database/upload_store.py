@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Upload Store for Student Portal
+Moves files referenced by study_materials, assignments and
+assignment_submissions into backend/uploads/cas/ab/cd/<sha256>.<ext>, so a
+question paper uploaded by five departments is stored once.
+
+Modes:
+    reference  rewrite file_path/file_url to the shared blob and remove the
+               original file (default)
+    hardlink   keep database paths; replace duplicates with hard links to the blob
+
+Every blob and every row using it is recorded in upload_blobs / upload_refs
+(migration 12). gc prunes references whose row was deleted or repointed,
+marks unreferenced blobs, and removes them after a grace period (or once
+expires_at passes) with indexed queries; no directory scan is needed.
+
+Usage:
+    python database/upload_store.py migrate [--mode hardlink] [--batch 200] [--dry-run]
+    python database/upload_store.py put backend/uploads/temp/report.pdf --expires-hours 24
+    python database/upload_store.py gc [--grace-hours 24] [--dry-run]
+    python database/upload_store.py stats
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+
+import mysql.connector
+from mysql.connector import Error
+
+# Database configuration
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+CAS_PREFIX = 'uploads/cas/'
+HASH_CHUNK = 1024 * 1024
+
+# table -> (path column, url column or None)
+SOURCES = {
+    'study_materials': ('file_path', 'file_url'),
+    'assignments': ('file_path', None),
+    'assignment_submissions': ('file_path', None),
+}
+
+def create_connection():
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                DB_CONFIG['password'] = 'root'
+                connection = mysql.connector.connect(**DB_CONFIG)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def disk_path(db_path):
+    """Map '../../uploads/x' (materials) or '/uploads/x' (assignments) to a file under backend/"""
+    index = db_path.find('uploads/')
+    if index < 0:
+        return None
+    return os.path.join(BACKEND_DIR, db_path[index:])
+
+def rewrite(value, blob_rel):
+    """Keep whatever precedes 'uploads/' (relative prefix or URL origin) and point at the blob"""
+    if not value or 'uploads/' not in value:
+        return value
+    return value[:value.find('uploads/')] + blob_rel
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def link_or_copy(source, target):
+    """Create target as a hard link to source, copying when they are on different filesystems"""
+    tmp = f"{target}.tmp{os.getpid()}"
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copy2(source, tmp)
+    os.replace(tmp, target)
+
+def store_blob(path):
+    """Ensure the blob for a file exists; returns (sha256, blob path relative to backend/, size)"""
+    sha = hash_file(path)
+    blob_rel = f"{CAS_PREFIX}{sha[:2]}/{sha[2:4]}/{sha}{os.path.splitext(path)[1].lower()}"
+    blob_abs = os.path.join(BACKEND_DIR, blob_rel)
+    if not os.path.exists(blob_abs):
+        os.makedirs(os.path.dirname(blob_abs), exist_ok=True)
+        link_or_copy(path, blob_abs)
+    return sha, blob_rel, os.path.getsize(blob_abs)
+
+def record_blobs(cursor, blobs, expires_at=None):
+    cursor.executemany("""
+        INSERT INTO upload_blobs (sha256, storage_path, size_bytes, expires_at) VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE orphaned_at = NULL
+    """, [(sha, rel, size, expires_at) for sha, (rel, size) in blobs.items()])
+
+def migrate_table(conn, table, mode, batch_size, dry_run, totals):
+    path_col, url_col = SOURCES[table]
+    cursor = conn.cursor()
+    last_id = 0
+    replaced = []
+    while True:
+        # Rows not yet indexed at their current path, in primary-key batches
+        cursor.execute(f"""
+            SELECT t.id, t.{path_col}{', t.' + url_col if url_col else ''}
+            FROM {table} t
+            LEFT JOIN upload_refs r ON r.source_table = %s AND r.source_id = t.id AND r.db_path = t.{path_col}
+            WHERE t.id > %s AND t.{path_col} IS NOT NULL AND r.source_id IS NULL
+            ORDER BY t.id LIMIT %s
+        """, (table, last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        blobs, refs, updates = {}, [], []
+        for row in rows:
+            row_id, db_path = row[0], row[1]
+            url = row[2] if url_col else None
+            source = disk_path(db_path)
+            if not source or not os.path.isfile(source):
+                totals['missing'] += 1
+                continue
+            totals['files'] += 1
+            totals['bytes'] += os.path.getsize(source)
+            if dry_run:
+                sha = hash_file(source)
+                totals['unique'].add(sha)
+                continue
+
+            sha, blob_rel, size = store_blob(source)
+            totals['unique'].add(sha)
+            blobs[sha] = (blob_rel, size)
+            blob_abs = os.path.join(BACKEND_DIR, blob_rel)
+            if mode == 'reference':
+                new_path = rewrite(db_path, blob_rel)
+                if os.path.abspath(source) != os.path.abspath(blob_abs):
+                    replaced.append(source)
+                updates.append((new_path, rewrite(url, blob_rel), row_id, db_path) if url_col
+                               else (new_path, row_id, db_path))
+            else:
+                new_path = db_path
+                if not os.path.samefile(source, blob_abs):
+                    link_or_copy(blob_abs, source)
+            refs.append((table, row_id, sha, new_path, db_path))
+
+        if dry_run or not refs:
+            continue
+        write = conn.cursor()
+        record_blobs(write, blobs)
+        if updates:
+            set_clause = f"{path_col} = %s" + (f", {url_col} = %s" if url_col else '')
+            # Guard on the old path so a concurrent re-upload is not overwritten
+            write.executemany(f"UPDATE {table} SET {set_clause} WHERE id = %s AND {path_col} = %s", updates)
+        write.executemany("""
+            INSERT INTO upload_refs (source_table, source_id, sha256, db_path, original_path)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE sha256 = VALUES(sha256), db_path = VALUES(db_path),
+                                    original_path = VALUES(original_path)
+        """, refs)
+        conn.commit()
+        write.close()
+    cursor.close()
+    return replaced
+
+def remove_replaced(conn, replaced):
+    """Delete originals that no row points at any more (several rows may have shared one)"""
+    if not replaced:
+        return 0
+    cursor = conn.cursor()
+    in_use = set()
+    for table, (path_col, _) in SOURCES.items():
+        cursor.execute(f"SELECT {path_col} FROM {table} WHERE {path_col} IS NOT NULL")
+        in_use.update(disk_path(p) for (p,) in cursor.fetchall())
+    cursor.close()
+    removed = 0
+    for path in set(replaced):
+        if path not in in_use and os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+def migrate(conn, mode, batch_size, dry_run):
+    totals = {'files': 0, 'bytes': 0, 'missing': 0, 'unique': set()}
+    replaced = []
+    for table in SOURCES:
+        replaced += migrate_table(conn, table, mode, batch_size, dry_run, totals)
+        print(f"  {table}: done")
+    removed = remove_replaced(conn, replaced) if not dry_run else 0
+    print(f"✓ {totals['files']} files ({totals['bytes'] / 1048576:.1f} MB) -> {len(totals['unique'])} unique blobs"
+          f"{' (dry run)' if dry_run else ''}; {removed} originals removed, {totals['missing']} rows without a file")
+
+def put(conn, path, expires_hours):
+    sha, blob_rel, size = store_blob(path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO upload_blobs (sha256, storage_path, size_bytes, expires_at)
+        VALUES (%s, %s, %s, IF(%s IS NULL, NULL, NOW() + INTERVAL %s HOUR))
+        ON DUPLICATE KEY UPDATE orphaned_at = NULL,
+            expires_at = IF(expires_at IS NULL, NULL, GREATEST(expires_at, VALUES(expires_at)))
+    """, (sha, blob_rel, size, expires_hours, expires_hours))
+    conn.commit()
+    cursor.close()
+    print(f"✓ {path} -> {blob_rel}")
+
+def gc(conn, grace_hours, dry_run, batch_size=500):
+    cursor = conn.cursor()
+    for table, (path_col, _) in SOURCES.items():
+        # Row deleted, or file_path replaced by a new upload
+        cursor.execute(f"""
+            DELETE r FROM upload_refs r
+            LEFT JOIN {table} t ON t.id = r.source_id AND t.{path_col} = r.db_path
+            WHERE r.source_table = %s AND t.id IS NULL
+        """, (table,))
+        if cursor.rowcount:
+            print(f"  {table}: {cursor.rowcount} stale references pruned")
+    cursor.execute("""
+        UPDATE upload_blobs b LEFT JOIN upload_refs r ON r.sha256 = b.sha256
+        SET b.orphaned_at = NOW()
+        WHERE r.sha256 IS NULL AND b.orphaned_at IS NULL AND b.expires_at IS NULL
+    """)
+    marked = cursor.rowcount
+    cursor.execute("""
+        UPDATE upload_blobs b JOIN upload_refs r ON r.sha256 = b.sha256
+        SET b.orphaned_at = NULL WHERE b.orphaned_at IS NOT NULL
+    """)
+    if dry_run:
+        conn.rollback()
+    else:
+        conn.commit()
+
+    cursor.execute("""
+        SELECT sha256, storage_path, size_bytes FROM upload_blobs
+        WHERE orphaned_at < NOW() - INTERVAL %s HOUR
+        UNION
+        SELECT sha256, storage_path, size_bytes FROM upload_blobs b
+        WHERE expires_at <= NOW() AND NOT EXISTS (SELECT 1 FROM upload_refs r WHERE r.sha256 = b.sha256)
+    """, (grace_hours,))
+    doomed = cursor.fetchall()
+    freed = 0
+    for start in range(0, len(doomed), batch_size):
+        chunk = doomed[start:start + batch_size]
+        if not dry_run:
+            cursor.executemany("DELETE FROM upload_blobs WHERE sha256 = %s", [(sha,) for sha, _, _ in chunk])
+            conn.commit()
+            for _, storage_path, _ in chunk:
+                path = os.path.join(BACKEND_DIR, storage_path)
+                if os.path.exists(path):
+                    os.remove(path)
+        freed += sum(size for _, _, size in chunk)
+    cursor.close()
+    print(f"✓ {marked} blobs newly unreferenced; {'would remove' if dry_run else 'removed'} "
+          f"{len(doomed)} blobs ({freed / 1048576:.1f} MB)")
+
+def stats(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), SUM(orphaned_at IS NOT NULL), SUM(expires_at IS NOT NULL)
+        FROM upload_blobs
+    """)
+    blobs, stored, orphaned, expiring = cursor.fetchone()
+    cursor.execute("""
+        SELECT r.source_table, COUNT(*), COALESCE(SUM(b.size_bytes), 0)
+        FROM upload_refs r JOIN upload_blobs b ON b.sha256 = r.sha256
+        GROUP BY r.source_table
+    """)
+    logical = 0
+    for table, refs, size in cursor.fetchall():
+        logical += size
+        print(f"  {table:<24}{refs:>8} refs {size / 1048576:>10.1f} MB")
+    cursor.close()
+    print(f"Blobs: {blobs} ({stored / 1048576:.1f} MB stored, {logical / 1048576:.1f} MB referenced, "
+          f"{orphaned or 0} orphaned, {expiring or 0} expiring)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed storage for backend/uploads")
+    sub = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = sub.add_parser('migrate', help="Move referenced uploads into the blob store")
+    migrate_parser.add_argument('--mode', choices=['reference', 'hardlink'], default='reference')
+    migrate_parser.add_argument('--batch', type=int, default=200)
+    migrate_parser.add_argument('--dry-run', action='store_true', help="Hash and report savings only")
+    put_parser = sub.add_parser('put', help="Store a file as a blob, optionally expiring")
+    put_parser.add_argument('path')
+    put_parser.add_argument('--expires-hours', type=int)
+    gc_parser = sub.add_parser('gc', help="Remove unreferenced and expired blobs")
+    gc_parser.add_argument('--grace-hours', type=int, default=24)
+    gc_parser.add_argument('--dry-run', action='store_true')
+    sub.add_parser('stats', help="Show dedup statistics")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    if not conn:
+        sys.exit(1)
+    try:
+        if args.command == 'migrate':
+            migrate(conn, args.mode, args.batch, args.dry_run)
+        elif args.command == 'put':
+            put(conn, args.path, args.expires_hours)
+        elif args.command == 'gc':
+            gc(conn, args.grace_hours, args.dry_run)
+        else:
+            stats(conn)
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
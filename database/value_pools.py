@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Value Pools for the Student Portal data generators
+Pre-generates deduplicated pools of Faker names and addresses plus phone
+numbers and date offsets once per (locale, seed), caches them as a compressed
+.npz under database/.cache/, and serves values by index into the arrays.
+Faker is only imported on a cache miss, so reruns start in milliseconds.
+
+Usage:
+    from value_pools import ValuePools
+    pools = ValuePools('en_IN', 42)
+    pools.name('male'), pools.phone(), pools.date_of_birth(18, 22)
+
+    python database/value_pools.py build|info [--locale en_IN] [--seed 42]
+"""
+
+import argparse
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+POOL_VERSION = 1
+
+POOL_SIZES = {
+    'male_names': 4000,
+    'female_names': 4000,
+    'addresses': 3000,
+    'phones': 100000,
+}
+PHONE_PREFIXES = [98, 97, 96, 95, 94, 93, 92, 91, 90, 89, 88, 87, 86, 85, 84, 83, 82, 81, 80, 79, 78, 77, 76, 75]
+FRACTIONS = 65536
+INDEX_CHUNK = 4096
+
+def unique_values(generate, size, max_attempts):
+    """Call generate() until size distinct values (or the attempt budget) are collected"""
+    seen = {}
+    for _ in range(max_attempts):
+        seen.setdefault(generate(), None)
+        if len(seen) >= size:
+            break
+    return list(seen)
+
+def build_pools(locale, seed):
+    """Generate every pool; the only place Faker is imported"""
+    from faker import Faker
+
+    fake = Faker(locale)
+    fake.seed_instance(seed)
+    rng = np.random.default_rng(seed)
+
+    male = unique_values(fake.name_male, POOL_SIZES['male_names'], POOL_SIZES['male_names'] * 5)
+    female = unique_values(fake.name_female, POOL_SIZES['female_names'], POOL_SIZES['female_names'] * 5)
+    addresses = unique_values(lambda: fake.address().replace('\n', ', '),
+                              POOL_SIZES['addresses'], POOL_SIZES['addresses'] * 2)
+
+    prefixes = rng.choice(PHONE_PREFIXES, size=POOL_SIZES['phones'] * 2).astype(np.int64)
+    numbers = np.unique(prefixes * 100000000 + rng.integers(10000000, 100000000, size=len(prefixes)))
+    phones = rng.permutation(numbers)[:POOL_SIZES['phones']]
+
+    return {
+        'male_names': np.array(male),
+        'female_names': np.array(female),
+        'addresses': np.array(addresses),
+        'phones': phones,
+        'fractions': rng.random(FRACTIONS).astype(np.float32),
+    }
+
+def cache_path(locale, seed):
+    return os.path.join(CACHE_DIR, f"pools-{locale}-{seed}-v{POOL_VERSION}.npz")
+
+def load_pools(locale, seed):
+    """Return cached pools, building and saving them on a miss"""
+    path = cache_path(locale, seed)
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+
+    pools = build_pools(locale, seed)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = path + '.tmp.npz'
+    np.savez_compressed(tmp, **pools)
+    os.replace(tmp, path)
+    return pools
+
+class ValuePools:
+    """Draws generator values from cached pools with precomputed index streams"""
+
+    def __init__(self, locale='en_IN', seed=42):
+        self.locale = locale
+        self.seed = seed
+        self._pools = None
+        self._rng = np.random.default_rng(seed + 1)
+        self._indexes = {}
+
+    @property
+    def pools(self):
+        if self._pools is None:
+            self._pools = load_pools(self.locale, self.seed)
+        return self._pools
+
+    def _next_index(self, pool_name):
+        """Next index into a pool, drawn INDEX_CHUNK at a time in one numpy call"""
+        buffer = self._indexes.get(pool_name)
+        if not buffer:
+            size = len(self.pools[pool_name])
+            buffer = self._rng.integers(0, size, size=INDEX_CHUNK).tolist()
+            buffer.reverse()
+            self._indexes[pool_name] = buffer
+        return buffer.pop()
+
+    def _pick(self, pool_name):
+        return self.pools[pool_name][self._next_index(pool_name)]
+
+    def name(self, gender='male'):
+        return str(self._pick('male_names' if gender == 'male' else 'female_names'))
+
+    def address(self):
+        return str(self._pick('addresses'))
+
+    def phone(self):
+        return f"+91{int(self._pick('phones'))}"
+
+    def _days(self, span):
+        return int(float(self._pick('fractions')) * span)
+
+    def date_of_birth(self, minimum_age, maximum_age):
+        """Same range as Faker.date_of_birth: older than minimum_age, younger than maximum_age + 1"""
+        today = date.today()
+        latest = today - timedelta(days=int(minimum_age * 365.25))
+        earliest = today - timedelta(days=int((maximum_age + 1) * 365.25) - 1)
+        return earliest + timedelta(days=self._days((latest - earliest).days + 1))
+
+    def date_between(self, years_back):
+        """A day between years_back years ago and today (Faker '-Ny' .. 'today')"""
+        today = date.today()
+        span = int(years_back * 365.25)
+        return today - timedelta(days=self._days(span + 1))
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect cached generator value pools")
+    parser.add_argument('command', choices=['build', 'info'])
+    parser.add_argument('--locale', default='en_IN')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    path = cache_path(args.locale, args.seed)
+    if args.command == 'build' and os.path.exists(path):
+        os.remove(path)
+    start = time.perf_counter()
+    pools = load_pools(args.locale, args.seed)
+    print(f"✓ Pools for {args.locale}/{args.seed} ready in {time.perf_counter() - start:.2f}s ({path})")
+    for name, values in pools.items():
+        print(f"  {name:<14} {len(values):>7} values")
+
+if __name__ == "__main__":
+    main()
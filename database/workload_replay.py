@@ -0,0 +1,729 @@
+#!/usr/bin/env python3
+"""
+Workload Capture and Replay for Student Portal
+Records the real statement stream of a running server and replays it against
+a staging database with the original timing, so schema and config changes
+(e.g. migrations/performance_optimization.sql) can be measured against
+result-day traffic instead of synthetic load.
+
+Capture sources:
+    general-log   Enables the general query log (log_output=TABLE) for the
+                  capture window. PDO's native prepares show up as Execute
+                  entries with the bound values interpolated, so every
+                  statement is replayable. Existing log files can be
+                  converted with --general-log-file.
+    perfschema    Polls performance_schema.events_statements_history_long.
+                  Cheaper on the server and records original latencies, but
+                  server-side prepared statements carry no parameter values;
+                  those are kept for reference and skipped on replay.
+
+Replay restores the target from a database/backup dump (optional), applies
+candidate SQL files, then runs every captured connection on its own
+connection and thread, each statement at its captured offset divided by the
+speed multiplier. Per-connection order and cross-connection concurrency are
+preserved. Results are summarized per statement fingerprint (literals
+replaced by ?) and two runs can be compared.
+
+Usage:
+    python database/workload_replay.py capture --source general-log --duration 600 -o result_day.jsonl.gz
+    python database/workload_replay.py capture --general-log-file /var/log/mysql/general.log -o result_day.jsonl.gz
+    python database/workload_replay.py replay result_day.jsonl.gz --database studentportal_staging \\
+        --restore database/backup/studentportal_backup_20251125.sql --speed 1 2 5 -o baseline
+    python database/workload_replay.py replay result_day.jsonl.gz --database studentportal_staging \\
+        --restore database/backup/studentportal_backup_20251125.sql \\
+        --apply database/migrations/performance_optimization.sql --speed 1 2 5 -o optimized
+    python database/workload_replay.py compare baseline_1x.json optimized_1x.json
+    python database/workload_replay.py summary result_day.jsonl.gz
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import mysql.connector
+from mysql.connector import Error
+
+from sql_loader import iter_statements, load_parallel, parallel_safe, load_file
+
+# Database configuration (capture source, and replay target unless overridden)
+DB_CONFIG = {
+    'host': os.environ.get('DB_HOST', 'localhost'),
+    'user': os.environ.get('DB_USER', 'root'),
+    'password': os.environ.get('DB_PASSWORD', ''),
+    'database': os.environ.get('DB_NAME', 'studentportal')
+}
+
+CAPTURE_FORMAT = 1
+POLL_SECONDS = 0.5
+CONNECT_LEAD = 0.05       # open replay connections this long before their first statement
+MIN_COMPARE_COUNT = 20
+REGRESSION_THRESHOLD = 0.10
+
+GENERAL_LOG_LINE_RE = re.compile(
+    r'^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d+)?)(?:Z|[+-]\d\d:\d\d)?\s+(\d+)\s+'
+    r'(Connect|Query|Execute|Prepare|Close stmt|Reset stmt|Fetch|Quit|Init DB|Field List|Statistics|Ping|Long Data|Change user)\t?(.*)$')
+CONNECT_DB_RE = re.compile(r'\bon (\S+)')
+COMMENT_RE = re.compile(r'/\*.*?\*/|--[^\n]*|#[^\n]*', re.S)
+LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"", re.S)
+NUMBER_RE = re.compile(r'\b0x[0-9a-f]+\b|(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b', re.I)
+IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.I)
+VALUES_RE = re.compile(r'\bvalues\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*', re.I)
+PLACEHOLDER_RE = re.compile(r'\?')
+SKIP_ON_REPLAY_RE = re.compile(r'^\s*(USE\b|SHOW\s+(?:GLOBAL\s+)?STATUS|SET\s+GLOBAL\b|KILL\b)', re.I)
+READ_RE = re.compile(r'^\s*(\(?\s*SELECT\b|SHOW\b|DESCRIBE\b|EXPLAIN\b|SET\b|BEGIN\b|START\s+TRANSACTION|COMMIT\b|ROLLBACK\b)', re.I)
+
+def create_connection(config=None):
+    config = config or DB_CONFIG
+    try:
+        connection = mysql.connector.connect(**config)
+        return connection
+    except Error as e:
+        if e.errno == 1045 and 'DB_PASSWORD' not in os.environ: # Access denied
+            try:
+                config['password'] = 'root'
+                connection = mysql.connector.connect(**config)
+                return connection
+            except Error as e2:
+                print(f"Error connecting to database: {e2}")
+                return None
+        print(f"Error connecting to database: {e}")
+        return None
+
+def fingerprint(sql):
+    """Normalized statement text: comments dropped, literals and lists collapsed to ?"""
+    text = COMMENT_RE.sub(' ', sql)
+    text = LITERAL_RE.sub('?', text)
+    text = NUMBER_RE.sub('?', text)
+    text = IN_LIST_RE.sub('in (?+)', text)
+    text = VALUES_RE.sub(r'values \1+', text)
+    return ' '.join(text.split()).lower()
+
+def fingerprint_id(text):
+    return hashlib.md5(text.encode('utf-8')).hexdigest()[:12]
+
+def has_unbound_params(sql):
+    """Prepared text whose ? placeholders were never filled in"""
+    return bool(PLACEHOLDER_RE.search(LITERAL_RE.sub("''", COMMENT_RE.sub(' ', sql))))
+
+# ---------------------------------------------------------------------------
+# Capture files
+# ---------------------------------------------------------------------------
+
+def open_capture(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+class CaptureWriter:
+    """JSONL: one header object, then one event per line ordered by offset"""
+
+    def __init__(self, path, header):
+        self.f = open_capture(path, 'w')
+        self.f.write(json.dumps({'format': CAPTURE_FORMAT, **header}) + '\n')
+        self.count = 0
+
+    def write(self, t, conn, kind, sql=None, ms=None, unbound=False):
+        event = {'t': round(t, 6), 'conn': conn, 'kind': kind}
+        if sql is not None:
+            event['sql'] = sql
+        if ms is not None:
+            event['ms'] = round(ms, 3)
+        if unbound:
+            event['unbound'] = True
+        self.f.write(json.dumps(event, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def close(self):
+        self.f.close()
+
+def read_capture(path):
+    """(header, events)"""
+    with open_capture(path, 'r') as f:
+        header = json.loads(f.readline())
+        if header.get('format') != CAPTURE_FORMAT:
+            raise ValueError(f"{path} is not a capture file (format {header.get('format')})")
+        events = [json.loads(line) for line in f if line.strip()]
+    return header, events
+
+def server_identity(cursor):
+    cursor.execute("SELECT @@hostname, @@port, @@version, CONNECTION_ID()")
+    hostname, port, version, connection_id = cursor.fetchall()[0]
+    return {'hostname': hostname, 'port': port, 'version': version}, connection_id
+
+# ---------------------------------------------------------------------------
+# General log
+# ---------------------------------------------------------------------------
+
+class GeneralLogFilter:
+    """Turns general log entries into capture events for one schema"""
+
+    def __init__(self, writer, schema, exclude=()):
+        self.writer = writer
+        self.schema = schema
+        self.exclude = set(exclude)
+        self.databases = {}    # connection id -> current database (None if unknown)
+        self.start = None
+        self.skipped = 0
+
+    def add(self, when, conn, command, argument):
+        if conn in self.exclude:
+            return
+        if self.start is None:
+            self.start = when
+        t = (when - self.start).total_seconds()
+        if command == 'Connect':
+            match = CONNECT_DB_RE.search(argument)
+            self.databases[conn] = match.group(1) if match else ''
+            if self.databases[conn] == self.schema:
+                self.writer.write(t, conn, 'connect')
+            return
+        if command == 'Init DB':
+            self.databases[conn] = argument.strip()
+            return
+        if self.databases.get(conn, self.schema) != self.schema:
+            self.skipped += 1  # Other schemas and connections without a default database
+            return
+        if command == 'Quit':
+            self.writer.write(t, conn, 'quit')
+        elif command in ('Query', 'Execute') and argument.strip():
+            self.writer.write(t, conn, 'query', argument)
+        # Prepare/Close stmt/Reset stmt carry no work of their own: Execute has the full text
+
+def capture_general_log(conn, writer, schema, duration):
+    """Log to mysql.general_log for the capture window, then convert it"""
+    cursor = conn.cursor()
+    identity, own_id = server_identity(cursor)
+    cursor.execute("SELECT @@global.general_log, @@global.log_output")
+    was_enabled, log_output = cursor.fetchall()[0]
+    outputs = {value for value in log_output.split(',') if value != 'NONE'} | {'TABLE'}
+    cursor.execute("SELECT NOW(6)")
+    started = cursor.fetchall()[0][0]
+
+    cursor.execute(f"SET GLOBAL log_output = '{','.join(sorted(outputs))}'")
+    cursor.execute("SET GLOBAL general_log = 'ON'")
+    print(f"General log enabled; capturing for {duration}s (Ctrl+C to stop early)...")
+    try:
+        time.sleep(duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if not was_enabled:
+            cursor.execute("SET GLOBAL general_log = 'OFF'")
+        cursor.execute(f"SET GLOBAL log_output = '{log_output}'")
+
+    log_filter = GeneralLogFilter(writer, schema, exclude=[own_id])
+    # CSV engine returns rows in write order, which ORDER BY event_time would not preserve for ties
+    cursor.execute("""
+        SELECT event_time, thread_id, command_type, CONVERT(argument USING utf8mb4)
+        FROM mysql.general_log
+        WHERE event_time >= %s
+    """, (started,))
+    for when, thread_id, command, argument in cursor:
+        log_filter.add(when, thread_id, command, argument or '')
+    cursor.close()
+    return identity, log_filter
+
+def parse_general_log_file(path, writer, schema):
+    """Convert a general log file (log_output=FILE) into capture events"""
+    log_filter = GeneralLogFilter(writer, schema)
+    entry = None
+
+    def emit(entry):
+        when, conn, command, lines = entry
+        log_filter.add(when, conn, command, '\n'.join(lines))
+
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            match = GENERAL_LOG_LINE_RE.match(line)
+            if match:
+                if entry:
+                    emit(entry)
+                stamp, conn, command, argument = match.groups()
+                entry = (datetime.fromisoformat(stamp), int(conn), command, [argument])
+            elif entry and not line.startswith(('Tcp port:', 'Time ', '/usr/sbin/mysqld', 'mysqld,')):
+                entry[3].append(line)  # Statement continues on the next line
+        if entry:
+            emit(entry)
+    return log_filter
+
+# ---------------------------------------------------------------------------
+# performance_schema
+# ---------------------------------------------------------------------------
+
+def capture_perfschema(conn, writer, schema, duration, interval):
+    """Poll events_statements_history_long for top-level statements of the schema"""
+    cursor = conn.cursor()
+    identity, own_id = server_identity(cursor)
+    cursor.execute("""
+        SELECT ENABLED FROM performance_schema.setup_consumers WHERE NAME = 'events_statements_history_long'
+    """)
+    was_enabled = cursor.fetchall()[0][0] == 'YES'
+    cursor.execute("SELECT @@performance_schema_events_statements_history_long_size, @@performance_schema_max_sql_text_length")
+    ring_size, max_text = cursor.fetchall()[0]
+    cursor.execute("""
+        UPDATE performance_schema.setup_consumers SET ENABLED = 'YES'
+        WHERE NAME IN ('events_statements_history_long', 'events_statements_current')
+    """)
+    conn.commit()
+
+    last_event = {}         # thread id -> highest EVENT_ID written
+    start_timer = None
+    dropped_polls = unbound = truncated = 0
+    deadline = time.time() + duration
+    print(f"Polling events_statements_history_long every {interval}s for {duration}s (Ctrl+C to stop early)...")
+    try:
+        while time.time() < deadline:
+            cursor.execute("""
+                SELECT h.THREAD_ID, h.EVENT_ID, h.TIMER_START, h.TIMER_WAIT, h.SQL_TEXT, t.PROCESSLIST_ID
+                FROM performance_schema.events_statements_history_long h
+                JOIN performance_schema.threads t ON t.THREAD_ID = h.THREAD_ID
+                WHERE h.NESTING_EVENT_ID IS NULL AND h.SQL_TEXT IS NOT NULL
+                  AND h.CURRENT_SCHEMA = %s AND t.PROCESSLIST_ID <> %s
+                ORDER BY h.TIMER_START
+            """, (schema, own_id))
+            rows = cursor.fetchall()
+            if last_event and len(rows) >= ring_size:
+                dropped_polls += 1  # Ring buffer wrapped between polls: some statements were missed
+            for thread_id, event_id, timer_start, timer_wait, sql, conn_id in rows:
+                if event_id <= last_event.get(thread_id, 0):
+                    continue
+                last_event[thread_id] = event_id
+                if start_timer is None:
+                    start_timer = timer_start
+                missing = has_unbound_params(sql)
+                cut = len(sql) >= max_text
+                unbound += missing
+                truncated += cut
+                writer.write((timer_start - start_timer) / 1e12, conn_id, 'query', sql,
+                             ms=timer_wait / 1e9, unbound=missing or cut)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if not was_enabled:
+            cursor.execute("""
+                UPDATE performance_schema.setup_consumers SET ENABLED = 'NO'
+                WHERE NAME = 'events_statements_history_long'
+            """)
+            conn.commit()
+        cursor.close()
+
+    if dropped_polls:
+        print(f"  ! The history ring ({ring_size} rows) wrapped during {dropped_polls} polls; "
+              f"lower --interval or raise performance_schema_events_statements_history_long_size")
+    if unbound or truncated:
+        print(f"  ! {unbound} prepared statements without parameter values and {truncated} truncated texts "
+              f"(performance_schema_max_sql_text_length={max_text}) will be skipped on replay")
+    return identity
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+def restore(config, dump_path, workers):
+    """Load a database/backup dump into the target database"""
+    def connect():
+        conn = create_connection(dict(config))
+        if not conn:
+            raise Error(msg="cannot connect to replay target")
+        return conn
+
+    start = time.perf_counter()
+    if workers > 1 and parallel_safe(dump_path):
+        _, problems = load_parallel(connect, dump_path, workers)
+        for constraint, table, orphans in problems:
+            print(f"  ! {table}: {orphans} rows violate {constraint}")
+    else:
+        conn = connect()
+        load_file(conn, dump_path)
+        conn.close()
+    print(f"✓ Restored {dump_path} in {time.perf_counter() - start:.1f}s")
+
+def apply_sql(config, path):
+    """Run a migration against the target, ignoring its USE so it cannot touch another schema"""
+    conn = create_connection(dict(config))
+    if not conn:
+        raise Error(msg="cannot connect to replay target")
+    cursor = conn.cursor()
+    failed = 0
+    for statement in iter_statements(path):
+        if re.match(r'^\s*USE\b', statement, re.I):
+            continue
+        try:
+            cursor.execute(statement)
+            if cursor.with_rows:
+                cursor.fetchall()
+        except Error as e:
+            failed += 1
+            print(f"  ! {path}: {e}")
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"✓ Applied {path}" + (f" ({failed} statements failed)" if failed else ""))
+
+class ReplayStats:
+    """Latencies and errors per fingerprint, plus how late statements started"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+        self.texts = {}
+        self.lags = []
+        self.skipped = defaultdict(int)
+
+    def record(self, key, text, seconds, lag, error=None):
+        with self.lock:
+            self.texts[key] = text
+            self.lags.append(lag)
+            if error is None:
+                self.latencies[key].append(seconds)
+            else:
+                self.errors[key] += 1
+                self.error_samples.setdefault(key, str(error))
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean_ms': sum(values) / len(values) * 1000,
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'total_ms': sum(values) * 1000,
+    }
+
+def replay_connection(config, events, origin, speed, stats):
+    """Run one captured connection's statements in order at their scheduled times"""
+    first_due = origin + events[0]['t'] / speed
+    time.sleep(max(0.0, first_due - CONNECT_LEAD - time.perf_counter()))
+    try:
+        conn = mysql.connector.connect(**config, autocommit=True)
+    except Error as e:
+        for event in events:
+            if event['kind'] == 'query':
+                text = fingerprint(event['sql'])
+                stats.record(fingerprint_id(text), text, 0.0, 0.0, e)
+        return
+    cursor = conn.cursor()
+    for event in events:
+        due = origin + event['t'] / speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if event['kind'] == 'quit':
+            break
+        if event['kind'] != 'query':
+            continue
+        text = fingerprint(event['sql'])
+        key = fingerprint_id(text)
+        start = time.perf_counter()
+        try:
+            cursor.execute(event['sql'])
+            if cursor.with_rows:
+                cursor.fetchall()
+            stats.record(key, text, time.perf_counter() - start, start - due)
+        except Error as e:
+            stats.record(key, text, time.perf_counter() - start, start - due, e)
+    cursor.close()
+    conn.close()
+
+def replayable(events, read_only, stats):
+    """Group events by connection, dropping what cannot or should not run on the target"""
+    connections = defaultdict(list)
+    for event in events:
+        if event['kind'] == 'query':
+            sql = event['sql']
+            if event.get('unbound'):
+                stats.skipped['unbound parameters'] += 1
+                continue
+            if SKIP_ON_REPLAY_RE.match(sql):
+                stats.skipped['session/admin statement'] += 1
+                continue
+            if read_only and not READ_RE.match(sql):
+                stats.skipped['write (read-only replay)'] += 1
+                continue
+        connections[event['conn']].append(event)
+    return {conn: evs for conn, evs in connections.items() if any(e['kind'] == 'query' for e in evs)}
+
+def replay(config, events, speed, read_only):
+    """Replay all connections concurrently; returns (stats, elapsed seconds, peak concurrency)"""
+    stats = ReplayStats()
+    connections = replayable(events, read_only, stats)
+    origin = time.perf_counter() + 1.0
+    threads = []
+    peak = 0
+    # Start threads in order of first statement so at most the live connections are waiting
+    for conn_id, conn_events in sorted(connections.items(), key=lambda item: item[1][0]['t']):
+        start_at = origin + conn_events[0]['t'] / speed - CONNECT_LEAD - 0.5
+        time.sleep(max(0.0, start_at - time.perf_counter()))
+        thread = threading.Thread(target=replay_connection,
+                                  args=(config, conn_events, origin, speed, stats), daemon=True)
+        thread.start()
+        threads.append(thread)
+        threads = [t for t in threads if t.is_alive()]
+        peak = max(peak, len(threads))
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - origin, peak
+
+def replay_report(header, events, stats, speed, elapsed, peak, args):
+    captured_ms = defaultdict(list)
+    for event in events:
+        if event['kind'] == 'query' and 'ms' in event:
+            captured_ms[fingerprint_id(fingerprint(event['sql']))].append(event['ms'] / 1000)
+
+    fingerprints = {}
+    for key in set(stats.latencies) | set(stats.errors):
+        entry = {'text': stats.texts[key], **summarize(stats.latencies[key]), 'errors': stats.errors[key]}
+        if key in stats.error_samples:
+            entry['error_sample'] = stats.error_samples[key]
+        if key in captured_ms:
+            entry['captured'] = summarize(captured_ms[key])
+        fingerprints[key] = entry
+
+    lags = sorted(stats.lags)
+    return {
+        'capture': os.path.abspath(args.capture),
+        'captured_from': header.get('server'),
+        'target': {'host': args.host or DB_CONFIG['host'], 'database': args.database or DB_CONFIG['database']},
+        'restored_from': args.restore,
+        'applied': args.apply,
+        'speed': speed,
+        'read_only': args.read_only,
+        'captured_seconds': max((e['t'] for e in events), default=0.0),
+        'elapsed_seconds': round(elapsed, 3),
+        'statements': sum(len(v) for v in stats.latencies.values()),
+        'errors': sum(stats.errors.values()),
+        'skipped': dict(stats.skipped),
+        'peak_connections': peak,
+        'start_lag_ms': {'p50': percentile(lags, 0.50) * 1000 if lags else None,
+                         'p99': percentile(lags, 0.99) * 1000 if lags else None},
+        'fingerprints': fingerprints,
+    }
+
+def print_replay(result, top):
+    lag = result['start_lag_ms']
+    print(f"  {result['statements']} statements, {result['errors']} errors in {result['elapsed_seconds']:.1f}s "
+          f"(captured span {result['captured_seconds'] / result['speed']:.1f}s at {result['speed']:g}x), "
+          f"peak {result['peak_connections']} connections")
+    if lag['p99'] is not None:
+        print(f"  Start lag p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms"
+              + ("  ! replay client could not keep up" if lag['p99'] > 100 else ""))
+    for reason, count in result['skipped'].items():
+        print(f"  Skipped {count}: {reason}")
+    ranked = sorted(result['fingerprints'].items(), key=lambda item: -item[1].get('total_ms', 0))
+    print(f"\n  {'Fingerprint':<12} {'Count':>7} {'Err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'Capt p95':>9} {'Total s':>8}  Statement")
+    for key, entry in ranked[:top]:
+        if not entry['count']:
+            print(f"  {key:<12} {0:>7} {entry['errors']:>5} {'-':>8} {'-':>8} {'-':>8} {'-':>9} {'-':>8}  {entry['text'][:70]}")
+            continue
+        captured = entry.get('captured', {}).get('p95_ms')
+        print(f"  {key:<12} {entry['count']:>7} {entry['errors']:>5} {entry['p50_ms']:>8.2f} {entry['p95_ms']:>8.2f} "
+              f"{entry['p99_ms']:>8.2f} {captured if captured is not None else '-':>9} "
+              f"{entry['total_ms'] / 1000:>8.2f}  {entry['text'][:70]}")
+
+def compare(baseline, candidate, min_count, threshold, top):
+    """Per-fingerprint latency deltas of candidate against baseline"""
+    rows = []
+    for key, base in baseline['fingerprints'].items():
+        cand = candidate['fingerprints'].get(key)
+        if not cand or base.get('count', 0) < min_count or cand.get('count', 0) < min_count:
+            continue
+        delta_p95 = (cand['p95_ms'] - base['p95_ms']) / base['p95_ms'] if base['p95_ms'] else 0.0
+        delta_total = cand['total_ms'] - base['total_ms'] * cand['count'] / base['count']
+        rows.append((key, base, cand, delta_p95, delta_total))
+
+    print(f"Baseline:  {baseline.get('applied') or 'no changes'} at {baseline['speed']:g}x, "
+          f"{baseline['statements']} statements")
+    print(f"Candidate: {candidate.get('applied') or 'no changes'} at {candidate['speed']:g}x, "
+          f"{candidate['statements']} statements")
+    print(f"\n{'Fingerprint':<12} {'Count':>7} {'p50 base':>9} {'p50 new':>8} {'p95 base':>9} {'p95 new':>8} "
+          f"{'Δp95':>7} {'ΔTotal s':>9}  Statement")
+    regressions = improvements = 0
+    for key, base, cand, delta_p95, delta_total in sorted(rows, key=lambda row: row[4])[:top] + \
+            sorted(rows, key=lambda row: -row[4])[:top]:
+        marker = ''
+        if delta_p95 > threshold:
+            marker = '  ✗ slower'
+        elif delta_p95 < -threshold:
+            marker = '  ✓ faster'
+        print(f"{key:<12} {cand['count']:>7} {base['p50_ms']:>9.2f} {cand['p50_ms']:>8.2f} {base['p95_ms']:>9.2f} "
+              f"{cand['p95_ms']:>8.2f} {delta_p95 * 100:>+6.0f}% {delta_total / 1000:>+9.2f}  {base['text'][:60]}{marker}")
+    for _, _, _, delta_p95, _ in rows:
+        regressions += delta_p95 > threshold
+        improvements += delta_p95 < -threshold
+    base_total = sum(base['total_ms'] for _, base, _, _, _ in rows)
+    cand_total = sum(cand['total_ms'] for _, _, cand, _, _ in rows)
+    print(f"\n{len(rows)} fingerprints compared (≥{min_count} executions each): {improvements} faster, "
+          f"{regressions} slower by more than {threshold * 100:.0f}% at p95")
+    if base_total:
+        print(f"Total statement time {base_total / 1000:.1f}s -> {cand_total / 1000:.1f}s "
+              f"({(cand_total - base_total) / base_total * 100:+.1f}%)")
+    return regressions
+
+def summary(path, top):
+    header, events = read_capture(path)
+    queries = [e for e in events if e['kind'] == 'query']
+    counts = defaultdict(int)
+    texts = {}
+    for event in queries:
+        text = fingerprint(event['sql'])
+        key = fingerprint_id(text)
+        counts[key] += 1
+        texts[key] = text
+    span = max((e['t'] for e in events), default=0.0)
+    print(f"Capture from {header.get('source')} at {header.get('started_at')} "
+          f"({(header.get('server') or {}).get('hostname', '?')}, schema {header.get('schema')})")
+    print(f"{len(queries)} statements on {len({e['conn'] for e in events})} connections over {span:.1f}s "
+          f"({len(queries) / span if span else 0:.0f}/s), {sum(1 for e in queries if e.get('unbound'))} not replayable")
+    for key, count in sorted(counts.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {key} {count:>8}  {texts[key][:90]}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture and replay the production SQL workload")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    capture_parser = sub.add_parser('capture', help="Record the statement stream")
+    capture_parser.add_argument('--source', choices=['general-log', 'perfschema'], default='general-log')
+    capture_parser.add_argument('--general-log-file', help="Convert an existing general log file instead")
+    capture_parser.add_argument('--duration', type=float, default=600, help="Seconds to capture")
+    capture_parser.add_argument('--interval', type=float, default=POLL_SECONDS, help="perfschema poll interval")
+    capture_parser.add_argument('--schema', default=DB_CONFIG['database'])
+    capture_parser.add_argument('-o', '--output', required=True, help="Capture file (.jsonl or .jsonl.gz)")
+
+    replay_parser = sub.add_parser('replay', help="Replay a capture against a staging database")
+    replay_parser.add_argument('capture')
+    replay_parser.add_argument('--host', help="Target host (default DB_HOST)")
+    replay_parser.add_argument('--port', type=int)
+    replay_parser.add_argument('--database', help="Target database (default DB_NAME)")
+    replay_parser.add_argument('--restore', help="database/backup dump to load before each run")
+    replay_parser.add_argument('--apply', action='append', default=[], help="SQL file to run after restoring")
+    replay_parser.add_argument('--workers', type=int, default=4, help="Parallel restore workers")
+    replay_parser.add_argument('--speed', type=float, nargs='+', default=[1.0], help="Speed multipliers, e.g. 1 2 5")
+    replay_parser.add_argument('--read-only', action='store_true', help="Skip writes (no restore needed)")
+    replay_parser.add_argument('--force', action='store_true', help="Allow writing to the capture's own server and schema")
+    replay_parser.add_argument('--top', type=int, default=20)
+    replay_parser.add_argument('-o', '--output', default='replay', help="Result file prefix (<prefix>_<speed>x.json)")
+
+    compare_parser = sub.add_parser('compare', help="Latency deltas per fingerprint between two replays")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--min-count', type=int, default=MIN_COMPARE_COUNT)
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="Fractional p95 change to flag")
+    compare_parser.add_argument('--top', type=int, default=15)
+
+    summary_parser = sub.add_parser('summary', help="Describe a capture file")
+    summary_parser.add_argument('capture')
+    summary_parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == 'summary':
+        summary(args.capture, args.top)
+        return
+    if args.command == 'compare':
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.candidate) as f:
+            candidate = json.load(f)
+        regressions = compare(baseline, candidate, args.min_count, args.threshold, args.top)
+        sys.exit(1 if regressions else 0)
+
+    if args.command == 'capture':
+        header = {'source': 'general-log' if args.general_log_file else args.source, 'schema': args.schema,
+                  'started_at': datetime.now().isoformat(timespec='seconds')}
+        if args.general_log_file:
+            writer = CaptureWriter(args.output, {**header, 'server': None, 'file': args.general_log_file})
+            log_filter = parse_general_log_file(args.general_log_file, writer, args.schema)
+            writer.close()
+            print(f"✓ Wrote {writer.count} events to {args.output} ({log_filter.skipped} entries for other schemas skipped)")
+            return
+
+        conn = create_connection()
+        if not conn:
+            sys.exit(1)
+        try:
+            cursor = conn.cursor()
+            identity, _ = server_identity(cursor)
+            cursor.close()
+            writer = CaptureWriter(args.output, {**header, 'server': identity})
+            if args.source == 'general-log':
+                capture_general_log(conn, writer, args.schema, args.duration)
+            else:
+                capture_perfschema(conn, writer, args.schema, args.duration, args.interval)
+            writer.close()
+            print(f"✓ Wrote {writer.count} events to {args.output}")
+        except Error as e:
+            print(f"✗ Database Error: {e}")
+            sys.exit(1)
+        finally:
+            conn.close()
+        return
+
+    # replay
+    header, events = read_capture(args.capture)
+    config = dict(DB_CONFIG)
+    if args.host:
+        config['host'] = args.host
+    if args.port:
+        config['port'] = args.port
+    if args.database:
+        config['database'] = args.database
+
+    try:
+        conn = create_connection(config)
+        if not conn:
+            sys.exit(1)
+        cursor = conn.cursor()
+        identity, _ = server_identity(cursor)
+        cursor.close()
+        conn.close()
+        source = header.get('server') or {}
+        same_target = (identity['hostname'], identity['port']) == (source.get('hostname'), source.get('port')) \
+            and config['database'] == header.get('schema')
+        if same_target and not args.read_only and not args.force:
+            print(f"✗ Target {identity['hostname']}:{identity['port']}/{config['database']} is the captured "
+                  f"database; replay writes against staging, or pass --read-only or --force")
+            sys.exit(1)
+        if len(args.speed) > 1 and not args.read_only and not args.restore:
+            print("  ! Without --restore each run starts from the data the previous run wrote")
+
+        print(f"Replaying {args.capture} against {identity['hostname']}:{identity['port']}/{config['database']}")
+        for run, speed in enumerate(args.speed):
+            if args.restore and (run == 0 or not args.read_only):
+                restore(config, args.restore, args.workers)
+            if run == 0 or (args.restore and not args.read_only):
+                for path in args.apply:
+                    apply_sql(config, path)
+            print(f"\n[{speed:g}x]")
+            stats, elapsed, peak = replay(config, events, speed, args.read_only)
+            result = replay_report(header, events, stats, speed, elapsed, peak, args)
+            print_replay(result, args.top)
+            path = f"{args.output}_{speed:g}x.json"
+            with open(path, 'w') as f:
+                json.dump(result, f, indent=2, default=str)
+            print(f"\n✓ Results: {path}")
+    except Error as e:
+        print(f"✗ Database Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()